@@ -1,6 +1,7 @@
 const { app, BrowserWindow, ipcMain } = require("electron");
 const path = require("path");
 const { spawn } = require("child_process");
+const net = require("net");
 
 const fs = require('fs');
 
@@ -12,6 +13,18 @@ if (process.platform === 'win32') {
 let mainWindow;
 let pythonProcess;
 
+// Local JSON-RPC channel to the backend for the overlay's frequent calls.
+// Unix domain socket, so not on Windows; callers fall back to HTTP.
+const rpcSocketPath = process.platform === "win32"
+  ? null
+  : path.join(app.getPath("userData"), "kenflow-rpc.sock");
+const RPC_TIMEOUT_MS = 5000;
+let rpcSocket = null;
+let rpcConnecting = false;
+let rpcBuffer = "";
+let rpcNextId = 1;
+const rpcPending = new Map();
+
 // File to store window state
 const windowStatePath = path.join(app.getPath('userData'), 'window-state.json');
 
@@ -283,6 +296,75 @@ function createWindow() {
   });
 }
 
+function backendArgs() {
+  const args = ["--server", "production"];
+  if (rpcSocketPath) args.push("--rpc-socket", rpcSocketPath);
+  return args;
+}
+
+function connectRpc() {
+  if (!rpcSocketPath || rpcSocket || rpcConnecting) return;
+  rpcConnecting = true;
+
+  const socket = net.createConnection(rpcSocketPath);
+  socket.setEncoding("utf8");
+  socket.on("connect", () => {
+    rpcConnecting = false;
+    rpcSocket = socket;
+  });
+  socket.on("data", (chunk) => {
+    rpcBuffer += chunk;
+    let newline;
+    while ((newline = rpcBuffer.indexOf("\n")) >= 0) {
+      const line = rpcBuffer.slice(0, newline);
+      rpcBuffer = rpcBuffer.slice(newline + 1);
+      let message;
+      try {
+        message = JSON.parse(line);
+      } catch (e) {
+        continue;
+      }
+      const pending = rpcPending.get(message.id);
+      if (!pending) continue;
+      rpcPending.delete(message.id);
+      clearTimeout(pending.timer);
+      pending.resolve(message.error ? { error: message.error } : { result: message.result });
+    }
+  });
+  const reset = () => {
+    rpcConnecting = false;
+    if (rpcSocket === socket) rpcSocket = null;
+    rpcBuffer = "";
+    rpcPending.forEach((pending) => {
+      clearTimeout(pending.timer);
+      pending.resolve({ error: "RPC connection closed" });
+    });
+    rpcPending.clear();
+  };
+  socket.on("error", reset);
+  socket.on("close", reset);
+}
+
+// Resolves to { result } or { error }; unavailable means nothing was sent
+// and the caller should use HTTP instead
+function rpcCall(method, params) {
+  if (!rpcSocket) {
+    connectRpc();
+    return Promise.resolve({ error: "RPC not connected", unavailable: true });
+  }
+  const id = rpcNextId++;
+  return new Promise((resolve) => {
+    const timer = setTimeout(() => {
+      rpcPending.delete(id);
+      resolve({ error: "RPC timeout" });
+    }, RPC_TIMEOUT_MS);
+    rpcPending.set(id, { resolve, timer });
+    rpcSocket.write(JSON.stringify({ id, method, params: params || {} }) + "\n");
+  });
+}
+
+ipcMain.handle("rpc", (event, method, params) => rpcCall(method, params));
+
 function startPythonBackend() {
   let backendPath;
   let cwd;
@@ -295,7 +377,7 @@ function startPythonBackend() {
     spawnArgs = { cwd: cwd, windowsHide: true };
 
     console.log(`Starting packaged backend: ${backendPath}`);
-    pythonProcess = spawn(backendPath, [], spawnArgs);
+    pythonProcess = spawn(backendPath, backendArgs(), spawnArgs);
   } else {
     // Development: Use python script
     const pythonPath = process.platform === "win32" ? "python" : "python3";
@@ -303,7 +385,7 @@ function startPythonBackend() {
     cwd = path.join(__dirname, "..", "python");
 
     console.log(`Starting dev backend: ${scriptPath}`);
-    pythonProcess = spawn(pythonPath, [scriptPath], { cwd: cwd });
+    pythonProcess = spawn(pythonPath, [scriptPath, ...backendArgs()], { cwd: cwd });
   }
 
   pythonProcess.stdout.on("data", (data) => {
@@ -319,6 +401,7 @@ function startPythonBackend() {
       output.includes('WARNING') ||
       output.includes('Running on') ||
       output.includes('Serving Flask') ||
+      output.includes('Serving on') ||          // waitress startup
       output.includes('Press CTRL+C') ||
       output.includes('Restarting with') ||
       output.includes('Debugger is') ||
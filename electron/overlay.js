@@ -10,6 +10,9 @@ let lastTargetWindows = [];
 let isUpdating = false;
 let selectedWindows = []; // New Global
 
+// Items shown by frecency when nothing is selected
+const TOP_ITEM_COUNT = 6;
+
 // Load selections safely (as Strings)
 try {
     const raw = JSON.parse(localStorage.getItem('overlay_messages') || '[]');
@@ -77,11 +80,38 @@ function updateToggleUI(btn, isActive) {
     else btn.classList.remove('active');
 }
 
-async function syncStatus() {
+// Listener state and settings: one call over the local RPC channel when
+// the backend offers it, two HTTP calls otherwise
+async function fetchStatus() {
+    if (window.electronAPI && window.electronAPI.rpc) {
+        const res = await window.electronAPI.rpc('overlay.status');
+        if (res && res.result) {
+            const { listener, enter_enabled, target_windows } = res.result;
+            return { listenerRes: listener, settingsRes: { enter_enabled, target_windows } };
+        }
+    }
+    const [listenerRes, settingsRes] = await Promise.all([
+        apiCall('/listener/status'),
+        apiCall('/settings')
+    ]);
+    return { listenerRes, settingsRes };
+}
+
+// Fire-and-forget send; HTTP only when the RPC channel is unavailable, so a
+// send is never issued twice
+async function requestSend(itemType, id) {
+    if (window.electronAPI && window.electronAPI.rpc) {
+        const res = await window.electronAPI.rpc('send', { item_type: itemType, item_id: Number(id) });
+        if (!res || !res.unavailable) return res;
+    }
+    return apiCall(itemType === 'combination' ? `/send-combination/${id}` : `/send-message/${id}`, 'POST');
+}
+
+async function syncStatus(preloaded) {
     if (isUpdating) return; // Kullanıcı işlem yaparken araya girme
 
     try {
-        const listenerRes = await apiCall('/listener/status');
+        const { listenerRes, settingsRes } = preloaded || await fetchStatus();
         if (listenerRes && !listenerRes.error) {
             const isListenerActive = listenerRes.active;
             updateToggleUI(document.getElementById('ovListenerBtn'), isListenerActive);
@@ -93,7 +123,6 @@ async function syncStatus() {
             }
         }
 
-        const settingsRes = await apiCall('/settings');
         if (settingsRes && !settingsRes.error) {
             // Python 'True' veya 'true' döndürebilir, normalize et
             const val = String(settingsRes.enter_enabled).toLowerCase();
@@ -143,7 +172,18 @@ async function apiCall(endpoint, method = 'GET', body = null) {
     }
 }
 
-async function loadMessages() {
+// Items of /api/dashboard/top (already ranked by the backend) resolved to
+// the loaded messages and combinations
+function topItems(top, messages, combinations) {
+    const find = (list, item) => list.find(x => String(x.id) === String(item.id));
+    const ranked = Array.isArray(top) ? top : [];
+    return {
+        messages: ranked.filter(t => t.item_type === 'message').map(t => find(messages, t)).filter(Boolean),
+        combinations: ranked.filter(t => t.item_type === 'combination').map(t => find(combinations, t)).filter(Boolean)
+    };
+}
+
+async function loadMessages(preloaded) {
     if (isModalOpen) return;
 
     const container = document.getElementById('messageContainer');
@@ -153,10 +193,12 @@ async function loadMessages() {
     }
 
     try {
-        // Load both messages and combinations
-        const [messages, combinations] = await Promise.all([
+        // Load both messages and combinations, and the top items if nothing is selected
+        const nothingSelected = selectedMessageIds.length === 0 && selectedCombinationIds.length === 0;
+        const [messages, combinations, top] = preloaded || await Promise.all([
             apiCall('/messages'),
-            apiCall('/combinations')
+            apiCall('/combinations'),
+            nothingSelected ? apiCall(`/dashboard/top?limit=${TOP_ITEM_COUNT}`) : null
         ]);
 
         if (!messages || messages.error) {
@@ -184,6 +226,13 @@ async function loadMessages() {
                 .filter(Boolean);
         }
 
+        // Nothing selected: offer the most frequently and recently used items
+        if (nothingSelected) {
+            const ranked = topItems(top, messages, allCombinations);
+            displayMessages = ranked.messages;
+            displayCombinations = ranked.combinations;
+        }
+
         const totalItems = displayMessages.length + displayCombinations.length;
 
         if (totalItems === 0) {
@@ -262,7 +311,7 @@ async function sendMessage(id) {
 
         // Önce işlemi başlat
         window.electronAPI.blurWindow();
-        apiCall(`/send-message/${id}`, 'POST'); // Await etmiyoruz ki arayüz takılmasın
+        requestSend('message', id); // Await etmiyoruz ki arayüz takılmasın
 
         // Animasyon oynat (class ekle/çıkar)
         if (btn && btn.classList.contains('message-btn')) {
@@ -283,7 +332,7 @@ async function sendCombination(id) {
 
         // Önce işlemi başlat
         window.electronAPI.blurWindow();
-        apiCall(`/send-combination/${id}`, 'POST');
+        requestSend('combination', id);
 
         // Animasyon oynat
         if (btn && btn.classList.contains('message-btn')) {
@@ -385,11 +434,27 @@ document.getElementById('ovEnterBtn').addEventListener('click', toggleEnter);
 document.getElementById('ovWindowBtn').addEventListener('click', toggleWindowTarget);
 
 
+// Messages, combinations, top items and status in one /api/bootstrap call;
+// anything missing is loaded with the regular requests
+async function loadInitialData() {
+    const data = await apiCall(`/bootstrap?sections=messages,combinations,top,settings,listener&top_limit=${TOP_ITEM_COUNT}`);
+    const ok = (section) => section && !section.error;
+    if (ok(data.messages) && ok(data.combinations) && ok(data.top)) {
+        loadMessages([data.messages, data.combinations, data.top]);
+    } else {
+        loadMessages();
+    }
+    if (ok(data.listener) && ok(data.settings)) {
+        syncStatus({ listenerRes: data.listener, settingsRes: data.settings });
+    } else {
+        syncStatus();
+    }
+}
+
 // Initial Load
 document.addEventListener('DOMContentLoaded', () => {
     loadTheme();
-    loadMessages();
-    syncStatus();
+    loadInitialData();
 
     // Hover ile pencere boyutunu güncelle
     const controlsWrapper = document.querySelector('.controls-wrapper');
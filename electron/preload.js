@@ -12,6 +12,8 @@ contextBridge.exposeInMainWorld('electronAPI', {
     notifyUpdate: () => ipcRenderer.send('ui-update-trigger'),
     onUpdate: (callback) => ipcRenderer.on('ui-update', callback),
     onOverlayClosed: (callback) => ipcRenderer.on('overlay-closed', callback),
+    // Local JSON-RPC channel to the backend, resolves to { result } or { error }
+    rpc: (method, params) => ipcRenderer.invoke('rpc', method, params),
     // Selection Window
     openSelectionWindow: () => ipcRenderer.send('open-selection-window'),
     closeSelectionWindow: () => ipcRenderer.send('close-selection-window'),
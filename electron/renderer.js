@@ -47,12 +47,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     const ready = await waitForBackend();
 
     if (ready) {
-        loadMessages();
-        loadPatterns();
-        loadCombinations();
-        loadSettings();
-        loadListenerStatus();
-        loadDashboard();
+        loadInitialData();
     } else {
         showToast('Backend baglantisi kurulamadi', 'error');
     }
@@ -79,6 +74,26 @@ document.addEventListener('DOMContentLoaded', async () => {
     }
 });
 
+// Everything the window shows at startup, fetched with one /api/bootstrap call
+const BOOTSTRAP_SECTIONS = 'messages,patterns,combinations,settings,listener,stats,period,logs';
+
+async function loadInitialData() {
+    let data = {};
+    try {
+        data = await apiGet(`/bootstrap?sections=${BOOTSTRAP_SECTIONS}&days=${currentPeriod}&logs_limit=20`);
+    } catch (e) {
+        console.error('Error loading bootstrap data:', e);
+    }
+    // Missing or failed sections are loaded with their own requests
+    const section = (name) => (data && data[name] && !data[name].error ? data[name] : undefined);
+    loadMessages('', section('messages'));
+    loadPatterns(section('patterns'));
+    loadCombinations(section('combinations'), section('messages'));
+    loadSettings(section('settings'));
+    loadListenerStatus(section('listener'));
+    loadDashboard(section('stats'), section('period'), section('logs'));
+}
+
 // ==================== THEME ====================
 function initTheme() {
     const savedTheme = localStorage.getItem('theme') || 'dark';
@@ -213,10 +228,10 @@ async function apiDelete(endpoint) {
 }
 
 // ==================== MESSAGES ====================
-async function loadMessages(search = '') {
+async function loadMessages(search = '', preloaded) {
     try {
         const endpoint = search ? `/messages?search=${encodeURIComponent(search)}` : '/messages';
-        const messages = await apiGet(endpoint);
+        const messages = preloaded || await apiGet(endpoint);
         renderMessages(messages);
     } catch (e) {
         console.error('Error loading messages:', e);
@@ -894,9 +909,9 @@ async function deleteMessage(id) {
 }
 
 // ==================== PATTERNS ====================
-async function loadPatterns() {
+async function loadPatterns(preloaded) {
     try {
-        const patterns = await apiGet('/patterns');
+        const patterns = preloaded || await apiGet('/patterns');
         patternsCache = patterns;
         renderPatterns(patterns);
     } catch (e) {
@@ -1033,9 +1048,9 @@ async function deletePattern(id) {
 // ==================== SIDEBAR CONTROLS ====================
 let enterEnabled = true;
 
-async function loadSettings() {
+async function loadSettings(preloaded) {
     try {
-        const settings = await apiGet('/settings');
+        const settings = preloaded || await apiGet('/settings');
         enterEnabled = settings.enter_enabled !== 'false';
         updateEnterToggleUI();
     } catch (e) {
@@ -1077,9 +1092,9 @@ function initListenerHandlers() {
     document.getElementById('listenerToggle').addEventListener('click', toggleListener);
 }
 
-async function loadListenerStatus() {
+async function loadListenerStatus(preloaded) {
     try {
-        const status = await apiGet('/listener/status');
+        const status = preloaded || await apiGet('/listener/status');
         listenerActive = status.active;
         updateListenerUI(status.active);
     } catch (e) {
@@ -1169,17 +1184,17 @@ function initDashboard() {
     });
 }
 
-async function loadDashboard() {
+async function loadDashboard(stats, period, logs) {
     await Promise.all([
-        loadStats(),
-        loadPeriodChart(),
-        loadActivityLog()
+        loadStats(stats),
+        loadPeriodChart(period),
+        loadActivityLog(logs)
     ]);
 }
 
-async function loadStats() {
+async function loadStats(preloaded) {
     try {
-        const stats = await apiGet('/dashboard/stats');
+        const stats = preloaded || await apiGet('/dashboard/stats');
         document.getElementById('statMessages').textContent = stats.total_messages || 0;
 
         document.getElementById('statCombinations').textContent = stats.total_combinations || 0;
@@ -1190,12 +1205,12 @@ async function loadStats() {
     }
 }
 
-async function loadPeriodChart() {
+async function loadPeriodChart(preloaded) {
     const chartEl = document.getElementById('weeklyChart');
     const chartTotalEl = document.getElementById('chartTotal');
 
     try {
-        const response = await apiGet(`/dashboard/period?days=${currentPeriod}`);
+        const response = preloaded || await apiGet(`/dashboard/period?days=${currentPeriod}`);
         const data = response.stats || [];
         const total = response.total || 0;
 
@@ -1300,11 +1315,11 @@ async function loadPeriodChart() {
     }
 }
 
-async function loadActivityLog() {
+async function loadActivityLog(preloaded) {
     const listEl = document.getElementById('activityList');
 
     try {
-        const logs = await apiGet('/dashboard/logs?limit=20');
+        const logs = preloaded || await apiGet('/dashboard/logs?limit=20');
 
         if (!logs || logs.length === 0) {
             listEl.innerHTML = '<div class="empty-activity"><i class="fas fa-inbox"></i><span>Henüz aktivite yok</span></div>';
@@ -1402,13 +1417,13 @@ function formatTime(dateStr) {
 
 // ==================== COMBINATIONS ====================
 
-async function loadCombinations() {
+async function loadCombinations(preloaded, preloadedMessages) {
     try {
-        const combinations = await apiGet('/combinations');
+        const combinations = preloaded || await apiGet('/combinations');
         renderCombinations(combinations);
 
         // Also cache messages for the combination modal
-        messagesCache = await apiGet('/messages');
+        messagesCache = preloadedMessages || await apiGet('/messages');
     } catch (e) {
         console.error('Error loading combinations:', e);
     }
@@ -3,6 +3,7 @@ const API_URL = 'http://127.0.0.1:5000/api';
 
 let selectedWindows = [];
 let allWindows = [];
+let windowsVersion = null;
 
 // Load theme
 function loadTheme() {
@@ -39,6 +40,7 @@ async function loadWindows() {
         if (winRes.error) throw new Error(winRes.error);
         
         allWindows = winRes.windows || [];
+        windowsVersion = winRes.version ?? null;
         
         // Load current targets
         const currentTargets = JSON.parse(setRes.target_windows || '[]');
@@ -52,6 +54,26 @@ async function loadWindows() {
     }
 }
 
+// Only fetch titles added or removed since the last known version
+async function syncWindows() {
+    if (windowsVersion === null) return;
+    
+    const res = await apiCall(`/windows?since=${windowsVersion}`);
+    if (res.error || res.version === undefined || res.version === windowsVersion) return;
+    
+    if (res.full) {
+        allWindows = res.windows || [];
+    } else {
+        const removed = new Set(res.removed || []);
+        allWindows = allWindows.filter(t => !removed.has(t)).concat(res.added || []);
+        allWindows.sort();
+    }
+    windowsVersion = res.version;
+    
+    updateUI();
+    renderWindowList();
+}
+
 function updateUI() {
     const allBtn = document.getElementById('allWindowsBtn');
     const countBadge = document.getElementById('windowCount');
@@ -158,4 +180,5 @@ if (window.electronAPI && window.electronAPI.onUpdate) {
 document.addEventListener('DOMContentLoaded', () => {
     loadTheme();
     loadWindows();
+    setInterval(syncWindows, 2000);
 });
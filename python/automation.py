@@ -0,0 +1,259 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Automation module for KenFlow application
+Keyboard/clipboard input backends and send timing
+
+Gönderim otomasyonu için:
+- Klavye ve pano işlemlerini değiştirilebilir bir arka uç üzerinden yapar
+- Kombinasyon gecikmelerini insansı bir zamanlama modeliyle üretir
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+try:
+    import pyautogui
+    AUTOMATION_SUPPORT = True
+except Exception:
+    # pyautogui fails to import without a display (e.g. headless Linux)
+    AUTOMATION_SUPPORT = False
+    print("Warning: pyautogui not available. Keyboard automation disabled.")
+
+import keyboard
+import pyperclip
+
+# Direct typing: characters per keyboard write and the pause between writes
+TYPE_CHUNK_SIZE = 32
+TYPE_CHUNK_PAUSE = 0.005
+
+
+# ==================== INPUT BACKENDS ====================
+
+class PyAutoGuiBackend:
+    """Sends real keyboard input through pyautogui and pyperclip"""
+
+    def hotkey(self, *keys: str):
+        pyautogui.hotkey(*keys)
+
+    def press(self, key: str):
+        pyautogui.press(key)
+
+    def copy(self, text: str):
+        pyperclip.copy(text)
+
+    def read_clipboard(self) -> str:
+        return pyperclip.paste()
+
+    def write(self, text: str):
+        # Unicode key events, so Turkish characters and emoji need no keyboard layout
+        keyboard.write(text, delay=0, exact=True)
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+class RecordingInputBackend:
+    """
+    Records input events instead of sending them.
+
+    Sleeping only advances a virtual clock, so sends can be replayed
+    headless and as fast as the code runs. Every event is stored as
+    (virtual_time, event, argument).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.events = []
+        self.clock = 0.0
+        self.clipboard = ''
+
+    def _record(self, event: str, argument: Any):
+        with self._lock:
+            self.events.append((self.clock, event, argument))
+
+    def hotkey(self, *keys: str):
+        self._record('hotkey', '+'.join(keys))
+
+    def press(self, key: str):
+        self._record('press', key)
+
+    def copy(self, text: str):
+        self.clipboard = text
+        self._record('copy', text)
+
+    def read_clipboard(self) -> str:
+        self._record('read_clipboard', None)
+        return self.clipboard
+
+    def write(self, text: str):
+        self._record('write', text)
+
+    def sleep(self, seconds: float):
+        with self._lock:
+            self.clock += seconds
+
+    def reset(self):
+        """Forget recorded events and rewind the clock"""
+        with self._lock:
+            self.events = []
+            self.clock = 0.0
+
+
+# ==================== TEXT DELIVERY ====================
+
+def choose_delivery(text: str, mode: str = 'auto', type_max_length: int = 80) -> str:
+    """
+    Pick 'type' or 'paste' for a text
+    In auto mode short texts are typed and long ones pasted
+    """
+    if mode in ('paste', 'type'):
+        return mode
+    return 'type' if len(text) <= type_max_length else 'paste'
+
+
+def type_text(backend, text: str, chunk_size: int = TYPE_CHUNK_SIZE):
+    """
+    Type text as key events in chunks, without using the clipboard
+    Line breaks become Shift+Enter so chat apps do not send early
+    """
+    for line_index, line in enumerate(text.replace('\r\n', '\n').split('\n')):
+        if line_index:
+            backend.hotkey('shift', 'enter')
+        for start in range(0, len(line), chunk_size):
+            if start:
+                backend.sleep(TYPE_CHUNK_PAUSE)
+            backend.write(line[start:start + chunk_size])
+
+
+def paste_text(backend, text: str, restore_clipboard: bool = True) -> Optional[str]:
+    """
+    Paste text with the clipboard
+    Returns the previous clipboard content to restore once the paste is
+    done, or None when it should not be restored
+    """
+    saved = None
+    if restore_clipboard:
+        try:
+            saved = backend.read_clipboard()
+        except Exception:
+            saved = None
+    backend.copy(text)
+    try:
+        backend.hotkey('ctrl', 'v')
+    except Exception:
+        # The caller never gets the saved content back, restore it here
+        if saved is not None:
+            backend.copy(saved)
+        raise
+    return saved
+
+
+# ==================== TIMING MODEL ====================
+
+class Step(NamedTuple):
+    """Delays around one message of a combination, in seconds"""
+    before: float        # before pasting the text
+    before_enter: float  # between pasting and pressing Enter
+    after: float         # after Enter, before the next message
+
+
+class TimingModel:
+    """
+    Delays used while sending a combination.
+
+    Base delays come from the combination (delay_ms) and settings
+    (click_delay). A distribution adds jitter around them:
+    - fixed: the base delays without jitter
+    - lognormal: multiplicative noise with the given sigma; the mean stays
+      at the base delay, so jitter does not slow sends down on average
+    - uniform: base delay +/- jitter as a fraction
+    ms_per_char adds typing time proportional to the next message length,
+    min_ms/max_ms bound every sampled gap. Only the first message waits
+    start_delay_ms (time to release the hotkey); later messages are
+    paced by the gap alone, also with fixed delays (sends before the
+    timing model waited 300 ms before every message).
+    """
+
+    DISTRIBUTIONS = ('fixed', 'lognormal', 'uniform')
+
+    def __init__(self, delay_ms: float = 500, click_delay_ms: float = 150, start_delay_ms: float = 300,
+                 distribution: str = 'fixed', jitter: float = 0.25, ms_per_char: float = 0,
+                 min_ms: Optional[float] = None, max_ms: Optional[float] = None):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {', '.join(self.DISTRIBUTIONS)}")
+        if jitter < 0 or ms_per_char < 0:
+            raise ValueError('jitter and ms_per_char must not be negative')
+        self.delay_ms = max(float(delay_ms), 0.0)
+        self.click_delay_ms = max(float(click_delay_ms), 0.0)
+        self.start_delay_ms = max(float(start_delay_ms), 0.0)
+        self.distribution = distribution
+        self.jitter = float(jitter)
+        self.ms_per_char = float(ms_per_char)
+        self.min_ms = None if min_ms is None else float(min_ms)
+        self.max_ms = None if max_ms is None else float(max_ms)
+
+    @classmethod
+    def from_config(cls, timing: Any, delay_ms: float = 500, click_delay_ms: float = 150) -> 'TimingModel':
+        """
+        Build a model from a combination's timing config (dict or JSON text)
+        Missing values fall back to the combination delay and settings
+        """
+        if isinstance(timing, str):
+            timing = json.loads(timing) if timing.strip() else None
+        timing = timing or {}
+        if not isinstance(timing, dict):
+            raise ValueError('timing must be an object')
+        allowed = {'start_delay_ms', 'distribution', 'jitter', 'ms_per_char', 'min_ms', 'max_ms'}
+        unknown = set(timing) - allowed
+        if unknown:
+            raise ValueError(f"unknown timing options: {', '.join(sorted(unknown))}")
+        return cls(delay_ms=delay_ms, click_delay_ms=click_delay_ms, **timing)
+
+    def to_config(self) -> Dict:
+        """Get the combination specific part of the model"""
+        return {
+            'start_delay_ms': self.start_delay_ms,
+            'distribution': self.distribution,
+            'jitter': self.jitter,
+            'ms_per_char': self.ms_per_char,
+            'min_ms': self.min_ms,
+            'max_ms': self.max_ms
+        }
+
+    def sample(self, base_ms: float, rng=random) -> float:
+        """Sample one delay around base_ms, in milliseconds"""
+        if base_ms <= 0:
+            return 0.0
+        if self.distribution == 'lognormal' and self.jitter:
+            sigma = self.jitter
+            value = base_ms * math.exp(rng.gauss(-sigma * sigma / 2, sigma))
+        elif self.distribution == 'uniform' and self.jitter:
+            value = base_ms * rng.uniform(max(1 - self.jitter, 0), 1 + self.jitter)
+        else:
+            value = base_ms
+        return value
+
+    def _bound(self, value_ms: float) -> float:
+        if self.min_ms is not None:
+            value_ms = max(value_ms, self.min_ms)
+        if self.max_ms is not None:
+            value_ms = min(value_ms, self.max_ms)
+        return max(value_ms, 0.0)
+
+    def plan(self, texts: List[str], rng=random) -> List[Step]:
+        """Precompute the delays for sending texts in order"""
+        steps = []
+        last = len(texts) - 1
+        for index, text in enumerate(texts):
+            before = self.start_delay_ms if index == 0 else 0.0
+            before_enter = self.sample(self.click_delay_ms, rng)
+            after = 0.0
+            if index < last:
+                gap = self.sample(self.delay_ms, rng) + self.ms_per_char * len(texts[index + 1])
+                after = self._bound(gap)
+            steps.append(Step(before / 1000.0, before_enter / 1000.0, after / 1000.0))
+        return steps
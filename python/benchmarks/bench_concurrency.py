@@ -0,0 +1,128 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Read/write concurrency benchmark
+
+Runs dashboard aggregations (get_dashboard_stats, get_period_stats and
+get_recent_logs) from several threads in a loop while another thread
+logs a send every few milliseconds, like a busy agent with the
+dashboard open. Reports the latency of the send's log write and the
+number of "database is locked" errors for:
+- split: the WAL writer connection and read-only reader pool
+- legacy: a new connection per call with rollback journaling, as
+  before the split
+
+Usage: python benchmarks/bench_concurrency.py [--logs 200000] [--readers 4] [--sends 200]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's real database
+TEMP_DIR = tempfile.mkdtemp(prefix='kenflow-bench-')
+os.environ['KENFLOW_DATA_DIR'] = TEMP_DIR
+
+import database
+from seed import seed
+
+
+def percentile(ordered, p):
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+def legacy_connection():
+    conn = sqlite3.connect(database.DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def analytics(stop: threading.Event, counts: list, errors: list):
+    while not stop.is_set():
+        try:
+            database.get_dashboard_stats()
+            database.get_period_stats(365)
+            database.get_recent_logs(50)
+            counts.append(1)
+        except sqlite3.OperationalError as e:
+            errors.append(str(e))
+
+
+def run(mode: str, readers: int, sends: int, interval: float) -> dict:
+    get_connection = database.get_connection
+    get_read_connection = database.get_read_connection
+    conn = database.get_connection()
+    conn.execute(f"PRAGMA journal_mode = {'DELETE' if mode == 'legacy' else 'WAL'}")
+    conn.close()
+    if mode == 'legacy':
+        database.get_connection = database.get_read_connection = legacy_connection
+
+    stop = threading.Event()
+    counts, read_errors = [], []
+    threads = [threading.Thread(target=analytics, args=(stop, counts, read_errors)) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+
+    timings, write_errors = [], []
+    started_at = time.perf_counter()
+    try:
+        for _ in range(sends):
+            started = time.perf_counter()
+            try:
+                database.log_message_sent(1, 'Mesaj 1', 'bench', 'WhatsApp - Müşteri')
+                timings.append((time.perf_counter() - started) * 1000)
+            except sqlite3.OperationalError as e:
+                write_errors.append(str(e))
+            time.sleep(interval)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started_at
+        database.get_connection = get_connection
+        database.get_read_connection = get_read_connection
+
+    timings.sort()
+    return {
+        'writes': len(timings),
+        'p50': percentile(timings, 50) if timings else 0,
+        'p95': percentile(timings, 95) if timings else 0,
+        'p99': percentile(timings, 99) if timings else 0,
+        'max': timings[-1] if timings else 0,
+        'write errors': len(write_errors),
+        'read errors': len(read_errors),
+        'dashboards/s': len(counts) / elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure send log writes under dashboard load')
+    parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--logs', type=int, default=200000)
+    parser.add_argument('--readers', type=int, default=4, help='threads running dashboard queries')
+    parser.add_argument('--sends', type=int, default=200)
+    parser.add_argument('--interval', type=float, default=0.01, help='seconds between sends')
+    args = parser.parse_args()
+
+    path = os.path.join(TEMP_DIR, 'bench.db')
+    print(f"Seeding {args.messages} messages and {args.logs} activity logs...")
+    seed(path, args.messages, activity_logs=args.logs)
+
+    print(f"{args.readers} dashboard threads, {args.sends} sends every {args.interval * 1000:.0f} ms")
+    print(f"{'mode':>7} {'writes':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>9} "
+          f"{'w err':>6} {'r err':>6} {'dashboards/s':>13}")
+    for mode in ('legacy', 'split'):
+        result = run(mode, args.readers, args.sends, args.interval)
+        print(f"{mode:>7} {result['writes']:>7} {result['p50']:>8.2f} {result['p95']:>8.2f} "
+              f"{result['p99']:>8.2f} {result['max']:>9.2f} {result['write errors']:>6} "
+              f"{result['read errors']:>6} {result['dashboards/s']:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
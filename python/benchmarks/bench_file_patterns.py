@@ -0,0 +1,81 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+File-backed pattern benchmark
+
+Writes a large word list to a text file, registers it as a pattern
+with a source_path and reports:
+- time to index the file and memory kept by the index (values are
+  read from the file when drawn)
+- time of a random draw and of process_template() using the pattern
+- time until an appended line is picked up after the file changes
+compared with the same values stored as pattern_items rows.
+
+Usage: python benchmarks/bench_file_patterns.py [--lines 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's real database
+TEMP_DIR = tempfile.mkdtemp(prefix='kenflow-bench-')
+os.environ['KENFLOW_DATA_DIR'] = TEMP_DIR
+
+import database
+import main as kenflow
+import rendering
+from seed import seed
+
+CITIES = ['İstanbul', 'Ankara', 'İzmir', 'Bursa', 'Antalya', 'Konya', 'Adana', 'Şanlıurfa', 'Muğla', 'Çorum']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark file-backed patterns')
+    parser.add_argument('--lines', type=int, default=1000000)
+    parser.add_argument('--draws', type=int, default=100000)
+    args = parser.parse_args()
+
+    seed(os.path.join(TEMP_DIR, 'bench.db'), 10)
+    rng = random.Random(1)
+    lines = [f'{rng.choice(CITIES)} Şube {i:07d}' for i in range(args.lines)]
+    path = os.path.join(TEMP_DIR, 'subeler.txt')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    print(f"{args.lines} lines, {os.path.getsize(path) / 1e6:.1f} MB file")
+
+    started = time.perf_counter()
+    database.create_pattern('sube', [], source_path=path)
+    values = kenflow.get_pattern_dict()['sube']
+    index_s = time.perf_counter() - started
+    if list(values[:3]) != lines[:3] or len(values) != args.lines:
+        sys.exit('file pattern values differ from the written lines')
+
+    stored = rendering.PatternValues(lines)
+    template = 'Siparişiniz {sube} adresine gönderildi'
+    print(f"{'source':>8} {'load s':>8} {'kept B/line':>12} {'draw ns':>8} {'render ns':>10}")
+    for label, source, load_s in (('file', values, index_s), ('packed', stored, None)):
+        pattern_dict = {'sube': source}
+        draw_ns = min(timeit.repeat(lambda: random.choice(source), number=args.draws, repeat=3)) / args.draws * 1e9
+        render_ns = min(timeit.repeat(lambda: rendering.render_template(template, pattern_dict),
+                                      number=args.draws, repeat=3)) / args.draws * 1e9
+        load = f'{load_s:>8.2f}' if load_s is not None else f"{'-':>8}"
+        print(f"{label:>8} {load} {source.nbytes() / args.lines:>12.1f} {draw_ns:>8.0f} {render_ns:>10.0f}")
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('Yeni Şube\n')
+    started = time.perf_counter()
+    while len(values) == args.lines:
+        time.sleep(0.01)
+    print(f"\nAppended line picked up after {time.perf_counter() - started:.2f}s "
+          f"(checked every {rendering.FILE_CHECK_INTERVAL:.0f}s), last value {values[-1]!r}")
+    print(f"Rendered: {kenflow.process_template(template)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Usage heatmap benchmark
+
+Seeds a year of activity logs and compares the 7x24 heatmap read from
+the hourly rollups (get_usage_heatmap) with binning the raw send
+timestamps of activity_logs, for all sends and for one message.
+
+Usage: python benchmarks/bench_heatmap.py [--logs 1000000] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's real database
+TEMP_DIR = tempfile.mkdtemp(prefix='kenflow-bench-')
+os.environ['KENFLOW_DATA_DIR'] = TEMP_DIR
+
+import database
+from seed import seed
+
+
+def median_ms(call, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def scan_heatmap(start: float, end: float, item_id: int = None) -> list:
+    """Bin every send timestamp of the range in Python"""
+    conn = database.get_read_connection()
+    cursor = conn.cursor()
+    query = '''
+        SELECT CAST(strftime('%s', created_at, 'localtime') AS INTEGER) / 3600 FROM activity_logs
+        WHERE activity_type = 'sent' AND created_at >= ? AND created_at < ?
+    '''
+    # The local hours overlapping the range, as UTC log timestamps
+    first = start - database.local_seconds(start) % 3600
+    last = end + (-database.local_seconds(end)) % 3600
+    params = [datetime.fromtimestamp(t, timezone.utc).strftime('%Y-%m-%d %H:%M:%S') for t in (first, last)]
+    if item_id is not None:
+        query += " AND item_type = 'message' AND item_id = ?"
+        params.append(item_id)
+    cursor.execute(query, params)
+    matrix = [[0] * 24 for _ in range(7)]
+    cells = {}
+    for (hour,) in cursor:
+        cell = cells.get(hour)
+        if cell is None:
+            moment = time.gmtime(hour * 3600)
+            cell = cells[hour] = (moment.tm_wday, moment.tm_hour)
+        matrix[cell[0]][cell[1]] += 1
+    conn.close()
+    return matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the hourly rollup heatmap with scanning the log')
+    parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--logs', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Seeding {args.logs} activity logs over a year...")
+    seed(os.path.join(TEMP_DIR, 'bench.db'), args.messages, activity_logs=args.logs)
+    started = time.perf_counter()
+    database.rebuild_hourly_stats()
+    print(f"Rollups rebuilt in {time.perf_counter() - started:.2f}s")
+
+    end = time.time()
+    print(f"{'range':>6} {'item':>8} {'rollup ms':>10} {'scan ms':>9}")
+    for days in (7, 30, 365):
+        start = end - days * 86400
+        for label, item_id in (('all', None), ('message', 7)):
+            item = ('message', item_id) if item_id else (None, None)
+            heatmap = database.get_usage_heatmap(start, end, *item)
+            if heatmap != scan_heatmap(start, end, item_id):
+                sys.exit(f'{days} days / {label}: rollup differs from the log')
+            rollup_ms = median_ms(lambda: database.get_usage_heatmap(start, end, *item), args.repeat)
+            scan_ms = median_ms(lambda: scan_heatmap(start, end, item_id), max(args.repeat // 5, 1))
+            print(f"{days:>5}d {label:>8} {rollup_ms:>10.2f} {scan_ms:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
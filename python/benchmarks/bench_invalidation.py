@@ -0,0 +1,131 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Cache invalidation benchmark
+
+Warms the render cache (compiled templates and variant spaces of every
+message) of a seeded database, edits a pattern that only a few messages
+use and reports:
+- time of the pattern write, change listeners included
+- cache entries left after the write
+- time of the next render of an unaffected and of an affected message
+- time to get the whole cache warm again
+once with per-pattern invalidation and once with the full reset that
+runs when no single pattern loader is given.
+
+Usage: python benchmarks/bench_invalidation.py [--messages 10000] [--affected 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's real database
+TEMP_DIR = tempfile.mkdtemp(prefix='kenflow-bench-')
+os.environ['KENFLOW_DATA_DIR'] = TEMP_DIR
+
+import database
+import hotkeys
+import main as kenflow
+from seed import seed
+
+RARE_PATTERN = 'nadir'
+
+
+def elapsed_ms(call) -> float:
+    started = time.perf_counter()
+    call()
+    return (time.perf_counter() - started) * 1000
+
+
+def warm(messages: int):
+    for message_id in range(1, messages + 1):
+        kenflow.render_cache.variant_space(message_id)
+
+
+def run(mode: str, pattern_id: int, messages: int, affected: list, rng: random.Random) -> dict:
+    cache = kenflow.render_cache
+    load_pattern = cache._load_pattern
+    if mode == 'full reset':
+        cache._load_pattern = None
+    try:
+        warm(messages)
+        dispatch = kenflow.hotkey_dispatch
+        values = [f'nadir {rng.random():.6f}' for _ in range(5)]
+        write_ms = elapsed_ms(lambda: database.update_pattern(pattern_id, RARE_PATTERN, values))
+        refresh_ms = elapsed_ms(kenflow.refresh_hotkeys)
+        left = cache.metrics()
+
+        unaffected = rng.choice([i for i in range(1, messages + 1) if i not in affected])
+        unaffected_ms = elapsed_ms(lambda: kenflow.get_random_template(unaffected))
+        affected_ms = elapsed_ms(lambda: kenflow.get_random_template(rng.choice(affected)))
+        rewarm_ms = elapsed_ms(lambda: warm(messages))
+    finally:
+        cache._load_pattern = load_pattern
+    return {
+        'write': write_ms,
+        'hotkey refresh': refresh_ms,
+        'templates left': left['messages'],
+        'variants left': left['variant_spaces'],
+        'next unaffected': unaffected_ms,
+        'next affected': affected_ms,
+        're-warm': rewarm_ms,
+        'map kept': kenflow.hotkey_dispatch is dispatch
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-pattern invalidation with a full reset')
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--affected', type=int, default=20,
+                        help='messages that use the edited pattern')
+    args = parser.parse_args()
+
+    path = os.path.join(TEMP_DIR, 'bench.db')
+    seed(path, args.messages)
+    database.use_database(path)
+    rng = random.Random(1)
+
+    pattern_id = database.create_pattern(RARE_PATTERN, ['nadir'])
+    affected = rng.sample(range(1, args.messages + 1), args.affected)
+    for message_id in affected:
+        message = database.get_message_by_id(message_id)
+        templates = [t['content'] for t in message['templates']]
+        templates[0] += f' {{{RARE_PATTERN}}}'
+        database.update_message(message_id, message['name'], templates,
+                                message['trigger_key'], message['icon'])
+
+    # Hotkeys registered on a synthetic keyboard, nothing reaches the OS
+    kenflow.set_keyboard_backend(hotkeys.SyntheticKeyboard())
+    real_stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        kenflow.start_listener()
+        results = {mode: run(mode, pattern_id, args.messages, affected, rng)
+                   for mode in ('per pattern', 'full reset')}
+        kenflow.stop_listener()
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+
+    print(f"{args.messages} messages, {args.affected} use '{RARE_PATTERN}'")
+    print(f"{'':>16} " + ' '.join(f'{mode:>12}' for mode in results))
+    for row in next(iter(results.values())):
+        cells = []
+        for result in results.values():
+            value = result[row]
+            if isinstance(value, bool):
+                cells.append(f"{'yes' if value else 'no':>12}")
+            elif isinstance(value, int):
+                cells.append(f'{value:>12}')
+            else:
+                cells.append(f'{value:>9.2f} ms')
+        print(f'{row:>16} ' + ' '.join(cells))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Local transport benchmark
+
+Measures per-call latency of the overlay's status poll from a single
+client, as the overlay does it:
+- HTTP over TCP 127.0.0.1 (the default)
+- HTTP over a Unix domain socket (--unix-socket)
+- JSON-RPC over a Unix domain socket (--rpc-socket)
+HTTP needs two requests per poll (listener status and settings), RPC
+answers the same with one overlay.status call.
+
+Usage: python benchmarks/bench_ipc.py [--calls 2000]
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's real database
+TEMP_DIR = tempfile.mkdtemp(prefix='kenflow-bench-')
+os.environ['KENFLOW_DATA_DIR'] = TEMP_DIR
+
+import ipc
+import main as kenflow
+import server
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP client connection over a Unix domain socket"""
+
+    def __init__(self, path: str, timeout: float = 10):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class HttpClient:
+    """Keep-alive HTTP client that reconnects when the server closes"""
+
+    def __init__(self, connect):
+        self._connect = connect
+        self._connection = None
+
+    def get(self, path: str) -> bytes:
+        if self._connection is None:
+            self._connection = self._connect()
+        self._connection.request('GET', path)
+        response = self._connection.getresponse()
+        body = response.read()
+        if response.will_close:
+            self._connection.close()
+            self._connection = None
+        return body
+
+
+def percentile(ordered, p):
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+def measure(call, calls: int):
+    for _ in range(min(calls // 10, 100)):
+        call()
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+    return latencies
+
+
+def start(instance):
+    threading.Thread(target=instance.serve_forever, daemon=True).start()
+    return instance
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare TCP, Unix socket HTTP and JSON-RPC latency')
+    parser.add_argument('--calls', type=int, default=2000)
+    args = parser.parse_args()
+    if not ipc.RPC_SUPPORT:
+        sys.exit('Unix domain sockets are not supported on this platform')
+
+    http_socket = os.path.join(TEMP_DIR, 'http.sock')
+    rpc_socket = os.path.join(TEMP_DIR, 'rpc.sock')
+    tcp_server = start(server.create_server(kenflow.app, port=0)[0])
+    unix_server, name = server.create_server(kenflow.app, unix_socket=http_socket)
+    start(unix_server)
+    rpc_server = ipc.RpcServer(rpc_socket, kenflow.rpc_methods)
+    rpc_server.start()
+
+    tcp = HttpClient(lambda: http.client.HTTPConnection('127.0.0.1', tcp_server.server_port, timeout=10))
+    unix = HttpClient(lambda: UnixHTTPConnection(http_socket))
+    rpc = ipc.RpcClient(rpc_socket)
+
+    def poll(client):
+        def call():
+            client.get('/api/listener/status')
+            client.get('/api/settings')
+        return call
+
+    cases = [
+        ('HTTP/TCP', 'listener status', lambda: tcp.get('/api/listener/status')),
+        ('HTTP/unix', 'listener status', lambda: unix.get('/api/listener/status')),
+        ('RPC/unix', 'listener status', lambda: rpc.call('listener.status')),
+        ('HTTP/TCP', 'overlay poll', poll(tcp)),
+        ('HTTP/unix', 'overlay poll', poll(unix)),
+        ('RPC/unix', 'overlay poll', lambda: rpc.call('overlay.status')),
+    ]
+    print(f"HTTP served by {name}, {args.calls} sequential calls per row")
+    print(f"{'transport':>10} {'call':>16} {'p50 us':>8} {'p95 us':>8} {'p99 us':>8}")
+    for transport, label, call in cases:
+        latencies = measure(call, args.calls)
+        print(f"{transport:>10} {label:>16} {percentile(latencies, 50):>8.0f} "
+              f"{percentile(latencies, 95):>8.0f} {percentile(latencies, 99):>8.0f}")
+
+    rpc.close()
+    rpc_server.stop()
+    tcp_server.shutdown()
+    unix_server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
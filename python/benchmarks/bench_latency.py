@@ -0,0 +1,133 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Hotkey to send latency benchmark
+
+Presses trigger keys on a synthetic keyboard and measures, through the
+real listener handlers, how long KenFlow takes from the key press until
+the text is put in (paste or last typed chunk) and until Enter is
+pressed. Input goes to a recording backend whose sleeps only advance a
+virtual clock, so the numbers are KenFlow's own processing time; the
+configured delays (hotkey release, click delay, combination gaps) are
+reported separately as the modeled time.
+
+Runs headless against temporary databases of growing size.
+
+Usage: python benchmarks/bench_latency.py [--sizes 10,1000,10000,100000] [--presses 300]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's real database
+TEMP_DIR = tempfile.mkdtemp(prefix='kenflow-bench-')
+os.environ['KENFLOW_DATA_DIR'] = TEMP_DIR
+
+import automation
+import hotkeys
+import main as kenflow
+import windows
+from seed import seed
+
+
+class TimedBackend(automation.RecordingInputBackend):
+    """Recording backend that also stores the wall clock time of every event"""
+
+    def __init__(self):
+        super().__init__()
+        self.times = []
+
+    def _record(self, event, argument):
+        super()._record(event, argument)
+        self.times.append(time.perf_counter())
+
+    def reset(self):
+        super().reset()
+        self.times = []
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+def measure(keyboard, backend, key):
+    """Press key once, return (ms to text, ms to first Enter, ms to last Enter, modeled ms)"""
+    backend.reset()
+    start = time.perf_counter()
+    keyboard.press(key)
+    text_at = enter_at = last_enter_at = None
+    for (_, event, argument), at in zip(backend.events, backend.times):
+        if event == 'press' and argument == 'enter':
+            enter_at = enter_at or at
+            last_enter_at = at
+        elif text_at is None and (event == 'write' or (event == 'hotkey' and argument == 'ctrl+v')):
+            text_at = at
+    if text_at is None or enter_at is None:
+        raise RuntimeError(f"No send recorded for {key}")
+    return ((text_at - start) * 1000, (enter_at - start) * 1000,
+            (last_enter_at - start) * 1000, backend.clock * 1000)
+
+
+def run_size(size, presses, combination_size):
+    path = os.path.join(TEMP_DIR, f'bench-{size}.db')
+    started = time.perf_counter()
+    keys = seed(path, size, combination_size=combination_size)
+    seed_s = time.perf_counter() - started
+
+    keyboard = hotkeys.SyntheticKeyboard()
+    backend = TimedBackend()
+    kenflow.set_window_provider(windows.FakeWindowProvider(['WhatsApp - Müşteri']))
+    kenflow.set_input_backend(backend)
+    kenflow.set_keyboard_backend(keyboard)
+    kenflow.start_listener()
+
+    rng = random.Random(size)
+    results = {}
+    for kind in ('message', 'combination'):
+        samples = [measure(keyboard, backend, rng.choice(keys[kind])) for _ in range(presses)]
+        results[kind] = samples
+    kenflow.stop_listener()
+    return seed_s, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hotkey to send latency')
+    parser.add_argument('--sizes', default='10,1000,10000,100000',
+                        help='comma separated message counts')
+    parser.add_argument('--presses', type=int, default=300, help='key presses per size and kind')
+    parser.add_argument('--combination-size', type=int, default=3)
+    args = parser.parse_args()
+
+    # Console output of every send would dominate the timings
+    real_stdout = sys.stdout
+    print(f"{'messages':>9} {'kind':>12} {'stage':>11} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'modeled ms':>11}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            seed_s, results = run_size(size, args.presses, args.combination_size)
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        for kind, samples in results.items():
+            modeled = statistics.median(s[3] for s in samples)
+            stages = [('text', 0), ('enter', 1)]
+            if kind == 'combination':
+                stages.append(('last enter', 2))
+            for stage, column in stages:
+                values = [s[column] for s in samples]
+                print(f"{size:>9} {kind:>12} {stage:>11} {percentile(values, 50):>8.2f} "
+                      f"{percentile(values, 95):>8.2f} {percentile(values, 99):>8.2f} "
+                      f"{max(values):>8.2f} {modeled:>11.0f}")
+        print(f"{'':>9} (seeded in {seed_s:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Pattern memory benchmark
+
+Loads a database with one very large pattern (product names) the way
+the render cache did before (get_all_patterns, a dict per item, then a
+list of values) and the packed way (get_packed_patterns, one
+rendering.PatternValues per pattern) and reports per item:
+- bytes kept in memory once loaded
+- peak bytes while loading
+- time to load
+- time of a random draw and of a template render using the pattern
+
+Usage: python benchmarks/bench_pattern_memory.py [--items 500000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's real database
+TEMP_DIR = tempfile.mkdtemp(prefix='kenflow-bench-')
+os.environ['KENFLOW_DATA_DIR'] = TEMP_DIR
+
+import database
+import rendering
+from seed import seed
+
+PATTERN = 'urun'
+WORDS = ['Çelik', 'Termos', 'Kupa', 'Şişe', 'Kalem', 'Defter', 'Çanta', 'Lamba', 'Saat', 'Kılıf']
+
+
+def seed_pattern(items: int):
+    rng = random.Random(1)
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    cursor.execute('INSERT INTO patterns (name) VALUES (?)', (PATTERN,))
+    pattern_id = cursor.lastrowid
+    cursor.executemany('INSERT INTO pattern_items (pattern_id, value) VALUES (?, ?)', (
+        (pattern_id, f'{rng.choice(WORDS)} {rng.choice(WORDS)} SKU-{i:07d}') for i in range(items)
+    ))
+    conn.commit()
+    conn.close()
+
+
+def load_dicts():
+    patterns = database.get_all_patterns()
+    return {p['name']: [item['value'] for item in p['items']] for p in patterns}
+
+
+def load_packed():
+    return {name: values for _, name, values in database.get_packed_patterns()}
+
+
+def measure(load):
+    """Return (result, retained bytes, peak bytes, seconds)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare pattern value representations')
+    parser.add_argument('--items', type=int, default=500000)
+    parser.add_argument('--draws', type=int, default=200000)
+    args = parser.parse_args()
+
+    path = os.path.join(TEMP_DIR, 'bench.db')
+    seed(path, 10)
+    seed_pattern(args.items)
+
+    compiled_template = f'Merhaba, {{{PATTERN}}} stokta!'
+    print(f"{args.items} items in '{PATTERN}'")
+    print(f"{'store':>8} {'kept B/item':>12} {'peak B/item':>12} {'load s':>8} "
+          f"{'draw ns':>8} {'render ns':>10}")
+    results = {}
+    for label, load in (('dicts', load_dicts), ('packed', load_packed)):
+        pattern_dict, retained, peak, elapsed = measure(load)
+        values = pattern_dict[PATTERN]
+        compiled = rendering.compile_template(compiled_template, pattern_dict)
+        # Bound as arguments, the del below frees them before the next load
+        draw_ns = min(timeit.repeat(lambda values=values: random.choice(values),
+                                    number=args.draws, repeat=3)) / args.draws * 1e9
+        render_ns = min(timeit.repeat(lambda compiled=compiled, pattern_dict=pattern_dict:
+                                      rendering.render_compiled(compiled, pattern_dict),
+                                      number=args.draws, repeat=3)) / args.draws * 1e9
+        results[label] = values
+        print(f"{label:>8} {retained / args.items:>12.1f} {peak / args.items:>12.1f} {elapsed:>8.2f} "
+              f"{draw_ns:>8.0f} {render_ns:>10.0f}")
+        del pattern_dict, values, compiled
+
+    if list(results['packed']) != results['dicts']:
+        sys.exit('packed values differ from the loaded rows')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+List payload benchmark
+
+Requests the message and combination lists of a seeded database in
+every body format (json, columns, msgpack when installed) and content
+encoding (identity, gzip, br when installed) and reports per variant:
+- bytes on the wire
+- server time on a cache miss (query + serialize + compress)
+- server time on a cache hit and for a 304 revalidation
+- client time to decode the body back into a list of dicts
+
+Usage: python benchmarks/bench_payloads.py [--messages 10000] [--repeat 20]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's real database
+TEMP_DIR = tempfile.mkdtemp(prefix='kenflow-bench-')
+os.environ['KENFLOW_DATA_DIR'] = TEMP_DIR
+
+import database
+import main as kenflow
+import payloads
+from seed import seed
+
+ROUTES = {
+    'messages': '/api/messages',
+    'combinations': '/api/combinations',
+}
+
+
+def median_ms(call, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def decode(body: bytes, fmt: str, encoding: str):
+    """Decode a response body like a client would"""
+    if encoding == 'gzip':
+        body = gzip.decompress(body)
+    elif encoding == 'br':
+        body = payloads.brotli.decompress(body)
+    if fmt == 'msgpack':
+        return payloads.msgpack.unpackb(body, raw=False)
+    data = json.loads(body)
+    return payloads.from_columns(data) if fmt == 'columns' else data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare list payload formats and encodings')
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--combinations', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    path = os.path.join(TEMP_DIR, 'bench.db')
+    seed(path, args.messages, combinations=args.combinations)
+    database.use_database(path)
+    client = kenflow.app.test_client()
+
+    formats = ['json', 'columns'] + (['msgpack'] if payloads.MSGPACK_SUPPORT else [])
+    encodings = [None, 'gzip'] + (['br'] if payloads.BROTLI_SUPPORT else [])
+    print(f"{args.messages} messages, {args.combinations} combinations, median of {args.repeat}")
+    print(f"{'route':>13} {'format':>8} {'encoding':>9} {'bytes':>10} {'miss ms':>8} "
+          f"{'hit ms':>7} {'304 ms':>7} {'decode ms':>10}")
+    for route, url in ROUTES.items():
+        reference = None
+        for fmt in formats:
+            for encoding in encodings:
+                headers = {'Accept-Encoding': encoding or 'identity'}
+                target = f'{url}?format={fmt}'
+
+                def get():
+                    return client.get(target, headers=headers)
+
+                def miss():
+                    kenflow.payload_cache.clear()
+                    return get()
+
+                response = miss()
+                body = response.get_data()
+                applied = response.headers.get('Content-Encoding')
+                data = decode(body, fmt, applied)
+                if reference is None:
+                    reference = data
+                elif data != reference:
+                    sys.exit(f'{route} {fmt}/{encoding}: decoded body differs')
+
+                etag = response.headers['ETag']
+                miss_ms = median_ms(miss, args.repeat)
+                hit_ms = median_ms(get, args.repeat)
+                revalidate_ms = median_ms(
+                    lambda: client.get(target, headers={**headers, 'If-None-Match': etag}), args.repeat)
+                decode_ms = median_ms(lambda: decode(body, fmt, applied), args.repeat)
+                print(f"{route:>13} {fmt:>8} {applied or 'identity':>9} {len(body):>10} {miss_ms:>8.2f} "
+                      f"{hit_ms:>7.2f} {revalidate_ms:>7.2f} {decode_ms:>10.2f}")
+
+    print(f"\nCache: {kenflow.payload_cache.hits} hits, {kenflow.payload_cache.misses} misses")
+
+
+if __name__ == '__main__':
+    main()
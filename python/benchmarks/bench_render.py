@@ -0,0 +1,71 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Batch rendering benchmark
+
+Renders a large number of texts through rendering.render_batch() with
+synthetic templates and patterns, sequentially and with a process pool,
+including the NDJSON encoding done by /api/render.
+
+Usage: python benchmarks/bench_render.py [--renders 1000000] [--processes N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rendering
+
+
+def build_data(message_count: int = 20):
+    """Create synthetic templates and patterns"""
+    pattern_dict = {
+        'greeting': ['Merhaba', 'Selam', 'İyi günler', 'Hey {name}'],
+        'name': [f'Müşteri {i}' for i in range(200)],
+        'emoji': ['😀', '🎉', '👍', '🙏', '✨'],
+        'product': [f'Ürün-{i:05d}' for i in range(5000)],
+    }
+    messages = []
+    for i in range(message_count):
+        templates = [
+            '{greeting}! {product} siparişiniz hazır {emoji}',
+            '{greeting}, {product} kargoya verildi. {emoji}',
+            f'Mesaj {i}: {{greeting}} {{emoji}}',
+        ]
+        messages.append((i + 1, templates))
+    return messages, pattern_dict
+
+
+def run(renders: int, processes: int, messages, pattern_dict):
+    per_message = renders // len(messages)
+    jobs = [(message_id, templates, per_message) for message_id, templates in messages]
+
+    start = time.perf_counter()
+    produced = 0
+    encoded_bytes = 0
+    for _, lines in rendering.render_batch(jobs, pattern_dict, processes, encode=True):
+        produced += lines.count('\n')
+        encoded_bytes += len(lines.encode('utf-8'))
+    elapsed = time.perf_counter() - start
+    return produced, encoded_bytes, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batch rendering')
+    parser.add_argument('--renders', type=int, default=1000000)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    messages, pattern_dict = build_data()
+    print(f"Rendering {args.renders:,} texts from {len(messages)} messages")
+
+    for label, processes in [('sequential', 0), (f'{args.processes} processes', args.processes)]:
+        produced, encoded_bytes, elapsed = run(args.renders, processes, messages, pattern_dict)
+        print(f"  {label:>14}: {produced:,} texts in {elapsed:.2f}s "
+              f"({produced / elapsed:,.0f}/s, {encoded_bytes / 1e6:.1f} MB NDJSON)")
+
+
+if __name__ == '__main__':
+    main()
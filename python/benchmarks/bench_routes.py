@@ -0,0 +1,366 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+API route benchmark
+
+Seeds a database with synthetic messages, templates, patterns,
+combinations and activity logs, then drives every Flask route through
+the test client from a fixed number of threads. Reports throughput and
+latency percentiles per route and stores them as JSON, so runs on
+different commits can be compared with --compare.
+
+Runs headless: windows, keyboard and input are replaced with the fake
+and recording backends, sleeps of the send path are virtual. Routes that
+write are bound by disk syncs and vary more between runs; use more
+--requests before reading a regression into them.
+
+Usage:
+    python benchmarks/bench_routes.py [--messages 10000] [--logs 2000000]
+        [--concurrency 4] [--requests 200] [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's real database
+TEMP_DIR = tempfile.mkdtemp(prefix='kenflow-bench-')
+os.environ['KENFLOW_DATA_DIR'] = TEMP_DIR
+
+import automation
+import database
+import hotkeys
+import main as kenflow
+import windows
+import workspaces
+from seed import seed
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+class Case(NamedTuple):
+    """
+    One benchmarked request
+    path and body may be callables of (index, target); prepare(n) creates
+    n fresh items for routes that change or delete them
+    """
+    method: str
+    path: Any
+    body: Any = None
+    prepare: Optional[Callable[[int], list]] = None
+
+    def build(self, index: int, targets: Optional[list]):
+        target = targets[index] if targets else None
+        path = self.path(index, target) if callable(self.path) else self.path
+        body = self.body(index, target) if callable(self.body) else self.body
+        return path, body
+
+
+def create_messages(n):
+    return [database.create_message(f'Bench {i}', ['{selam} bench']) for i in range(n)]
+
+
+def create_patterns(n):
+    stamp = time.time_ns()
+    return [database.create_pattern(f'bench_{stamp}_{i}', ['a', 'b']) for i in range(n)]
+
+
+def create_combinations(n):
+    return [database.create_combination(f'Bench {i}', [1, 2]) for i in range(n)]
+
+
+def create_rules(n):
+    return [database.create_window_rule('Bench', 'message', 1) for _ in range(n)]
+
+
+def create_workspaces(n):
+    return [workspaces.create_workspace(f'Bench {i}')['id'] for i in range(n)]
+
+
+def create_jobs(n):
+    run_at = time.time() + 3600
+    return [database.create_scheduled_job('message', 1, run_at) for _ in range(n)]
+
+
+def build_cases(messages: int, combinations: int, trigger_key: str) -> list:
+    """Requests covering every route, read-only ones on the seeded data"""
+    mid = messages // 2 or 1
+    cid = combinations // 2 or 1
+    stamp = time.time_ns()
+    message_body = {'name': 'Bench', 'templates': ['{selam}, bench {emoji}']}
+    combination_body = {'name': 'Bench', 'message_ids': [1, 2], 'delay_ms': 500}
+    rule_body = {'window_pattern': 'Bench', 'item_type': 'message', 'item_id': 1, 'priority': 1}
+    return [
+        Case('GET', '/api/messages'),
+        Case('POST', '/api/messages', message_body),
+        Case('GET', f'/api/messages/{mid}'),
+        Case('PUT', lambda i, t: f'/api/messages/{t}', message_body, create_messages),
+        Case('DELETE', lambda i, t: f'/api/messages/{t}', prepare=create_messages),
+        Case('POST', f'/api/messages/{mid}/copy'),
+        Case('GET', f'/api/messages/{mid}/variants?limit=50'),
+        Case('POST', f'/api/messages/{mid}/favorite'),
+        Case('POST', '/api/render', {'items': [{'message_id': mid, 'count': 100}]}),
+        Case('GET', '/api/render/metrics'),
+        Case('GET', '/api/patterns'),
+        Case('POST', '/api/patterns', lambda i, t: {'name': f'bench_new_{stamp}_{i}', 'items': ['a', 'b']}),
+        Case('PUT', lambda i, t: f'/api/patterns/{t}',
+             lambda i, t: {'name': f'bench_renamed_{stamp}_{i}', 'items': ['c']}, create_patterns),
+        Case('DELETE', lambda i, t: f'/api/patterns/{t}', prepare=create_patterns),
+        Case('GET', '/api/patterns/1/messages'),
+        Case('GET', '/api/settings'),
+        Case('PUT', '/api/settings', {'click_delay': '150'}),
+        Case('POST', f'/api/send-message/{mid}'),
+        Case('GET', '/api/listener/status'),
+        Case('POST', '/api/listener/start'),
+        Case('POST', '/api/listener/refresh'),
+        Case('GET', '/api/schedules'),
+        Case('POST', '/api/schedules', {'item_type': 'message', 'item_id': 1, 'delay_ms': 3600000}),
+        Case('DELETE', lambda i, t: f'/api/schedules/{t}', prepare=create_jobs),
+        Case('GET', '/api/window-rules'),
+        Case('POST', '/api/window-rules', rule_body),
+        Case('PUT', lambda i, t: f'/api/window-rules/{t}', rule_body, create_rules),
+        Case('DELETE', lambda i, t: f'/api/window-rules/{t}', prepare=create_rules),
+        Case('GET', f'/api/window-rules/resolve?key={trigger_key}&title=WhatsApp'),
+        Case('GET', '/api/windows'),
+        Case('GET', '/api/windows?since=0'),
+        Case('GET', '/api/windows/active'),
+        Case('GET', '/api/dashboard/stats'),
+        Case('GET', '/api/dashboard/period?days=30'),
+        Case('GET', '/api/dashboard/logs?limit=20'),
+        Case('GET', '/api/dashboard/recent?limit=5'),
+        Case('GET', '/api/dashboard/top?limit=10'),
+        Case('GET', '/api/dashboard/windows?days=30'),
+        Case('GET', '/api/dashboard/heatmap?days=365'),
+        Case('GET', f'/api/dashboard/heatmap?days=365&type=message&id={mid}'),
+        Case('GET', '/api/dashboard/favorites'),
+        Case('GET', '/api/dashboard/tip'),
+        Case('GET', '/api/dashboard/patterns?limit=5'),
+        Case('GET', '/api/combinations'),
+        Case('POST', '/api/combinations', combination_body),
+        Case('GET', f'/api/combinations/{cid}'),
+        Case('PUT', lambda i, t: f'/api/combinations/{t}', combination_body, create_combinations),
+        Case('DELETE', lambda i, t: f'/api/combinations/{t}', prepare=create_combinations),
+        Case('POST', f'/api/combinations/{cid}/favorite'),
+        Case('POST', f'/api/send-combination/{cid}'),
+        Case('GET', '/api/bootstrap?sections=messages,combinations,settings,listener'),
+        Case('GET', '/api/bootstrap?sections=messages,patterns,combinations,settings,listener,'
+                    'stats,period,logs&days=7&logs_limit=20'),
+        Case('GET', '/api/workspaces'),
+        Case('POST', '/api/workspaces', lambda i, t: {'name': f'Bench {i}'}),
+        Case('DELETE', lambda i, t: f'/api/workspaces/{t}', prepare=create_workspaces),
+        Case('POST', '/api/listener/stop'),
+    ]
+
+
+def percentile(ordered, p):
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+def run_case(case: Case, requests: int, concurrency: int, duration: float, warmup: int = 5) -> dict:
+    """Send up to requests requests from concurrency threads, stop after duration seconds"""
+    targets = case.prepare(requests + warmup) if case.prepare else None
+    # Untimed requests first, so caches and connections are warm
+    client = kenflow.app.test_client()
+    for index in range(requests, requests + warmup):
+        path, body = case.build(index, targets)
+        client.open(path, method=case.method, json=body).get_data()
+    counter = itertools.count()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        client = kenflow.app.test_client()
+        local = []
+        failed = 0
+        while True:
+            index = next(counter)
+            if index >= requests or time.perf_counter() > deadline:
+                break
+            path, body = case.build(index, targets)
+            started = time.perf_counter()
+            response = client.open(path, method=case.method, json=body)
+            response.get_data()
+            local.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    running = set(threading.enumerate())
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # Let sends started in the background by the route finish before the next case
+    for thread in set(threading.enumerate()) - running:
+        if not thread.daemon:
+            thread.join()
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(latencies[-1], 3),
+    }
+
+
+def match_rule(path: str, method: str):
+    adapter = kenflow.app.url_map.bind('localhost')
+    return adapter.match(path.split('?')[0], method, return_rule=True)[0]
+
+
+def case_name(case: Case) -> str:
+    """Stable name of a case: method, route rule and query string"""
+    path = case.build(0, [0])[0]
+    query = path.partition('?')[2]
+    return f"{case.method} {match_rule(path, case.method).rule}" + (f'?{query}' if query else '')
+
+
+def uncovered_endpoints(cases: list) -> list:
+    """API endpoints without a benchmark case, new routes show up here"""
+    covered = {match_rule(case.build(0, [0])[0], case.method).endpoint for case in cases}
+    return [
+        f"{'/'.join(sorted(rule.methods - {'HEAD', 'OPTIONS'}))} {rule.rule}"
+        for rule in kenflow.app.url_map.iter_rules()
+        if rule.endpoint != 'static' and rule.endpoint not in covered
+    ]
+
+
+def git_revision() -> str:
+    try:
+        root = os.path.dirname(os.path.abspath(__file__))
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                               capture_output=True, text=True).stdout.strip()
+        return revision + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(results: dict, baseline_path: str, threshold: float) -> int:
+    """Print p50/p95 against a previous run, return the number of regressions"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline['meta'].get('revision')} ({baseline_path})")
+    for key in ('messages', 'combinations', 'activity_logs', 'concurrency'):
+        if baseline['meta'].get(key) != results['meta'][key]:
+            print(f"Warning: {key} differs ({baseline['meta'].get(key)} vs {results['meta'][key]}), "
+                  f"numbers are not comparable")
+    print(f"{'route':<48} {'p50 before':>10} {'p50 now':>9} {'p95 before':>10} {'p95 now':>9}")
+    regressions = 0
+    for name, now in results['routes'].items():
+        before = baseline['routes'].get(name)
+        if not before:
+            print(f"{name:<48} {'-':>10} {now['p50_ms']:>9.2f} {'-':>10} {now['p95_ms']:>9.2f}  new")
+            continue
+        slower = now['p50_ms'] > before['p50_ms'] * (1 + threshold) and now['p50_ms'] - before['p50_ms'] > 1.0
+        regressions += slower
+        print(f"{name:<48} {before['p50_ms']:>10.2f} {now['p50_ms']:>9.2f} "
+              f"{before['p95_ms']:>10.2f} {now['p95_ms']:>9.2f}{'  SLOWER' if slower else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark all API routes on a large database')
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--combinations', type=int, default=200)
+    parser.add_argument('--logs', type=int, default=2000000, help='activity log rows')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--duration', type=float, default=10.0, help='time limit per route in seconds')
+    parser.add_argument('--db', help='database file to keep between runs (default: temporary)')
+    parser.add_argument('--reseed', action='store_true', help='seed --db again even if it exists')
+    parser.add_argument('--output', help='result JSON file (default: benchmarks/results/routes-<revision>.json)')
+    parser.add_argument('--compare', help='previous result JSON to compare with')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per route')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='relative p50 increase reported as a regression')
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(TEMP_DIR, 'bench.db')
+    if os.path.exists(path) and not args.reseed:
+        database.use_database(path)
+        print(f"Using existing database {path}")
+    else:
+        print(f"Seeding {args.messages} messages and {args.logs} activity logs...")
+        started = time.perf_counter()
+        seed(path, args.messages, combinations=args.combinations, activity_logs=args.logs)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+    bindings = database.get_hotkey_bindings()
+    trigger_key = bindings[0]['trigger_key'] if bindings else 'f1'
+
+    kenflow.set_window_provider(windows.FakeWindowProvider(['WhatsApp - Müşteri', 'Google Chrome']))
+    kenflow.set_input_backend(automation.RecordingInputBackend())
+    kenflow.set_keyboard_backend(hotkeys.SyntheticKeyboard())
+
+    cases = build_cases(args.messages, args.combinations, trigger_key)
+    results = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'messages': args.messages,
+            'combinations': args.combinations,
+            'activity_logs': args.logs,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+        },
+        'routes': {},
+        'uncovered': uncovered_endpoints(cases),
+    }
+
+    print(f"{'route':<48} {'req':>5} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    real_stdout = sys.stdout
+    for case in cases:
+        name = case_name(case)
+        # Routes print on every send, keep that out of the timings
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            stats = run_case(case, args.requests, args.concurrency, args.duration, args.warmup)
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        results['routes'][name] = stats
+        print(f"{name:<48} {stats['requests']:>5} {stats['errors']:>4} {stats['rps']:>8.1f} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+
+    if results['uncovered']:
+        print(f"\nRoutes without a benchmark case: {', '.join(results['uncovered'])}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"routes-{results['meta']['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"{regressions} route(s) slower than the baseline")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Server benchmark
+
+Serves the KenFlow app with the Werkzeug development server, the pooled
+fallback server and waitress (when installed) on a free local port and
+sends requests from several client threads over real TCP connections,
+either reusing connections (keep-alive, like Electron's fetch) or
+opening one per request. Reports requests per second and latency
+percentiles per server.
+
+Usage: python benchmarks/bench_server.py [--clients 8] [--seconds 3]
+"""
+
+import argparse
+import http.client
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's real database
+TEMP_DIR = tempfile.mkdtemp(prefix='kenflow-bench-')
+os.environ['KENFLOW_DATA_DIR'] = TEMP_DIR
+
+import automation
+import main as kenflow
+import server
+import windows
+from seed import seed
+
+ROUTES = {
+    'status': '/api/listener/status',
+    'message': '/api/messages/500',
+    'dashboard': '/api/dashboard/recent?limit=5',
+}
+
+
+def percentile(ordered, p):
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+def start_server(name: str, threads: int):
+    if name == 'dev':
+        instance, _ = server.create_server(kenflow.app, port=0, mode='dev')
+    elif name == 'pooled':
+        instance = server.PooledWSGIServer('127.0.0.1', 0, kenflow.app, threads)
+    else:
+        instance = server.WaitressServer(kenflow.app, '127.0.0.1', 0, threads)
+    thread = threading.Thread(target=instance.serve_forever, daemon=True)
+    thread.start()
+    return instance
+
+
+def load(port: int, path: str, clients: int, seconds: float, keep_alive: bool):
+    """Request path from clients threads for seconds, return (requests, errors, latencies ms)"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        local = []
+        failed = 0
+        connection = None
+        while time.perf_counter() < deadline:
+            if connection is None:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers={} if keep_alive else {'Connection': 'close'})
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = None
+                continue
+            local.append((time.perf_counter() - started) * 1000)
+            if not keep_alive or response.will_close:
+                connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return len(latencies), errors[0], latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the development and production servers')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--threads', type=int, default=server.DEFAULT_THREADS,
+                        help='worker threads of the production servers')
+    parser.add_argument('--seconds', type=float, default=3.0, help='duration per measurement')
+    args = parser.parse_args()
+
+    seed(os.path.join(TEMP_DIR, 'bench.db'), 1000, activity_logs=10000)
+    kenflow.set_window_provider(windows.FakeWindowProvider(['WhatsApp']))
+    kenflow.set_input_backend(automation.RecordingInputBackend())
+
+    servers = ['dev', 'pooled'] + (['waitress'] if server.WAITRESS_SUPPORT else [])
+    print(f"{args.clients} clients, {args.threads} worker threads, {args.seconds:.0f}s per row")
+    print(f"{'server':>9} {'route':>10} {'connection':>11} {'req/s':>8} {'err':>4} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+    for name in servers:
+        instance = start_server(name, args.threads)
+        # The development server logs every request to stderr
+        real_stderr = sys.stderr
+        sys.stderr = open(os.devnull, 'w')
+        try:
+            rows = []
+            for route, path in ROUTES.items():
+                for keep_alive in (True, False):
+                    count, errors, latencies = load(instance.server_port, path, args.clients,
+                                                    args.seconds, keep_alive)
+                    rows.append((route, keep_alive, count, errors, latencies))
+        finally:
+            sys.stderr.close()
+            sys.stderr = real_stderr
+            instance.shutdown()
+        for route, keep_alive, count, errors, latencies in rows:
+            mode = 'keep-alive' if keep_alive else 'close'
+            if not latencies:
+                print(f"{name:>9} {route:>10} {mode:>11} {'-':>8} {errors:>4}")
+                continue
+            print(f"{name:>9} {route:>10} {mode:>11} {count / args.seconds:>8.0f} {errors:>4} "
+                  f"{percentile(latencies, 50):>7.2f} {percentile(latencies, 95):>7.2f} "
+                  f"{percentile(latencies, 99):>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
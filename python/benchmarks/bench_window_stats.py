@@ -0,0 +1,87 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Per-window analytics benchmark
+
+Seeds activity logs and compares sends per application over a period
+read from the window_daily_sends rollup (get_window_stats) with the
+same numbers computed by scanning activity_logs.details. Also reports
+the cost the rollup adds to logging a send.
+
+Usage: python benchmarks/bench_window_stats.py [--logs 1000000] [--repeat 20]
+"""
+
+import argparse
+import collections
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's real database
+TEMP_DIR = tempfile.mkdtemp(prefix='kenflow-bench-')
+os.environ['KENFLOW_DATA_DIR'] = TEMP_DIR
+
+import database
+import windows
+from seed import seed
+
+
+def median_ms(call, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def scan_window_stats(days: int) -> list:
+    """Sends per application computed from the raw log rows"""
+    conn = database.get_read_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT details, COUNT(*) FROM activity_logs
+        WHERE activity_type = 'sent' AND details IS NOT NULL AND details != ''
+          AND date(created_at, 'localtime') >= date('now', ? || ' days', 'localtime')
+        GROUP BY details
+    ''', (f'-{days}',))
+    counts = collections.Counter()
+    for title, count in cursor.fetchall():
+        counts[windows.app_name(title)] += count
+    conn.close()
+    return sorted(({'name': name, 'count': count} for name, count in counts.items()),
+                  key=lambda row: (-row['count'], row['name']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the window rollup with scanning the log')
+    parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--logs', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Seeding {args.logs} activity logs...")
+    seed(os.path.join(TEMP_DIR, 'bench.db'), args.messages, activity_logs=args.logs)
+    started = time.perf_counter()
+    database.rebuild_window_stats()
+    print(f"Rollup rebuilt in {time.perf_counter() - started:.2f}s")
+
+    print(f"{'days':>5} {'rollup ms':>10} {'scan ms':>9}")
+    for days in (1, 7, 30, 365):
+        rollup = database.get_window_stats(days)
+        if rollup != scan_window_stats(days):
+            sys.exit(f'{days} days: rollup differs from the log')
+        rollup_ms = median_ms(lambda: database.get_window_stats(days), args.repeat)
+        scan_ms = median_ms(lambda: scan_window_stats(days), max(args.repeat // 5, 1))
+        print(f"{days:>5} {rollup_ms:>10.2f} {scan_ms:>9.1f}")
+
+    with_window = median_ms(lambda: database.log_message_sent(1, 'Mesaj 1', 'bench', 'Sohbet - WhatsApp'), 200)
+    without_window = median_ms(lambda: database.log_message_sent(1, 'Mesaj 1', 'bench'), 200)
+    print(f"\nLogging a send: {with_window:.3f} ms with a window, {without_window:.3f} ms without")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Synthetic data for benchmarks
+
+Fills a KenFlow database with generated messages, templates, patterns,
+combinations and activity logs. Rows are inserted in bulk, bypassing the per-item
+database functions, so large databases are created in seconds.
+"""
+
+import itertools
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+PATTERNS = {
+    'selam': ['Merhaba', 'Selam', 'İyi günler', 'Merhabalar', 'Selamlar'],
+    'emoji': ['🙂', '😊', '🙏', '👋', '🎉', ''],
+    'kapanis': ['Teşekkürler', 'İyi çalışmalar', 'Görüşmek üzere', 'Kolay gelsin'],
+}
+
+PHRASES = [
+    'siparişiniz hazırlanıyor',
+    'kargonuz bugün yola çıktı',
+    'talebiniz alınmıştır',
+    'ödemeniz onaylandı',
+    'randevunuz oluşturuldu',
+    'ürün stoklarımızda mevcut',
+]
+
+
+WINDOW_TITLES = [
+    'WhatsApp', 'Telegram', 'Mesajlar - Instagram', 'Google Chrome', 'Gelen Kutusu - Outlook',
+    'Satıcı Paneli - Trendyol - Google Chrome', 'Slack', 'Microsoft Teams',
+]
+
+# Rows per executemany batch when writing activity logs
+LOG_BATCH_SIZE = 50000
+
+
+def hotkey_name(index: int) -> str:
+    """Synthetic trigger key for the index-th bound item"""
+    return f'ctrl+alt+k{index}'
+
+
+def seed_activity_logs(cursor, count: int, messages: int, combinations: int, days: int = 365,
+                       rng: random.Random = None):
+    """
+    Insert count activity logs spread over the last days days
+    Mostly sends with a window title, the rest are message edits
+    """
+    rng = rng or random.Random(1)
+    now = datetime.utcnow()
+    span = days * 86400
+
+    def rows():
+        for _ in range(count):
+            created_at = (now - timedelta(seconds=rng.random() * span)).strftime('%Y-%m-%d %H:%M:%S')
+            roll = rng.random()
+            if roll < 0.8 or not combinations:
+                item_id = rng.randint(1, messages)
+                yield ('sent', 'message', item_id, f'Mesaj {item_id}', rng.choice(WINDOW_TITLES), created_at)
+            elif roll < 0.9:
+                item_id = rng.randint(1, combinations)
+                yield ('sent', 'combination', item_id, f'Kombinasyon {item_id}', None, created_at)
+            else:
+                item_id = rng.randint(1, messages)
+                yield (rng.choice(('created', 'edited')), 'message', item_id, f'Mesaj {item_id}', None, created_at)
+
+    generator = rows()
+    while True:
+        batch = list(itertools.islice(generator, LOG_BATCH_SIZE))
+        if not batch:
+            break
+        cursor.executemany('''
+            INSERT INTO activity_logs (activity_type, item_type, item_id, item_name, details, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', batch)
+
+
+def seed(path: str, messages: int, bound_messages: int = 200, combinations: int = 20,
+         combination_size: int = 3, templates_per_message: int = 3, activity_logs: int = 0,
+         seed_value: int = 1) -> dict:
+    """
+    Create a database at path with synthetic data
+    The first bound_messages messages and all combinations get trigger keys
+    Returns the trigger keys as {'message': [...], 'combination': [...]}
+    """
+    rng = random.Random(seed_value)
+    if os.path.exists(path):
+        os.remove(path)
+    database.use_database(path)
+
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    # Drop the stock sample data so sizes are exact
+    for table in ('activity_logs', 'combination_items', 'combinations', 'templates', 'messages',
+                  'pattern_items', 'patterns'):
+        cursor.execute(f'DELETE FROM {table}')
+
+    # Explicit ids, AUTOINCREMENT would continue after the deleted sample rows
+    for pattern_id, (name, values) in enumerate(PATTERNS.items(), 1):
+        cursor.execute('INSERT INTO patterns (id, name) VALUES (?, ?)', (pattern_id, name))
+        cursor.executemany('INSERT INTO pattern_items (pattern_id, value) VALUES (?, ?)',
+                           [(pattern_id, value) for value in values])
+
+    bound_messages = min(bound_messages, messages)
+    message_keys = [hotkey_name(i) for i in range(bound_messages)]
+    cursor.executemany(
+        'INSERT INTO messages (id, name, trigger_key) VALUES (?, ?, ?)',
+        ((i + 1, f'Mesaj {i + 1}', message_keys[i] if i < bound_messages else None)
+         for i in range(messages))
+    )
+    cursor.executemany(
+        'INSERT INTO templates (message_id, content) VALUES (?, ?)',
+        ((i + 1, f'{{selam}}, {rng.choice(PHRASES)} #{i + 1}. {{kapanis}} {{emoji}}')
+         for i in range(messages) for _ in range(templates_per_message))
+    )
+
+    combination_keys = [hotkey_name(bound_messages + i) for i in range(combinations)]
+    for i in range(combinations):
+        combination_id = i + 1
+        cursor.execute('INSERT INTO combinations (id, name, trigger_key, delay_ms) VALUES (?, ?, ?, ?)',
+                       (combination_id, f'Kombinasyon {combination_id}', combination_keys[i], 500))
+        members = rng.sample(range(1, messages + 1), min(combination_size, messages))
+        cursor.executemany(
+            'INSERT INTO combination_items (combination_id, message_id, order_index) VALUES (?, ?, ?)',
+            [(combination_id, message_id, order) for order, message_id in enumerate(members)]
+        )
+
+    # Some history for the dashboard lists
+    cursor.execute('UPDATE messages SET is_favorite = 1 WHERE id % 50 = 0')
+    cursor.execute("UPDATE messages SET last_used_at = datetime('now', '-' || (id % 720) || ' hours') "
+                   'WHERE id % 7 = 0')
+    seed_activity_logs(cursor, activity_logs, messages, combinations, rng=rng)
+
+    conn.commit()
+    conn.close()
+    database.rebuild_frecency()
+    database.rebuild_pattern_refs()
+    database.rebuild_window_stats()
+    database.rebuild_hourly_stats()
+    database.notify_change('database')
+    return {'message': message_keys, 'combination': combination_keys}
@@ -11,13 +11,24 @@ Handles all SQLite operations for messages, templates, and patterns
 
 import sqlite3
 import os
+import math
+import time
 import json
 import sys
-from typing import List, Dict, Optional, Any
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import rendering
+import windows
+
 
 def get_app_data_path():
     """Get the appropriate app data directory for KenFlow"""
-    if sys.platform == 'win32':
+    if os.environ.get('KENFLOW_DATA_DIR'):
+        # Explicit override, used by benchmarks and portable setups
+        app_data = os.environ['KENFLOW_DATA_DIR']
+    elif sys.platform == 'win32':
         # Windows: %LOCALAPPDATA%/KenFlow
         base_path = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
         app_data = os.path.join(base_path, 'KenFlow')
@@ -40,222 +51,607 @@ DATABASE_PATH = os.path.join(APP_DATA_PATH, 'kenflow.db')
 
 
 
+# ==================== CONNECTION POOL ====================
+
+# Idle read connections kept open per database
+POOL_SIZE = 4
+
+
+class _PooledConnection:
+    """Connection handed out by a ConnectionPool, close() gives it back"""
+
+    def __init__(self, release: Callable[[sqlite3.Connection], None], conn: sqlite3.Connection):
+        self._release = release
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError('Cannot operate on a closed database.')
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        # Given back on errors too, a failed write must not keep the writer locked
+        self.close()
+
+
+class _BorrowedConnection:
+    """Connection already handed out to this thread, close() keeps it open"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class ConnectionPool:
+    """
+    Connections to one database file in WAL mode
+    All writes go through a single writer connection that one caller
+    holds at a time. Reads use read-only connections that see the last
+    committed data and neither wait for the writer nor delay it. Up to
+    size idle readers are kept, more are opened when needed and closed
+    when given back. close() releases them all, e.g. when switching
+    workspaces.
+    """
+
+    def __init__(self, path: str, size: int = POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._writer_owner = None
+
+    def _open(self) -> sqlite3.Connection:
+        # Given back from any thread, so not bound to the opening one
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def acquire(self) -> _PooledConnection:
+        """Get a read-only connection"""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._open()
+            conn.execute('PRAGMA query_only = ON')
+        return _PooledConnection(self.release, conn)
+
+    def release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if not self._closed and len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def writer(self):
+        """Get the write connection, waits while another thread holds it"""
+        if self._writer_owner == threading.get_ident():
+            # Nested write on the same thread, the outer caller commits and closes
+            return _BorrowedConnection(self._writer)
+        self._writer_lock.acquire()
+        self._writer_owner = threading.get_ident()
+        if self._writer is None:
+            try:
+                self._writer = self._open()
+                # Persistent, readers stop blocking the writer and each other
+                self._writer.execute('PRAGMA journal_mode = WAL')
+                self._writer.execute('PRAGMA synchronous = NORMAL')
+            except Exception:
+                self._writer = None
+                self._writer_owner = None
+                self._writer_lock.release()
+                raise
+        return _PooledConnection(self._release_writer, self._writer)
+
+    def _release_writer(self, conn: sqlite3.Connection):
+        # Uncommitted changes are dropped, like closing the connection did
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._closed:
+                conn.close()
+                self._writer = None
+        finally:
+            self._writer_owner = None
+            self._writer_lock.release()
+
+    def close(self):
+        """Close idle connections, ones in use are closed when given back"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+        if self._writer_lock.acquire(blocking=False):
+            try:
+                if self._writer is not None:
+                    self._writer.close()
+                    self._writer = None
+            finally:
+                self._writer_lock.release()
+
+
+# Pool of the active database (see use_database)
+_pool = ConnectionPool(DATABASE_PATH)
+
+
 def get_connection():
-    """Get database connection with row factory"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """
+    Get the write connection with row factory, close() or the end of a
+    with block hands it to the next writer
+    """
+    return _pool.writer()
+
+
+def get_read_connection():
+    """Get a read-only connection with row factory, close() returns it to the pool"""
+    snapshot = getattr(_snapshot, 'connection', None)
+    if snapshot is not None:
+        return snapshot
+    return _pool.acquire()
+
+
+# Connection shared by the reads of a read_snapshot() block, per thread
+_snapshot = threading.local()
+
+
+@contextmanager
+def read_snapshot():
+    """
+    Run the reads of the block on one connection in one transaction,
+    so they see the same data and check out a connection only once.
+    Writes are not blocked and stay invisible until the block ends.
+    """
+    if getattr(_snapshot, 'connection', None) is not None:
+        yield
+        return
+    conn = _pool.acquire()
+    conn.execute('BEGIN')
+    _snapshot.connection = _BorrowedConnection(conn)
+    try:
+        yield
+    finally:
+        _snapshot.connection = None
+        conn.rollback()
+        conn.close()
+
+
+# ==================== CHANGE NOTIFICATIONS ====================
+
+# Callbacks called as callback(kind, item_id) after data changes
+_change_listeners = []
+# Number of changes per kind, lets caches tell whether their data is current
+_change_versions = {}
+_change_versions_lock = threading.Lock()
+
+
+def add_change_listener(callback):
+    """Register a callback for data changes (used to invalidate caches)"""
+    _change_listeners.append(callback)
+
+
+def get_change_version(*kinds: str) -> tuple:
+    """
+    Get the change counters of the given kinds (and of 'database')
+    The tuple differs whenever data of one of these kinds has changed
+    """
+    with _change_versions_lock:
+        return tuple(_change_versions.get(kind, 0) for kind in ('database',) + kinds)
+
+
+def notify_change(kind: str, item_id: Any = None):
+    """Inform listeners that an item of the given kind has changed"""
+    with _change_versions_lock:
+        _change_versions[kind] = _change_versions.get(kind, 0) + 1
+    for callback in list(_change_listeners):
+        try:
+            callback(kind, item_id)
+        except Exception as e:
+            print(f"Error in change listener: {e}")
 
 
 def init_database():
     """Initialize the database with required tables"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    # Messages table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS messages (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            trigger_key TEXT,
-            is_favorite INTEGER DEFAULT 0,
-            last_used_at TIMESTAMP,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Templates table (linked to messages)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS templates (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            message_id INTEGER NOT NULL,
-            content TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (message_id) REFERENCES messages(id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Patterns table (for pattern lists like emoji, greetings, etc.)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS patterns (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Pattern items table (individual items in a pattern list)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS pattern_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            pattern_id INTEGER NOT NULL,
-            value TEXT NOT NULL,
-            FOREIGN KEY (pattern_id) REFERENCES patterns(id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Settings table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT NOT NULL
-        )
-    ''')
-    
-    # Activity logs table (for tracking all activities)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS activity_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            activity_type TEXT NOT NULL,
-            item_type TEXT NOT NULL,
-            item_id INTEGER,
-            item_name TEXT NOT NULL,
-            details TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Legacy message_logs table (keep for migration)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS message_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            message_id INTEGER NOT NULL,
-            message_name TEXT NOT NULL,
-            sent_text TEXT,
-            target_window TEXT,
-            sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (message_id) REFERENCES messages(id) ON DELETE SET NULL
-        )
-    ''')
-    
-    # Tips table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tips (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            content TEXT NOT NULL,
-            is_active INTEGER DEFAULT 1
-        )
-    ''')
-    
-    # Combinations table (for sequential message sending)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS combinations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            trigger_key TEXT,
-            delay_ms INTEGER DEFAULT 500,
-            is_favorite INTEGER DEFAULT 0,
-            last_used_at TIMESTAMP,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Combination items table (ordered messages in a combination)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS combination_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            combination_id INTEGER NOT NULL,
-            message_id INTEGER NOT NULL,
-            order_index INTEGER NOT NULL,
-            FOREIGN KEY (combination_id) REFERENCES combinations(id) ON DELETE CASCADE,
-            FOREIGN KEY (message_id) REFERENCES messages(id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Initialize default settings
-    default_settings = {
-        'click_delay': '150',
-        'enter_enabled': 'true',
-        'click_delay': '150',
-        'enter_enabled': 'true',
-        'combination_delay': '500',
-        'icon_only_mode': 'false'
-    }
-    
-    for key, value in default_settings.items():
-        cursor.execute('''
-            INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)
-        ''', (key, value))
-    
-    # Initialize default tips
-    default_tips = [
-        '{kalip} şeklinde kalıplar kullanarak mesajlarınızı çeşitlendirebilirsiniz!',
-        'Bir mesaja birden fazla template ekleyerek her seferinde farklı mesaj gönderin.',
-        'Hotkey atayarak tek tuşla mesaj gönderebilirsiniz.',
-        'Pencere hedefleme ile sadece belirli uygulamalarda çalışın.',
-        'Overlay modunu kullanarak kompakt arayüzle hızlı erişim sağlayın.',
-        'Enter ile gönderimi kapatarak mesajı sadece yazabilirsiniz.',
-        'Kalıplara emoji ekleyerek mesajlarınızı renklendirebilirsiniz! 🎉',
-        'Aynı hotkey\'i birden fazla mesaja atamaktan kaçının.'
-    ]
-    
-    cursor.execute('SELECT COUNT(*) FROM tips')
-    if cursor.fetchone()[0] == 0:
-        for tip in default_tips:
-            cursor.execute('INSERT INTO tips (content) VALUES (?)', (tip,))
-    
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Messages table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                trigger_key TEXT,
+                is_favorite INTEGER DEFAULT 0,
+                last_used_at TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Templates table (linked to messages)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS templates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                message_id INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (message_id) REFERENCES messages(id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Patterns table (for pattern lists like emoji, greetings, etc.)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS patterns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Pattern items table (individual items in a pattern list)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pattern_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                pattern_id INTEGER NOT NULL,
+                value TEXT NOT NULL,
+                FOREIGN KEY (pattern_id) REFERENCES patterns(id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Settings table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        ''')
+        
+        # Activity logs table (for tracking all activities)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS activity_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                activity_type TEXT NOT NULL,
+                item_type TEXT NOT NULL,
+                item_id INTEGER,
+                item_name TEXT NOT NULL,
+                details TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Legacy message_logs table (keep for migration)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS message_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                message_id INTEGER NOT NULL,
+                message_name TEXT NOT NULL,
+                sent_text TEXT,
+                target_window TEXT,
+                sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (message_id) REFERENCES messages(id) ON DELETE SET NULL
+            )
+        ''')
+        
+        # Tips table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tips (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content TEXT NOT NULL,
+                is_active INTEGER DEFAULT 1
+            )
+        ''')
+        
+        # Combinations table (for sequential message sending)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS combinations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                trigger_key TEXT,
+                delay_ms INTEGER DEFAULT 500,
+                is_favorite INTEGER DEFAULT 0,
+                last_used_at TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Combination items table (ordered messages in a combination)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS combination_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                combination_id INTEGER NOT NULL,
+                message_id INTEGER NOT NULL,
+                order_index INTEGER NOT NULL,
+                FOREIGN KEY (combination_id) REFERENCES combinations(id) ON DELETE CASCADE,
+                FOREIGN KEY (message_id) REFERENCES messages(id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Window rules table (hotkey bindings limited to matching windows)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS window_rules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                window_pattern TEXT NOT NULL,
+                trigger_key TEXT,
+                item_type TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                priority INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Scheduled jobs table (delayed and repeating sends)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                item_type TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                run_at REAL NOT NULL,
+                interval_ms INTEGER,
+                is_active INTEGER DEFAULT 1,
+                last_run_at REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_active ON scheduled_jobs (is_active, run_at)
+        ''')
+
+        # Distinct target window titles of sends and their application
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS window_titles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL UNIQUE,
+                app TEXT NOT NULL
+            )
+        ''')
+
+        # Sends per day and window, kept up to date by log_activity
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS window_daily_sends (
+                day TEXT NOT NULL,
+                window_id INTEGER NOT NULL,
+                sends INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, window_id)
+            )
+        ''')
+
+        # Sends per local hour (local wall-clock seconds since 1970 // 3600, see local_hour), in total
+        # and per item, kept up to date by log_activity
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hourly_sends'")
+        backfill_hourly = cursor.fetchone() is None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS hourly_sends (
+                hour INTEGER PRIMARY KEY,
+                sends INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS hourly_item_sends (
+                item_type TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                hour INTEGER NOT NULL,
+                sends INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (item_type, item_id, hour)
+            )
+        ''')
+
+        # Pattern names referenced by each template (see set_template_refs)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'template_pattern_refs'")
+        backfill_pattern_refs = cursor.fetchone() is None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS template_pattern_refs (
+                template_id INTEGER NOT NULL,
+                message_id INTEGER NOT NULL,
+                pattern_name TEXT NOT NULL,
+                PRIMARY KEY (template_id, pattern_name),
+                FOREIGN KEY (template_id) REFERENCES templates(id) ON DELETE CASCADE
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_template_pattern_refs_pattern
+            ON template_pattern_refs (pattern_name, message_id)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_template_pattern_refs_message
+            ON template_pattern_refs (message_id)
+        ''')
+
+        # Child rows are looked up by parent on every send
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_templates_message ON templates (message_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pattern_items_pattern ON pattern_items (pattern_id)')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_combination_items_combination
+            ON combination_items (combination_id, order_index)
+        ''')
+
+        # Initialize default settings
+        default_settings = {
+            'click_delay': '150',
+            'enter_enabled': 'true',
+            'click_delay': '150',
+            'enter_enabled': 'true',
+            'combination_delay': '500',
+            'icon_only_mode': 'false',
+            'delivery_mode': 'auto',
+            'type_max_length': '80',
+            'restore_clipboard': 'true'
+        }
+        
+        for key, value in default_settings.items():
+            cursor.execute('''
+                INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)
+            ''', (key, value))
+        
+        # Initialize default tips
+        default_tips = [
+            '{kalip} şeklinde kalıplar kullanarak mesajlarınızı çeşitlendirebilirsiniz!',
+            'Bir mesaja birden fazla template ekleyerek her seferinde farklı mesaj gönderin.',
+            'Hotkey atayarak tek tuşla mesaj gönderebilirsiniz.',
+            'Pencere hedefleme ile sadece belirli uygulamalarda çalışın.',
+            'Overlay modunu kullanarak kompakt arayüzle hızlı erişim sağlayın.',
+            'Enter ile gönderimi kapatarak mesajı sadece yazabilirsiniz.',
+            'Kalıplara emoji ekleyerek mesajlarınızı renklendirebilirsiniz! 🎉',
+            'Aynı hotkey\'i birden fazla mesaja atamaktan kaçının.'
+        ]
+        
+        cursor.execute('SELECT COUNT(*) FROM tips')
+        if cursor.fetchone()[0] == 0:
+            for tip in default_tips:
+                cursor.execute('INSERT INTO tips (content) VALUES (?)', (tip,))
+        
+        conn.commit()
     
     # Run migrations for existing databases
     migrate_database()
 
+    if backfill_pattern_refs:
+        rebuild_pattern_refs()
 
-def migrate_database():
-    """Add new columns to existing tables if they don't exist"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    # Check and add is_favorite column to messages
-    cursor.execute("PRAGMA table_info(messages)")
-    columns = [col[1] for col in cursor.fetchall()]
-    
-    if 'is_favorite' not in columns:
-        cursor.execute('ALTER TABLE messages ADD COLUMN is_favorite INTEGER DEFAULT 0')
-    
-    if 'last_used_at' not in columns:
-        cursor.execute('ALTER TABLE messages ADD COLUMN last_used_at TIMESTAMP')
-    
-    if 'icon' not in columns:
-        cursor.execute('ALTER TABLE messages ADD COLUMN icon TEXT')
+    if backfill_hourly:
+        rebuild_hourly_stats()
 
-    # Check and add icon column to combinations
-    cursor.execute("PRAGMA table_info(combinations)")
-    combo_columns = [col[1] for col in cursor.fetchall()]
 
-    if 'icon' not in combo_columns:
-        cursor.execute('ALTER TABLE combinations ADD COLUMN icon TEXT')
-    
-    conn.commit()
-    conn.close()
+def migrate_database():
+    """Add new columns to existing tables if they don't exist"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Check and add is_favorite column to messages
+        cursor.execute("PRAGMA table_info(messages)")
+        columns = [col[1] for col in cursor.fetchall()]
+        
+        if 'is_favorite' not in columns:
+            cursor.execute('ALTER TABLE messages ADD COLUMN is_favorite INTEGER DEFAULT 0')
+        
+        if 'last_used_at' not in columns:
+            cursor.execute('ALTER TABLE messages ADD COLUMN last_used_at TIMESTAMP')
+        
+        if 'icon' not in columns:
+            cursor.execute('ALTER TABLE messages ADD COLUMN icon TEXT')
+
+        # Check and add icon column to combinations
+        cursor.execute("PRAGMA table_info(combinations)")
+        combo_columns = [col[1] for col in cursor.fetchall()]
+
+        if 'icon' not in combo_columns:
+            cursor.execute('ALTER TABLE combinations ADD COLUMN icon TEXT')
+        
+        if 'timing' not in combo_columns:
+            cursor.execute('ALTER TABLE combinations ADD COLUMN timing TEXT')
+
+        # Check and add window_id column to activity_logs (target window of sends)
+        cursor.execute("PRAGMA table_info(activity_logs)")
+        log_columns = [col[1] for col in cursor.fetchall()]
+
+        backfill_windows = 'window_id' not in log_columns
+        if backfill_windows:
+            cursor.execute('ALTER TABLE activity_logs ADD COLUMN window_id INTEGER')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_activity_logs_window ON activity_logs(window_id, created_at)')
+
+        # Check and add source_path column to patterns (values read from a text file)
+        cursor.execute("PRAGMA table_info(patterns)")
+        pattern_columns = [col[1] for col in cursor.fetchall()]
+
+        if 'source_path' not in pattern_columns:
+            cursor.execute('ALTER TABLE patterns ADD COLUMN source_path TEXT')
+
+        # Frecency (see frecency_add), indexed for top-N queries
+        backfill_frecency = 'frecency' not in columns
+        if backfill_frecency:
+            cursor.execute('ALTER TABLE messages ADD COLUMN frecency REAL')
+        if 'frecency' not in combo_columns:
+            cursor.execute('ALTER TABLE combinations ADD COLUMN frecency REAL')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_frecency ON messages(frecency)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_combinations_frecency ON combinations(frecency)')
+        
+        conn.commit()
+
+    if backfill_frecency:
+        rebuild_frecency()
+    if backfill_windows:
+        rebuild_window_stats()
+
+
+def use_database(path: str):
+    """
+    Switch to another database file, creating its tables if needed
+    Connections to the previous file are closed and caches are dropped
+    through the 'database' change
+    """
+    global DATABASE_PATH, _pool
+    previous = _pool
+    DATABASE_PATH = path
+    _pool = ConnectionPool(path)
+    previous.close()
+    init_database()
+    notify_change('database')
 
 
 # ==================== MESSAGE OPERATIONS ====================
 
 def get_all_messages() -> List[Dict]:
     """Get all messages with their templates"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM messages ORDER BY created_at DESC')
-    messages = cursor.fetchall()
-    
-    result = []
-    for msg in messages:
-        msg_dict = dict(msg)
-        cursor.execute('SELECT * FROM templates WHERE message_id = ?', (msg['id'],))
-        msg_dict['templates'] = [dict(t) for t in cursor.fetchall()]
-        result.append(msg_dict)
-    
+    result = [dict(msg) for msg in cursor.fetchall()]
+
+    # One pass over all templates instead of a query per message
+    templates = {msg['id']: [] for msg in result}
+    cursor.execute('SELECT * FROM templates ORDER BY message_id, id')
+    for t in cursor.fetchall():
+        if t['message_id'] in templates:
+            templates[t['message_id']].append(dict(t))
+    for msg in result:
+        msg['templates'] = templates[msg['id']]
+
     conn.close()
     return result
 
 
+def _attach_templates(cursor, messages: List[Dict]):
+    """Load the templates of the given messages in batches"""
+    templates = {msg['id']: [] for msg in messages}
+    ids = list(templates)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ','.join('?' * len(chunk))
+        cursor.execute(f'SELECT * FROM templates WHERE message_id IN ({placeholders}) ORDER BY message_id, id',
+                       chunk)
+        for t in cursor.fetchall():
+            templates[t['message_id']].append(dict(t))
+    for msg in messages:
+        msg['templates'] = templates[msg['id']]
+
+
 def search_messages(query: str) -> List[Dict]:
     """Search messages by name or template content"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -264,81 +660,108 @@ def search_messages(query: str) -> List[Dict]:
         WHERE m.name LIKE ? OR t.content LIKE ?
         ORDER BY m.created_at DESC
     ''', (f'%{query}%', f'%{query}%'))
-    
-    messages = cursor.fetchall()
-    
-    result = []
-    for msg in messages:
-        msg_dict = dict(msg)
-        cursor.execute('SELECT * FROM templates WHERE message_id = ?', (msg['id'],))
-        msg_dict['templates'] = [dict(t) for t in cursor.fetchall()]
-        result.append(msg_dict)
-    
+
+    result = [dict(msg) for msg in cursor.fetchall()]
+    _attach_templates(cursor, result)
+
     conn.close()
     return result
 
 
 def create_message(name: str, templates: List[str], trigger_key: str = None, icon: str = None) -> int:
     """Create a new message with templates"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        'INSERT INTO messages (name, trigger_key, icon) VALUES (?, ?, ?)',
-        (name, trigger_key, icon)
-    )
-    message_id = cursor.lastrowid
-    
-    for template in templates:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
         cursor.execute(
-            'INSERT INTO templates (message_id, content) VALUES (?, ?)',
-            (message_id, template)
+            'INSERT INTO messages (name, trigger_key, icon) VALUES (?, ?, ?)',
+            (name, trigger_key, icon)
         )
-    
-    conn.commit()
-    conn.close()
+        message_id = cursor.lastrowid
+        
+        for template in templates:
+            cursor.execute(
+                'INSERT INTO templates (message_id, content) VALUES (?, ?)',
+                (message_id, template)
+            )
+            set_template_refs(cursor, cursor.lastrowid, message_id, template)
+        
+        conn.commit()
+    notify_change('message', message_id)
     return message_id
 
 
 def update_message(message_id: int, name: str, templates: List[str], trigger_key: str = None, icon: str = None) -> bool:
     """Update an existing message and its templates"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        'UPDATE messages SET name = ?, trigger_key = ?, icon = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
-        (name, trigger_key, icon, message_id)
-    )
-    
-    # Delete existing templates and add new ones
-    cursor.execute('DELETE FROM templates WHERE message_id = ?', (message_id,))
-    
-    for template in templates:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
         cursor.execute(
-            'INSERT INTO templates (message_id, content) VALUES (?, ?)',
-            (message_id, template)
+            'UPDATE messages SET name = ?, trigger_key = ?, icon = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (name, trigger_key, icon, message_id)
         )
-    
-    conn.commit()
-    conn.close()
+        
+        # Delete existing templates and add new ones
+        cursor.execute('DELETE FROM templates WHERE message_id = ?', (message_id,))
+        cursor.execute('DELETE FROM template_pattern_refs WHERE message_id = ?', (message_id,))
+        
+        for template in templates:
+            cursor.execute(
+                'INSERT INTO templates (message_id, content) VALUES (?, ?)',
+                (message_id, template)
+            )
+            set_template_refs(cursor, cursor.lastrowid, message_id, template)
+        
+        conn.commit()
+    notify_change('message', message_id)
     return True
 
 
 def delete_message(message_id: int) -> bool:
     """Delete a message and its templates"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM messages WHERE id = ?', (message_id,))
-    
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM messages WHERE id = ?', (message_id,))
+        cursor.execute('DELETE FROM template_pattern_refs WHERE message_id = ?', (message_id,))
+        
+        conn.commit()
+    notify_change('message', message_id)
     return True
 
 
+def set_template_refs(cursor, template_id: int, message_id: int, content: str):
+    """Record the {pattern} placeholders of a new template (inside the caller's transaction)"""
+    cursor.executemany(
+        'INSERT OR IGNORE INTO template_pattern_refs (template_id, message_id, pattern_name) VALUES (?, ?, ?)',
+        [(template_id, message_id, name) for name in rendering.template_pattern_names(content)]
+    )
+
+
+def rebuild_pattern_refs():
+    """Rebuild template_pattern_refs from the templates of all messages"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM template_pattern_refs')
+        cursor.execute('''
+            SELECT t.id, t.message_id, t.content FROM templates t
+            JOIN messages m ON m.id = t.message_id
+        ''')
+        refs = [(template_id, message_id, name)
+                for template_id, message_id, content in cursor.fetchall()
+                for name in rendering.template_pattern_names(content)]
+        cursor.executemany(
+            'INSERT OR IGNORE INTO template_pattern_refs (template_id, message_id, pattern_name) VALUES (?, ?, ?)',
+            refs
+        )
+        
+        conn.commit()
+
+
 def get_message_by_id(message_id: int) -> Optional[Dict]:
     """Get a single message by ID"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM messages WHERE id = ?', (message_id,))
@@ -360,78 +783,81 @@ def get_message_by_id(message_id: int) -> Optional[Dict]:
 
 def get_all_patterns() -> List[Dict]:
     """Get all patterns with their items"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM patterns ORDER BY name')
-    patterns = cursor.fetchall()
-    
-    result = []
-    for pattern in patterns:
-        pattern_dict = dict(pattern)
-        cursor.execute('SELECT * FROM pattern_items WHERE pattern_id = ?', (pattern['id'],))
-        pattern_dict['items'] = [dict(item) for item in cursor.fetchall()]
-        result.append(pattern_dict)
-    
+    result = [dict(pattern) for pattern in cursor.fetchall()]
+
+    # One pass over all items instead of a query per pattern
+    items = {pattern['id']: [] for pattern in result}
+    cursor.execute('SELECT * FROM pattern_items ORDER BY pattern_id, id')
+    for item in cursor.fetchall():
+        if item['pattern_id'] in items:
+            items[item['pattern_id']].append(dict(item))
+    for pattern in result:
+        pattern['items'] = items[pattern['id']]
+
     conn.close()
     return result
 
 
-def create_pattern(name: str, items: List[str]) -> int:
-    """Create a new pattern with items"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('INSERT INTO patterns (name) VALUES (?)', (name,))
-    pattern_id = cursor.lastrowid
-    
-    for item in items:
-        cursor.execute(
-            'INSERT INTO pattern_items (pattern_id, value) VALUES (?, ?)',
-            (pattern_id, item)
-        )
-    
-    conn.commit()
-    conn.close()
+def create_pattern(name: str, items: List[str], source_path: str = None) -> int:
+    """Create a new pattern with items, or reading its values from source_path"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('INSERT INTO patterns (name, source_path) VALUES (?, ?)', (name, source_path or None))
+        pattern_id = cursor.lastrowid
+        
+        for item in items:
+            cursor.execute(
+                'INSERT INTO pattern_items (pattern_id, value) VALUES (?, ?)',
+                (pattern_id, item)
+            )
+        
+        conn.commit()
+    notify_change('pattern', pattern_id)
     return pattern_id
 
 
-def update_pattern(pattern_id: int, name: str, items: List[str]) -> bool:
+def update_pattern(pattern_id: int, name: str, items: List[str], source_path: str = None) -> bool:
     """Update an existing pattern and its items"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('UPDATE patterns SET name = ? WHERE id = ?', (name, pattern_id))
-    
-    # Delete existing items and add new ones
-    cursor.execute('DELETE FROM pattern_items WHERE pattern_id = ?', (pattern_id,))
-    
-    for item in items:
-        cursor.execute(
-            'INSERT INTO pattern_items (pattern_id, value) VALUES (?, ?)',
-            (pattern_id, item)
-        )
-    
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('UPDATE patterns SET name = ?, source_path = ? WHERE id = ?',
+                       (name, source_path or None, pattern_id))
+        
+        # Delete existing items and add new ones
+        cursor.execute('DELETE FROM pattern_items WHERE pattern_id = ?', (pattern_id,))
+        
+        for item in items:
+            cursor.execute(
+                'INSERT INTO pattern_items (pattern_id, value) VALUES (?, ?)',
+                (pattern_id, item)
+            )
+        
+        conn.commit()
+    notify_change('pattern', pattern_id)
     return True
 
 
 def delete_pattern(pattern_id: int) -> bool:
     """Delete a pattern and its items"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM patterns WHERE id = ?', (pattern_id,))
-    
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM patterns WHERE id = ?', (pattern_id,))
+        
+        conn.commit()
+    notify_change('pattern', pattern_id)
     return True
 
 
 def get_pattern_by_name(name: str) -> Optional[Dict]:
     """Get a pattern by name"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM patterns WHERE name = ?', (name,))
@@ -451,7 +877,7 @@ def get_pattern_by_name(name: str) -> Optional[Dict]:
 
 def get_pattern_by_name_or_id(pattern_id: int) -> Optional[Dict]:
     """Get a pattern by ID"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM patterns WHERE id = ?', (pattern_id,))
@@ -469,11 +895,41 @@ def get_pattern_by_name_or_id(pattern_id: int) -> Optional[Dict]:
     return pattern_dict
 
 
+def get_packed_patterns(pattern_id: int = None) -> List[tuple]:
+    """
+    Get (id, name, values) of all patterns, or of one, for rendering
+    Values are streamed into a rendering.PatternValues instead of a dict
+    per item, so patterns with many items stay small in memory. Patterns
+    with a source_path get the indexed lines of that file instead
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    
+    if pattern_id is None:
+        cursor.execute('SELECT id, name, source_path FROM patterns ORDER BY name')
+    else:
+        cursor.execute('SELECT id, name, source_path FROM patterns WHERE id = ?', (pattern_id,))
+    patterns = cursor.fetchall()
+    
+    # Plain tuples, a Row per item costs more than the value itself
+    cursor.row_factory = None
+    result = []
+    for pattern in patterns:
+        if pattern['source_path']:
+            result.append((pattern['id'], pattern['name'], rendering.file_pattern(pattern['source_path'])))
+            continue
+        cursor.execute('SELECT value FROM pattern_items WHERE pattern_id = ? ORDER BY id', (pattern['id'],))
+        result.append((pattern['id'], pattern['name'], rendering.PatternValues(row[0] for row in cursor)))
+    
+    conn.close()
+    return result
+
+
 # ==================== SETTINGS OPERATIONS ====================
 
 def get_settings() -> Dict[str, str]:
     """Get all settings"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM settings')
@@ -485,16 +941,16 @@ def get_settings() -> Dict[str, str]:
 
 def update_setting(key: str, value: str) -> bool:
     """Update a setting value"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
-        (key, value)
-    )
-    
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+            (key, value)
+        )
+        
+        conn.commit()
+    notify_change('setting', key)
     return True
 
 
@@ -502,7 +958,7 @@ def update_setting(key: str, value: str) -> bool:
 
 def get_dashboard_stats() -> Dict:
     """Get statistics for dashboard"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     # Total messages
@@ -574,7 +1030,7 @@ def get_dashboard_stats() -> Dict:
 
 def get_period_stats(days: int = 7) -> List[Dict]:
     """Get daily message counts for the specified period"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -592,7 +1048,7 @@ def get_period_stats(days: int = 7) -> List[Dict]:
 
 def get_period_total(days: int = 7) -> int:
     """Get total sent messages for the specified period"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     if days == 1:  # Today
@@ -613,24 +1069,40 @@ def get_period_total(days: int = 7) -> int:
 
 def log_activity(activity_type: str, item_type: str, item_id: int, item_name: str, details: str = None) -> int:
     """Log an activity (sent, created, edited, deleted)"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO activity_logs (activity_type, item_type, item_id, item_name, details)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (activity_type, item_type, item_id, item_name, details))
-    
-    log_id = cursor.lastrowid
-    
-    # If message was sent, update last_used_at
-    if activity_type == 'sent' and item_type == 'message':
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        # The details of a send are its target window
+        window_id = _window_id(cursor, details) if activity_type == 'sent' and details else None
         cursor.execute('''
-            UPDATE messages SET last_used_at = CURRENT_TIMESTAMP WHERE id = ?
-        ''', (item_id,))
-    
-    conn.commit()
-    conn.close()
+            INSERT INTO activity_logs (activity_type, item_type, item_id, item_name, details, window_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (activity_type, item_type, item_id, item_name, details, window_id))
+        
+        log_id = cursor.lastrowid
+        
+        if window_id is not None:
+            cursor.execute('''
+                INSERT INTO window_daily_sends (day, window_id, sends) VALUES (date('now', 'localtime'), ?, 1)
+                ON CONFLICT (day, window_id) DO UPDATE SET sends = sends + 1
+            ''', (window_id,))
+        if activity_type == 'sent':
+            _record_hour(cursor, item_type, item_id, local_hour(time.time()))
+        
+        # If message was sent, update last_used_at
+        if activity_type == 'sent' and item_type == 'message':
+            cursor.execute('''
+                UPDATE messages SET last_used_at = CURRENT_TIMESTAMP WHERE id = ?
+            ''', (item_id,))
+
+        # Sends raise the frecency of the message or combination
+        used = activity_type == 'sent' and item_type in FRECENCY_TABLES
+        if used:
+            _record_use(cursor, FRECENCY_TABLES[item_type], item_id, time.time())
+
+        conn.commit()
+    if used:
+        notify_change(f'{item_type}_usage', item_id)
     return log_id
 
 
@@ -642,7 +1114,7 @@ def log_message_sent(message_id: int, message_name: str, sent_text: str, target_
 
 def get_recent_logs(limit: int = 20) -> List[Dict]:
     """Get recent activity logs"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -656,9 +1128,255 @@ def get_recent_logs(limit: int = 20) -> List[Dict]:
     return logs
 
 
+# ==================== WINDOW STATS ====================
+
+def _window_id(cursor, title: str) -> int:
+    """Get the id of a window title, adding it (inside the caller's write transaction)"""
+    cursor.execute('INSERT OR IGNORE INTO window_titles (title, app) VALUES (?, ?)',
+                   (title, windows.app_name(title)))
+    cursor.execute('SELECT id FROM window_titles WHERE title = ?', (title,))
+    return cursor.fetchone()[0]
+
+
+def rebuild_window_stats():
+    """Link sends to their window titles and recount the daily rollup from the activity log"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT DISTINCT details FROM activity_logs
+            WHERE activity_type = 'sent' AND details IS NOT NULL AND details != ''
+        ''')
+        cursor.executemany('INSERT OR IGNORE INTO window_titles (title, app) VALUES (?, ?)',
+                           [(row[0], windows.app_name(row[0])) for row in cursor.fetchall()])
+        # Building the index again afterwards is faster than updating it row by row
+        cursor.execute('DROP INDEX IF EXISTS idx_activity_logs_window')
+        cursor.execute('''
+            UPDATE activity_logs SET window_id = (SELECT id FROM window_titles WHERE title = activity_logs.details)
+            WHERE activity_type = 'sent' AND details IS NOT NULL AND details != ''
+        ''')
+        cursor.execute('CREATE INDEX idx_activity_logs_window ON activity_logs(window_id, created_at)')
+
+        cursor.execute('DELETE FROM window_daily_sends')
+        cursor.execute('''
+            INSERT INTO window_daily_sends (day, window_id, sends)
+            SELECT date(created_at, 'localtime'), window_id, COUNT(*) FROM activity_logs
+            WHERE activity_type = 'sent' AND window_id IS NOT NULL
+            GROUP BY date(created_at, 'localtime'), window_id
+        ''')
+
+        conn.commit()
+
+
+def get_window_stats(days: int = 7, group: str = 'app') -> List[Dict]:
+    """
+    Get sends per application (group='app') or window title (group='title')
+    over the last days days, read from the daily rollup
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    column = 'w.title' if group == 'title' else 'w.app'
+    cursor.execute(f'''
+        SELECT {column} as name, SUM(s.sends) as count
+        FROM window_daily_sends s
+        JOIN window_titles w ON w.id = s.window_id
+        WHERE s.day >= date('now', ? || ' days', 'localtime')
+        GROUP BY {column}
+        ORDER BY count DESC, name
+    ''', (f'-{days}',))
+
+    results = [{'name': row[0], 'count': row[1]} for row in cursor.fetchall()]
+    conn.close()
+    return results
+
+
+# ==================== HEATMAP ====================
+
+def local_seconds(epoch: float) -> float:
+    """Seconds since 1970-01-01 00:00 of local wall-clock time at the epoch time"""
+    return epoch + time.localtime(epoch).tm_gmtoff
+
+
+def local_hour(epoch: float) -> int:
+    """
+    Key of the hourly rollups for an epoch time
+    Binned in local time when written, so zones with half-hour offsets
+    (e.g. UTC+5:30) count a send in the local hour it happened
+    """
+    return int(local_seconds(epoch) // 3600)
+
+
+def _record_hour(cursor, item_type: str, item_id: int, hour: int):
+    """Count a send in the hourly rollups (inside the caller's write transaction)"""
+    cursor.execute('''
+        INSERT INTO hourly_sends (hour, sends) VALUES (?, 1)
+        ON CONFLICT (hour) DO UPDATE SET sends = sends + 1
+    ''', (hour,))
+    if item_id is not None:
+        cursor.execute('''
+            INSERT INTO hourly_item_sends (item_type, item_id, hour, sends) VALUES (?, ?, ?, 1)
+            ON CONFLICT (item_type, item_id, hour) DO UPDATE SET sends = sends + 1
+        ''', (item_type, item_id, hour))
+
+
+def rebuild_hourly_stats():
+    """Recount the hourly rollups from the sends in the activity log"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('DELETE FROM hourly_sends')
+        cursor.execute('DELETE FROM hourly_item_sends')
+        cursor.execute('''
+            INSERT INTO hourly_item_sends (item_type, item_id, hour, sends)
+            SELECT item_type, item_id, CAST(strftime('%s', created_at, 'localtime') AS INTEGER) / 3600 as hour, COUNT(*)
+            FROM activity_logs
+            WHERE activity_type = 'sent' AND item_id IS NOT NULL AND created_at IS NOT NULL
+            GROUP BY item_type, item_id, hour
+        ''')
+        cursor.execute('''
+            INSERT INTO hourly_sends (hour, sends)
+            SELECT CAST(strftime('%s', created_at, 'localtime') AS INTEGER) / 3600 as hour, COUNT(*)
+            FROM activity_logs
+            WHERE activity_type = 'sent' AND created_at IS NOT NULL
+            GROUP BY hour
+        ''')
+
+        conn.commit()
+
+
+def get_usage_heatmap(start: float, end: float, item_type: str = None, item_id: int = None) -> List[List[int]]:
+    """
+    Get sends between the epoch times start and end binned by local day of
+    week (rows, Monday first) and hour of day (columns), of one item or of
+    all sends. Reads one rollup row per hour of the range
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    # Whole local hours that overlap the range
+    bounds = (local_hour(start), int(-(-local_seconds(end) // 3600)))
+    if item_type is None:
+        source, params = 'hourly_sends WHERE hour >= ? AND hour < ?', bounds
+    else:
+        source = 'hourly_item_sends WHERE item_type = ? AND item_id = ? AND hour >= ? AND hour < ?'
+        params = (item_type, item_id) + bounds
+    cursor.execute(f'''
+        SELECT CAST(strftime('%w', hour * 3600, 'unixepoch') AS INTEGER) as weekday,
+               CAST(strftime('%H', hour * 3600, 'unixepoch') AS INTEGER) as hour_of_day,
+               SUM(sends)
+        FROM {source}
+        GROUP BY weekday, hour_of_day
+    ''', params)
+
+    matrix = [[0] * 24 for _ in range(7)]
+    for weekday, hour_of_day, sends in cursor.fetchall():
+        # SQLite weeks start on Sunday (0)
+        matrix[(weekday + 6) % 7][hour_of_day] = sends
+    conn.close()
+    return matrix
+
+
+# ==================== FRECENCY ====================
+
+# A use loses half of its weight every FRECENCY_HALF_LIFE seconds
+FRECENCY_HALF_LIFE = 7 * 24 * 3600
+FRECENCY_RATE = math.log(2) / FRECENCY_HALF_LIFE
+
+# Item types ranked by frecency and their tables
+FRECENCY_TABLES = {'message': 'messages', 'combination': 'combinations'}
+
+
+def frecency_add(value: Optional[float], used_at: float) -> float:
+    """
+    Add a use at used_at (unix time) to a stored frecency value
+
+    The stored value is log(sum(exp(FRECENCY_RATE * t))) over the use
+    times t. The decayed score at any time is exp(value - rate * now), so
+    values never need to be decayed in place and ordering by the stored
+    value is ordering by the current score.
+    """
+    x = FRECENCY_RATE * used_at
+    if value is None:
+        return x
+    high, low = max(value, x), min(value, x)
+    return high + math.log1p(math.exp(low - high))
+
+
+def frecency_score(value: Optional[float], now: float = None) -> float:
+    """Decayed number of uses of a stored frecency value at now"""
+    if value is None:
+        return 0.0
+    return math.exp(value - FRECENCY_RATE * (time.time() if now is None else now))
+
+
+def _record_use(cursor, table: str, item_id: int, used_at: float):
+    """Add a use to the frecency of a row (inside the caller's write transaction)"""
+    cursor.execute(f'SELECT frecency FROM {table} WHERE id = ?', (item_id,))
+    row = cursor.fetchone()
+    if row is not None:
+        cursor.execute(f'UPDATE {table} SET frecency = ? WHERE id = ?',
+                       (frecency_add(row[0], used_at), item_id))
+
+
+def rebuild_frecency():
+    """Recompute all frecency values from the sends in the activity log"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        values = {}
+        cursor.execute('''
+            SELECT item_type, item_id, CAST(strftime('%s', created_at) AS INTEGER)
+            FROM activity_logs
+            WHERE activity_type = 'sent' AND item_type IN ('message', 'combination')
+        ''')
+        for item_type, item_id, used_at in cursor:
+            if used_at is not None:
+                values[(item_type, item_id)] = frecency_add(values.get((item_type, item_id)), used_at)
+
+        for item_type, table in FRECENCY_TABLES.items():
+            cursor.execute(f'UPDATE {table} SET frecency = NULL')
+            cursor.executemany(f'UPDATE {table} SET frecency = ? WHERE id = ?',
+                               [(value, item_id) for (kind, item_id), value in values.items() if kind == item_type])
+
+        conn.commit()
+    for item_type in FRECENCY_TABLES:
+        notify_change(f'{item_type}_usage')
+
+
+def get_top_items(limit: int = 10, item_type: str = None) -> List[Dict]:
+    """
+    Get the messages and combinations with the highest frecency
+    Reads at most limit rows per table through the frecency indexes
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    now = time.time()
+    result = []
+    for kind, table in FRECENCY_TABLES.items():
+        if item_type and item_type != kind:
+            continue
+        cursor.execute(f'''
+            SELECT id, name, trigger_key, icon, is_favorite, last_used_at, frecency FROM {table}
+            WHERE frecency IS NOT NULL
+            ORDER BY frecency DESC
+            LIMIT ?
+        ''', (limit,))
+        for row in cursor.fetchall():
+            item = dict(row)
+            item['item_type'] = kind
+            item['score'] = round(frecency_score(item.pop('frecency'), now), 4)
+            result.append(item)
+
+    conn.close()
+    result.sort(key=lambda item: item['score'], reverse=True)
+    return result[:limit]
+
+
 def get_recent_messages(limit: int = 5) -> List[Dict]:
     """Get recently used messages"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -681,7 +1399,7 @@ def get_recent_messages(limit: int = 5) -> List[Dict]:
 
 def get_favorite_messages() -> List[Dict]:
     """Get favorite messages"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM messages WHERE is_favorite = 1 ORDER BY name')
@@ -698,26 +1416,25 @@ def get_favorite_messages() -> List[Dict]:
 
 def toggle_favorite(message_id: int) -> bool:
     """Toggle favorite status of a message"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT is_favorite FROM messages WHERE id = ?', (message_id,))
-    row = cursor.fetchone()
-    if not row:
-        conn.close()
-        return False
-    
-    new_status = 0 if row[0] == 1 else 1
-    cursor.execute('UPDATE messages SET is_favorite = ? WHERE id = ?', (new_status, message_id))
-    
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT is_favorite FROM messages WHERE id = ?', (message_id,))
+        row = cursor.fetchone()
+        if not row:
+            return False
+        
+        new_status = 0 if row[0] == 1 else 1
+        cursor.execute('UPDATE messages SET is_favorite = ? WHERE id = ?', (new_status, message_id))
+        
+        conn.commit()
+    notify_change('message', message_id)
     return new_status == 1
 
 
 def get_random_tip() -> Optional[str]:
     """Get a random active tip"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('SELECT content FROM tips WHERE is_active = 1 ORDER BY RANDOM() LIMIT 1')
@@ -728,63 +1445,78 @@ def get_random_tip() -> Optional[str]:
 
 
 def get_most_used_patterns(limit: int = 5) -> List[Dict]:
-    """Get patterns sorted by usage in templates"""
-    conn = get_connection()
+    """Get patterns sorted by the number of templates using them"""
+    conn = get_read_connection()
     cursor = conn.cursor()
     
-    # Get all patterns with their items
-    patterns = get_all_patterns()
+    cursor.execute('''
+        SELECT p.name, COALESCE(u.usage_count, 0) AS usage_count,
+               (SELECT COUNT(*) FROM pattern_items i WHERE i.pattern_id = p.id) AS items_count
+        FROM patterns p
+        LEFT JOIN (
+            SELECT pattern_name, COUNT(*) AS usage_count
+            FROM template_pattern_refs
+            GROUP BY pattern_name
+        ) u ON u.pattern_name = p.name
+        ORDER BY usage_count DESC, p.name
+        LIMIT ?
+    ''', (limit,))
+    pattern_usage = [dict(row) for row in cursor.fetchall()]
     
-    # Count usage in templates
-    cursor.execute('SELECT content FROM templates')
-    all_templates = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return pattern_usage
+
+
+def get_pattern_dependents(pattern_name: str) -> List[Dict]:
+    """Get the messages whose templates use a pattern, with the number of such templates"""
+    conn = get_read_connection()
+    cursor = conn.cursor()
     
-    pattern_usage = []
-    for pattern in patterns:
-        count = sum(1 for t in all_templates if '{' + pattern['name'] + '}' in t)
-        pattern_usage.append({
-            'name': pattern['name'],
-            'usage_count': count,
-            'items_count': len(pattern['items'])
-        })
+    cursor.execute('''
+        SELECT m.id, m.name, m.trigger_key, m.icon, COUNT(*) AS template_count
+        FROM template_pattern_refs r
+        JOIN messages m ON m.id = r.message_id
+        WHERE r.pattern_name = ?
+        GROUP BY m.id
+        ORDER BY m.name
+    ''', (pattern_name,))
+    messages = [dict(row) for row in cursor.fetchall()]
     
     conn.close()
-    
-    # Sort by usage and return top N
-    pattern_usage.sort(key=lambda x: x['usage_count'], reverse=True)
-    return pattern_usage[:limit]
+    return messages
 
 
 # ==================== COMBINATION OPERATIONS ====================
 
 def get_all_combinations() -> List[Dict]:
     """Get all combinations with their message items"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM combinations ORDER BY created_at DESC')
-    combinations = cursor.fetchall()
-    
-    result = []
-    for combo in combinations:
-        combo_dict = dict(combo)
-        cursor.execute('''
-            SELECT ci.*, m.name as message_name 
-            FROM combination_items ci
-            JOIN messages m ON ci.message_id = m.id
-            WHERE ci.combination_id = ?
-            ORDER BY ci.order_index
-        ''', (combo['id'],))
-        combo_dict['items'] = [dict(item) for item in cursor.fetchall()]
-        result.append(combo_dict)
-    
+    result = [dict(combo) for combo in cursor.fetchall()]
+
+    # One pass over all items instead of a query per combination
+    items = {combo['id']: [] for combo in result}
+    cursor.execute('''
+        SELECT ci.*, m.name as message_name
+        FROM combination_items ci
+        JOIN messages m ON ci.message_id = m.id
+        ORDER BY ci.combination_id, ci.order_index
+    ''')
+    for item in cursor.fetchall():
+        if item['combination_id'] in items:
+            items[item['combination_id']].append(dict(item))
+    for combo in result:
+        combo['items'] = items[combo['id']]
+
     conn.close()
     return result
 
 
 def get_combination_by_id(combination_id: int) -> Optional[Dict]:
     """Get a single combination by ID"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM combinations WHERE id = ?', (combination_id,))
@@ -808,97 +1540,96 @@ def get_combination_by_id(combination_id: int) -> Optional[Dict]:
     return combo_dict
 
 
-def create_combination(name: str, message_ids: List[int], trigger_key: str = None, delay_ms: int = 500, icon: str = None) -> int:
+def create_combination(name: str, message_ids: List[int], trigger_key: str = None, delay_ms: int = 500, icon: str = None, timing: str = None) -> int:
     """Create a new combination with ordered messages"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        'INSERT INTO combinations (name, trigger_key, delay_ms, icon) VALUES (?, ?, ?, ?)',
-        (name, trigger_key, delay_ms, icon)
-    )
-    combination_id = cursor.lastrowid
-    
-    for index, message_id in enumerate(message_ids):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
         cursor.execute(
-            'INSERT INTO combination_items (combination_id, message_id, order_index) VALUES (?, ?, ?)',
-            (combination_id, message_id, index)
+            'INSERT INTO combinations (name, trigger_key, delay_ms, icon, timing) VALUES (?, ?, ?, ?, ?)',
+            (name, trigger_key, delay_ms, icon, timing)
         )
-    
-    conn.commit()
-    conn.close()
+        combination_id = cursor.lastrowid
+        
+        for index, message_id in enumerate(message_ids):
+            cursor.execute(
+                'INSERT INTO combination_items (combination_id, message_id, order_index) VALUES (?, ?, ?)',
+                (combination_id, message_id, index)
+            )
+        
+        conn.commit()
+    notify_change('combination', combination_id)
     return combination_id
 
 
-def update_combination(combination_id: int, name: str, message_ids: List[int], trigger_key: str = None, delay_ms: int = 500, icon: str = None) -> bool:
+def update_combination(combination_id: int, name: str, message_ids: List[int], trigger_key: str = None, delay_ms: int = 500, icon: str = None, timing: str = None) -> bool:
     """Update an existing combination"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        'UPDATE combinations SET name = ?, trigger_key = ?, delay_ms = ?, icon = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
-        (name, trigger_key, delay_ms, icon, combination_id)
-    )
-    
-    # Delete existing items and add new ones
-    cursor.execute('DELETE FROM combination_items WHERE combination_id = ?', (combination_id,))
-    
-    for index, message_id in enumerate(message_ids):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
         cursor.execute(
-            'INSERT INTO combination_items (combination_id, message_id, order_index) VALUES (?, ?, ?)',
-            (combination_id, message_id, index)
+            'UPDATE combinations SET name = ?, trigger_key = ?, delay_ms = ?, icon = ?, timing = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (name, trigger_key, delay_ms, icon, timing, combination_id)
         )
-    
-    conn.commit()
-    conn.close()
+        
+        # Delete existing items and add new ones
+        cursor.execute('DELETE FROM combination_items WHERE combination_id = ?', (combination_id,))
+        
+        for index, message_id in enumerate(message_ids):
+            cursor.execute(
+                'INSERT INTO combination_items (combination_id, message_id, order_index) VALUES (?, ?, ?)',
+                (combination_id, message_id, index)
+            )
+        
+        conn.commit()
+    notify_change('combination', combination_id)
     return True
 
 
 def delete_combination(combination_id: int) -> bool:
     """Delete a combination and its items"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM combinations WHERE id = ?', (combination_id,))
-    
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM combinations WHERE id = ?', (combination_id,))
+        
+        conn.commit()
+    notify_change('combination', combination_id)
     return True
 
 
 def toggle_combination_favorite(combination_id: int) -> bool:
     """Toggle favorite status of a combination"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT is_favorite FROM combinations WHERE id = ?', (combination_id,))
-    row = cursor.fetchone()
-    if not row:
-        conn.close()
-        return False
-    
-    new_status = 0 if row[0] == 1 else 1
-    cursor.execute('UPDATE combinations SET is_favorite = ? WHERE id = ?', (new_status, combination_id))
-    
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT is_favorite FROM combinations WHERE id = ?', (combination_id,))
+        row = cursor.fetchone()
+        if not row:
+            return False
+        
+        new_status = 0 if row[0] == 1 else 1
+        cursor.execute('UPDATE combinations SET is_favorite = ? WHERE id = ?', (new_status, combination_id))
+        
+        conn.commit()
+    notify_change('combination', combination_id)
     return new_status == 1
 
 
 def update_combination_last_used(combination_id: int):
     """Update the last_used_at timestamp for a combination"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('UPDATE combinations SET last_used_at = CURRENT_TIMESTAMP WHERE id = ?', (combination_id,))
-    
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('UPDATE combinations SET last_used_at = CURRENT_TIMESTAMP WHERE id = ?', (combination_id,))
+
+        conn.commit()
+    notify_change('combination_usage', combination_id)
 
 
 def get_favorite_combinations() -> List[Dict]:
     """Get favorite combinations"""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM combinations WHERE is_favorite = 1 ORDER BY name')
@@ -919,5 +1650,157 @@ def get_favorite_combinations() -> List[Dict]:
     return combinations
 
 
+# ==================== WINDOW RULE OPERATIONS ====================
+
+def get_hotkey_bindings() -> List[Dict]:
+    """Get trigger keys of all messages and combinations"""
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT 'message' as item_type, id as item_id, name, trigger_key FROM messages
+        WHERE trigger_key IS NOT NULL AND trigger_key != ''
+        UNION ALL
+        SELECT 'combination' as item_type, id as item_id, name, trigger_key FROM combinations
+        WHERE trigger_key IS NOT NULL AND trigger_key != ''
+    ''')
+    
+    bindings = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return bindings
+
+
+def get_all_window_rules() -> List[Dict]:
+    """Get all window rules"""
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('SELECT * FROM window_rules ORDER BY priority DESC, id')
+    rules = [dict(row) for row in cursor.fetchall()]
+    
+    conn.close()
+    return rules
+
+
+def create_window_rule(window_pattern: str, item_type: str, item_id: int, trigger_key: str = None, priority: int = 0) -> int:
+    """Create a new window rule"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'INSERT INTO window_rules (window_pattern, trigger_key, item_type, item_id, priority) VALUES (?, ?, ?, ?, ?)',
+            (window_pattern, trigger_key, item_type, item_id, priority)
+        )
+        rule_id = cursor.lastrowid
+        
+        conn.commit()
+    notify_change('window_rule', rule_id)
+    return rule_id
+
+
+def update_window_rule(rule_id: int, window_pattern: str, item_type: str, item_id: int, trigger_key: str = None, priority: int = 0) -> bool:
+    """Update an existing window rule"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'UPDATE window_rules SET window_pattern = ?, trigger_key = ?, item_type = ?, item_id = ?, priority = ? WHERE id = ?',
+            (window_pattern, trigger_key, item_type, item_id, priority, rule_id)
+        )
+        
+        conn.commit()
+    notify_change('window_rule', rule_id)
+    return True
+
+
+def delete_window_rule(rule_id: int) -> bool:
+    """Delete a window rule"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM window_rules WHERE id = ?', (rule_id,))
+        
+        conn.commit()
+    notify_change('window_rule', rule_id)
+    return True
+
+
+# ==================== SCHEDULE OPERATIONS ====================
+
+def get_scheduled_jobs(active_only: bool = True) -> List[Dict]:
+    """Get scheduled jobs ordered by their next run time"""
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    
+    if active_only:
+        cursor.execute('SELECT * FROM scheduled_jobs WHERE is_active = 1 ORDER BY run_at')
+    else:
+        cursor.execute('SELECT * FROM scheduled_jobs ORDER BY run_at')
+    jobs = [dict(row) for row in cursor.fetchall()]
+    
+    conn.close()
+    return jobs
+
+
+def get_scheduled_job(job_id: int) -> Optional[Dict]:
+    """Get a single scheduled job by ID"""
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('SELECT * FROM scheduled_jobs WHERE id = ?', (job_id,))
+    row = cursor.fetchone()
+    
+    conn.close()
+    return dict(row) if row else None
+
+
+def create_scheduled_job(item_type: str, item_id: int, run_at: float, interval_ms: int = None) -> int:
+    """Create a new scheduled job (run_at in epoch seconds)"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'INSERT INTO scheduled_jobs (item_type, item_id, run_at, interval_ms) VALUES (?, ?, ?, ?)',
+            (item_type, item_id, run_at, interval_ms)
+        )
+        job_id = cursor.lastrowid
+        
+        conn.commit()
+    notify_change('scheduled_job', job_id)
+    return job_id
+
+
+def update_scheduled_job_run(job_id: int, next_run_at: Optional[float], last_run_at: Optional[float]) -> bool:
+    """Store the outcome of a run, a job without next_run_at is deactivated"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        if next_run_at is None:
+            cursor.execute(
+                'UPDATE scheduled_jobs SET is_active = 0, last_run_at = COALESCE(?, last_run_at) WHERE id = ?',
+                (last_run_at, job_id)
+            )
+        else:
+            cursor.execute(
+                'UPDATE scheduled_jobs SET run_at = ?, last_run_at = COALESCE(?, last_run_at) WHERE id = ?',
+                (next_run_at, last_run_at, job_id)
+            )
+        
+        conn.commit()
+    return True
+
+
+def delete_scheduled_job(job_id: int) -> bool:
+    """Delete a scheduled job"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM scheduled_jobs WHERE id = ?', (job_id,))
+        
+        conn.commit()
+    notify_change('scheduled_job', job_id)
+    return True
+
+
 # Initialize database on module import
 init_database()
@@ -0,0 +1,190 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Hotkey module for KenFlow application
+Resolves pressed trigger keys to messages and combinations
+
+Kısayol yönetimi için:
+- Mesaj ve kombinasyon kısayollarını pencere kurallarıyla birleştirir
+- Basılan tuşu veritabanına gitmeden doğru işleme çevirir
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from windows import TitleMatcher
+
+
+class Action(NamedTuple):
+    """Something a hotkey can trigger"""
+    item_type: str  # 'message' or 'combination'
+    item_id: int
+
+
+def normalize_key(trigger_key: str) -> str:
+    """Normalize a hotkey string, e.g. 'Ctrl + 1' -> 'ctrl+1'"""
+    return '+'.join(part.strip() for part in trigger_key.lower().split('+'))
+
+
+class DispatchMap:
+    """
+    In-memory map from trigger keys to actions.
+
+    Bindings are the trigger keys of messages and combinations. Window
+    rules bind an item to a window pattern, on the item's own key or on
+    another one. When a key is pressed, rules of that key whose pattern
+    occurs in the active window title win (highest priority, then longest
+    pattern); otherwise the plain bindings of the key are used. An item
+    that has a rule on its own key only fires in the windows of its rules.
+    """
+
+    def __init__(self, bindings: Iterable[Dict] = (), rules: Iterable[Dict] = ()):
+        own_keys = {}
+        defaults = {}
+        for binding in bindings:
+            key = normalize_key(binding['trigger_key'])
+            action = Action(binding['item_type'], binding['item_id'])
+            own_keys[action] = key
+            defaults.setdefault(key, []).append(action)
+
+        keyed_rules = {}
+        restricted = set()
+        for rule in rules:
+            action = Action(rule['item_type'], rule['item_id'])
+            key = rule.get('trigger_key') or own_keys.get(action)
+            if not key:
+                continue
+            key = normalize_key(key)
+            if own_keys.get(action) == key:
+                restricted.add(action)
+            pattern = rule['window_pattern'] or ''
+            rank = (rule.get('priority') or 0, len(pattern), -rule['id'])
+            keyed_rules.setdefault(key, []).append((pattern, (rank, action)))
+
+        self._defaults = {}
+        for key, actions in defaults.items():
+            actions = tuple(a for a in actions if a not in restricted)
+            if actions:
+                self._defaults[key] = actions
+        self._rules = {key: TitleMatcher(entries) for key, entries in keyed_rules.items()}
+        self._resolved = {}
+
+    def keys(self) -> List[str]:
+        """Get all trigger keys that need a registered hotkey"""
+        return sorted(set(self._defaults) | set(self._rules))
+
+    def conflicts(self) -> Dict[str, Tuple[Action, ...]]:
+        """Get keys bound to more than one item outside of window rules"""
+        return {key: actions for key, actions in self._defaults.items() if len(actions) > 1}
+
+    def resolve(self, trigger_key: str, title: str) -> Optional[Tuple[Tuple[Action, ...], bool]]:
+        """
+        Get (actions, matched_rule) for a pressed key in a window
+        None if the key does nothing in this window
+        """
+        cache_key = (trigger_key, title)
+        if cache_key in self._resolved:
+            return self._resolved[cache_key]
+
+        result = None
+        matcher = self._rules.get(trigger_key)
+        if matcher is not None:
+            best = max(matcher.iter_matches(title), default=None)
+            if best is not None:
+                result = ((best[1],), True)
+        if result is None and trigger_key in self._defaults:
+            result = (self._defaults[trigger_key], False)
+
+        if len(self._resolved) > 1024:
+            self._resolved = {}
+        self._resolved[cache_key] = result
+        return result
+
+
+class HotkeyRegistry:
+    """
+    Keeps the hotkeys registered with a keyboard backend in sync with a
+    desired set of trigger keys.
+
+    sync() registers new keys before removing stale ones and leaves
+    unchanged keys alone, so a refresh costs one backend call per changed
+    key and never leaves a gap where existing hotkeys are dead. The
+    backend needs add_hotkey(key, callback, suppress=False) and
+    remove_hotkey(handle), like the keyboard module.
+    """
+
+    def __init__(self, backend, make_handler: Callable[[str], Callable[[], Any]]):
+        self.backend = backend
+        self._make_handler = make_handler
+        self._lock = threading.Lock()
+        self._registered = {}
+
+    def __len__(self) -> int:
+        return len(self._registered)
+
+    def keys(self) -> List[str]:
+        """Get the currently registered trigger keys"""
+        return sorted(self._registered)
+
+    def sync(self, keys: Iterable[str]) -> Dict[str, List]:
+        """Register missing keys and remove keys that are no longer wanted"""
+        desired = set(keys)
+        added, removed, failed = [], [], []
+        with self._lock:
+            for key in sorted(desired - set(self._registered)):
+                try:
+                    self._registered[key] = self.backend.add_hotkey(key, self._make_handler(key), suppress=False)
+                    added.append(key)
+                except Exception as e:
+                    print(f"Error registering hotkey '{key}': {e}")
+                    failed.append({'key': key, 'error': str(e)})
+
+            for key in sorted(set(self._registered) - desired):
+                handle = self._registered.pop(key)
+                try:
+                    self.backend.remove_hotkey(handle)
+                except Exception:
+                    pass
+                removed.append(key)
+        return {'added': added, 'removed': removed, 'failed': failed}
+
+    def clear(self):
+        """Remove all registered hotkeys"""
+        self.sync(())
+
+
+class SyntheticKeyboard:
+    """
+    Keyboard backend without a keyboard hook, for tests and benchmarks
+    press() runs the callback registered for a key like a real key press
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks = {}
+        self._handles = {}
+        self._next_handle = 0
+
+    def add_hotkey(self, key: str, callback: Callable[[], Any], suppress: bool = False):
+        with self._lock:
+            self._next_handle += 1
+            self._callbacks[key] = callback
+            self._handles[self._next_handle] = key
+            return self._next_handle
+
+    def remove_hotkey(self, handle):
+        with self._lock:
+            key = self._handles.pop(handle, None)
+            self._callbacks.pop(key, None)
+
+    def keys(self) -> List[str]:
+        """Get the keys that currently have a callback"""
+        with self._lock:
+            return sorted(self._callbacks)
+
+    def press(self, key: str) -> bool:
+        """Simulate pressing key, False if nothing is registered for it"""
+        callback = self._callbacks.get(key)
+        if callback is None:
+            return False
+        callback()
+        return True
@@ -0,0 +1,149 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+IPC module for KenFlow application
+Newline-delimited JSON-RPC over a Unix domain socket
+
+Yerel iletişim için:
+- Sık yapılan overlay çağrılarını HTTP ve port olmadan, tek satırlık JSON ile karşılar
+- Soket dosyası yalnızca kullanıcının kendisi tarafından açılabilir
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# Unix domain sockets are not available on Windows builds of Python
+RPC_SUPPORT = hasattr(socket, 'AF_UNIX')
+
+# Longest accepted request line
+MAX_LINE_BYTES = 1024 * 1024
+
+
+def encode_message(message: Dict) -> bytes:
+    """One NDJSON line"""
+    return json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def dispatch(methods: Dict[str, Callable], line: bytes) -> Optional[bytes]:
+    """
+    Run one request line and return the response line
+    Request: {"id": 1, "method": "overlay.status", "params": {...}}
+    Response: {"id": 1, "result": ...} or {"id": 1, "error": "..."}
+    Requests without an id are notifications and get no response
+    """
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            raise ValueError('method is required')
+    except ValueError as e:
+        return encode_message({'id': None, 'error': f'Invalid request: {e}'})
+
+    request_id = request.get('id')
+    method = methods.get(request['method'])
+    if method is None:
+        response = {'id': request_id, 'error': f"Unknown method: {request['method']}"}
+    else:
+        params = request.get('params') or {}
+        try:
+            result = method(**params) if isinstance(params, dict) else method(*params)
+            response = {'id': request_id, 'result': result}
+        except Exception as e:
+            response = {'id': request_id, 'error': str(e)}
+    if request_id is None:
+        return None
+    return encode_message(response)
+
+
+class _RpcHandler(socketserver.StreamRequestHandler):
+    """Answers the requests of one connection in order"""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_LINE_BYTES + 1)
+            if not line:
+                return
+            if len(line) > MAX_LINE_BYTES:
+                self.wfile.write(encode_message({'id': None, 'error': 'Request too large'}))
+                return
+            if not line.strip():
+                continue
+            response = dispatch(self.server.methods, line)
+            if response is not None:
+                self.wfile.write(response)
+                self.wfile.flush()
+
+
+if RPC_SUPPORT:
+    class _RpcSocketServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+class RpcServer:
+    """
+    JSON-RPC server on a Unix domain socket.
+
+    methods maps method names to callables taking keyword params and
+    returning JSON serializable results. Each connection gets a thread;
+    clients keep one connection open and send one request per line.
+    """
+
+    def __init__(self, path: str, methods: Dict[str, Callable]):
+        if not RPC_SUPPORT:
+            raise RuntimeError('Unix domain sockets are not supported on this platform')
+        self.path = path
+        self.methods = methods
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Bind the socket and serve in a background thread"""
+        if self._server is not None:
+            return
+        # Remove a socket left behind by a previous run
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _RpcSocketServer(self.path, _RpcHandler)
+        finally:
+            os.umask(old_umask)
+        self._server.methods = self.methods
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and remove the socket file"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class RpcClient:
+    """Blocking client for RpcServer, used by benchmarks and scripts"""
+
+    def __init__(self, path: str, timeout: float = 10.0):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+        self._reader = self._socket.makefile('rb')
+        self._next_id = 0
+
+    def call(self, method: str, **params) -> Any:
+        """Call a method and wait for its result, errors raise RuntimeError"""
+        self._next_id += 1
+        self._socket.sendall(encode_message({'id': self._next_id, 'method': method, 'params': params}))
+        response = json.loads(self._reader.readline())
+        if response.get('error') is not None:
+            raise RuntimeError(response['error'])
+        return response.get('result')
+
+    def close(self):
+        self._reader.close()
+        self._socket.close()
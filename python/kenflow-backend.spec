@@ -34,6 +34,8 @@ a = Analysis(
         'pynput.mouse._win32',
         'PIL',
         'PIL._tkinter_finder',
+        'waitress',
+        'brotli',
     ],
     hookspath=[],
     hooksconfig={},
@@ -11,79 +11,152 @@ Main Python backend for KenFlow application
 Provides Flask API for Electron frontend and handles keyboard/automation operations
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 import database
+import rendering
+import windows
+import hotkeys
+import scheduler
+import automation
+import payloads
+import workspaces
 import random
-import re
-import pyperclip
-import pyautogui
+import itertools
+import sqlite3
+import json
+import os
 import keyboard
 import threading
 import time
 import sys
-
-try:
-    import pygetwindow as gw
-    WINDOW_SUPPORT = True
-except ImportError:
-    WINDOW_SUPPORT = False
-    print("Warning: pygetwindow not installed. Window targeting disabled.")
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime
+from typing import Optional
 
 app = Flask(__name__)
-CORS(app)
+
+# Pages of the Electron app are loaded from files, their requests carry one of these origins
+ELECTRON_ORIGINS = ['file://', 'null']
+
+# Pattern routes can point the backend at local files, other web pages may not call them
+CORS(app, resources={
+    r'/api/patterns.*': {'origins': ELECTRON_ORIGINS},
+    r'/*': {'origins': '*'}
+})
 
 # Global variables
 listener_active = False
 listener_thread = None
-registered_hotkeys = []
+
+# Trigger key -> action map used by hotkey handlers, rebuilt by refresh_hotkeys()
+hotkey_dispatch = hotkeys.DispatchMap()
+
+# Batch rendering limits for /api/render
+MAX_BATCH_RENDERS = 1000000
+PROCESS_POOL_THRESHOLD = 200000
+
+# Texts recently sent to each window, used to avoid repeating the same output
+recent_outputs = rendering.RecentOutputs()
+
+
+def load_target_windows() -> list:
+    """Load the target window list from settings, empty means all windows"""
+    target_windows = database.get_settings().get('target_windows', '')
+    if not target_windows or target_windows == '[]':
+        return []
+    try:
+        targets = json.loads(target_windows)
+        return [str(t) for t in targets] if isinstance(targets, list) else []
+    except ValueError:
+        return []
+
+
+# Active window access, replaceable with windows.FakeWindowProvider in tests
+window_provider = windows.WindowProvider()
+window_targeting = windows.WindowTargeting(window_provider, load_target_windows)
+database.add_change_listener(window_targeting.invalidate)
+
+
+# Open window list kept current in the background for /api/windows
+window_watcher = windows.WindowListWatcher(window_provider)
+
+
+def set_window_provider(provider):
+    """Replace the window provider, e.g. with windows.FakeWindowProvider in tests"""
+    global window_provider
+    window_provider = provider
+    window_targeting.provider = provider
+    window_targeting.invalidate()
+    window_watcher.provider = provider
+    window_watcher.refresh()
 
 
 def get_active_window_title():
     """Get the title of the currently active window"""
-    if not WINDOW_SUPPORT:
-        return ""
-    try:
-        active = gw.getActiveWindow()
-        return active.title if active else ""
-    except:
-        return ""
+    return window_targeting.active_title()
 
 
 def is_target_window_active():
     """Check if the current active window is in the target list"""
-    settings = database.get_settings()
-    target_windows = settings.get('target_windows', '')
-    
-    # If no targets set or empty, work in all windows
-    if not target_windows or target_windows == '[]':
-        return True
-    
-    try:
-        import json
-        targets = json.loads(target_windows)
-        if not targets:
-            return True
-        
-        active_title = get_active_window_title().lower()
-        for target in targets:
-            if target.lower() in active_title:
-                return True
-        return False
-    except:
-        return True
+    return window_targeting.is_target_active()
+
+
+# Keyboard and clipboard access, replaceable with automation.RecordingInputBackend in tests
+input_backend = automation.PyAutoGuiBackend()
+
+
+def set_input_backend(backend):
+    """Replace the input backend used by all sends"""
+    global input_backend
+    input_backend = backend
+
+
+# Deliveries of different sends must not interleave on the keyboard or clipboard
+delivery_lock = threading.RLock()
+
+
+def deliver_text(text: str, settings: dict) -> Optional[str]:
+    """
+    Clear the current key press and put text into the active window
+    Short texts are typed directly, long ones pasted (delivery_mode setting)
+    Returns clipboard content to restore with restore_clipboard()
+    """
+    input_backend.hotkey('backspace')
+    mode = automation.choose_delivery(
+        text,
+        settings.get('delivery_mode', 'auto'),
+        int(settings.get('type_max_length', 80))
+    )
+    if mode == 'type':
+        automation.type_text(input_backend, text)
+        return None
+    return automation.paste_text(input_backend, text, settings.get('restore_clipboard', 'true') == 'true')
 
 
-def send_message_action(message_id: int):
+def restore_clipboard(saved: Optional[str]):
+    """Put back the clipboard content saved by deliver_text()"""
+    if saved is not None:
+        try:
+            input_backend.copy(saved)
+        except Exception as e:
+            print(f"Error restoring clipboard: {e}")
+
+
+def send_message_action(message_id: int, check_target: bool = True):
     """Execute the send message action for a specific message"""
     # Check if target window is active
-    if not is_target_window_active():
+    if check_target and not is_target_window_active():
         print("Skipped: Target window not active")
         return
     
     settings = database.get_settings()
     message = database.get_message_by_id(message_id)
-    processed_text = get_random_template(message_id)
+    
+    # Get current window for logging and duplicate avoidance
+    target_window = get_active_window_title()
+    processed_text = get_random_template(message_id, target_window)
     
     if not processed_text or not message:
         return
@@ -92,20 +165,19 @@ def send_message_action(message_id: int):
         # Get click delay from settings (default 150ms)
         click_delay = int(settings.get('click_delay', 150)) / 1000.0
         
-        # Get current window for logging
-        target_window = get_active_window_title()
-        
         # Type the message
-        time.sleep(0.5)
-        pyautogui.hotkey('backspace')
-        pyperclip.copy(processed_text)
-        pyautogui.hotkey('ctrl', 'v')
-        time.sleep(click_delay)
-        
-        # Send with Enter if enabled
-        enter_enabled = settings.get('enter_enabled', 'true') == 'true'
-        if enter_enabled:
-            pyautogui.press('enter')
+        input_backend.sleep(0.5)
+        with delivery_lock:
+            saved_clipboard = deliver_text(processed_text, settings)
+            try:
+                input_backend.sleep(click_delay)
+                
+                # Send with Enter if enabled
+                enter_enabled = settings.get('enter_enabled', 'true') == 'true'
+                if enter_enabled:
+                    input_backend.press('enter')
+            finally:
+                restore_clipboard(saved_clipboard)
         
         # Log the sent message
         database.log_message_sent(message_id, message['name'], processed_text, target_window)
@@ -115,10 +187,10 @@ def send_message_action(message_id: int):
         print(f"Error sending message: {e}")
 
 
-def send_combination_action(combination_id: int):
+def send_combination_action(combination_id: int, check_target: bool = True):
     """Execute the send combination action - sends messages sequentially"""
     # Check if target window is active (only at start)
-    if not is_target_window_active():
+    if check_target and not is_target_window_active():
         print("Skipped: Target window not active")
         return
     
@@ -129,6 +201,8 @@ def send_combination_action(combination_id: int):
     
     settings = database.get_settings()
     delay_ms = combination.get('delay_ms', 500)
+    click_delay_ms = int(settings.get('click_delay', 150))
+    enter_enabled = settings.get('enter_enabled', 'true') == 'true'
     
     target_window = get_active_window_title()
     items = combination['items']
@@ -136,47 +210,55 @@ def send_combination_action(combination_id: int):
     
     print(f"Starting combination '{combination['name']}' with {total} messages...")
     
+    # Render every message up front so the send loop only waits and types
+    prepared = []
     for index, item in enumerate(items):
+        message_id = item['message_id']
+        message = database.get_message_by_id(message_id)
+        
+        if not message:
+            print(f"  Message {index + 1}: NOT FOUND (id={message_id})")
+            continue
+        
+        processed_text = get_random_template(message_id, target_window)
+        if not processed_text:
+            print(f"  Message {index + 1}: No template found for '{message['name']}'")
+            continue
+        prepared.append((index, message, processed_text))
+    
+    # Precompute all delays from the combination's timing model
+    try:
+        model = automation.TimingModel.from_config(combination.get('timing'), delay_ms, click_delay_ms)
+    except (TypeError, ValueError) as e:
+        print(f"  Invalid timing config, using fixed delays: {e}")
+        model = automation.TimingModel(delay_ms, click_delay_ms)
+    plan = model.plan([text for _, _, text in prepared])
+    
+    for (index, message, processed_text), step in zip(prepared, plan):
         try:
-            message_id = item['message_id']
-            message = database.get_message_by_id(message_id)
-            
-            if not message:
-                print(f"  Message {index + 1}: NOT FOUND (id={message_id})")
-                continue
-            
-            processed_text = get_random_template(message_id)
-            if not processed_text:
-                print(f"  Message {index + 1}: No template found for '{message['name']}'")
-                continue
-            
-            # Get click delay from settings
-            click_delay = int(settings.get('click_delay', 150)) / 1000.0
-            
-            # Small delay before typing
-            time.sleep(0.3)
+            input_backend.sleep(step.before)
             
-            # Clear any existing text and paste
-            pyautogui.hotkey('backspace')
-            pyperclip.copy(processed_text)
-            pyautogui.hotkey('ctrl', 'v')
-            time.sleep(click_delay)
-            
-            # Send with Enter if enabled
-            enter_enabled = settings.get('enter_enabled', 'true') == 'true'
-            if enter_enabled:
-                pyautogui.press('enter')
+            # Clear any existing text and type or paste
+            with delivery_lock:
+                saved_clipboard = deliver_text(processed_text, settings)
+                try:
+                    input_backend.sleep(step.before_enter)
+                    
+                    # Send with Enter if enabled
+                    if enter_enabled:
+                        input_backend.press('enter')
+                finally:
+                    restore_clipboard(saved_clipboard)
             
             # Log the sent message
-            database.log_message_sent(message_id, message['name'], processed_text, target_window)
+            database.log_message_sent(message['id'], message['name'], processed_text, target_window)
             
             print(f"  Message {index + 1}/{total}: '{message['name']}' sent")
             
             # Wait before next message (except for last one)
-            if index < total - 1:
-                wait_time = delay_ms / 1000.0
-                print(f"  Waiting {delay_ms}ms before next message...")
-                time.sleep(wait_time)
+            if step.after:
+                print(f"  Waiting {step.after * 1000:.0f}ms before next message...")
+                input_backend.sleep(step.after)
                 
         except Exception as e:
             print(f"  Message {index + 1}: ERROR - {e}")
@@ -190,110 +272,299 @@ def send_combination_action(combination_id: int):
     print(f"Combination '{combination['name']}' completed!")
 
 
+def build_dispatch_map() -> hotkeys.DispatchMap:
+    """Compile hotkey bindings and window rules into a dispatch map"""
+    return hotkeys.DispatchMap(database.get_hotkey_bindings(), database.get_all_window_rules())
+
+
+# Bindings and rules hotkey_dispatch was built from
+hotkey_sources = None
+
+
+def dispatch_hotkey(trigger_key: str):
+    """Run the actions bound to a pressed key in the active window"""
+    resolved = hotkey_dispatch.resolve(trigger_key, get_active_window_title())
+    if resolved is None:
+        print(f"Skipped: No action for '{trigger_key}' in this window")
+        return
+    
+    actions, matched_rule = resolved
+    for action in actions:
+        # Window rules already chose this window, skip the global target check
+        if action.item_type == 'combination':
+            send_combination_action(action.item_id, check_target=not matched_rule)
+        else:
+            send_message_action(action.item_id, check_target=not matched_rule)
+
+
+def create_hotkey_handler(trigger_key: str):
+    """Create the callback registered for a trigger key"""
+    def handler():
+        if listener_active:
+            dispatch_hotkey(trigger_key)
+    return handler
+
+
+# Registered hotkeys, one per trigger key
+hotkey_registry = hotkeys.HotkeyRegistry(keyboard, create_hotkey_handler)
+
+
+def set_keyboard_backend(backend):
+    """Replace the keyboard backend, e.g. with hotkeys.SyntheticKeyboard in benchmarks"""
+    hotkey_registry.clear()
+    hotkey_registry.backend = backend
+    if listener_active:
+        refresh_hotkeys()
+
+
+def refresh_hotkeys() -> dict:
+    """
+    Rebuild the dispatch map and register only added or removed keys
+    Handlers look the action up when pressed, so rebinding a key to other
+    items needs no re-registration. The map, with the windows it already
+    resolved, is kept when bindings and rules did not change
+    """
+    global hotkey_dispatch, hotkey_sources
+    
+    sources = (database.get_hotkey_bindings(), database.get_all_window_rules())
+    if sources != hotkey_sources:
+        hotkey_dispatch = hotkeys.DispatchMap(*sources)
+        hotkey_sources = sources
+    changes = hotkey_registry.sync(hotkey_dispatch.keys())
+    changes['conflicts'] = get_hotkey_conflicts()
+    for key in changes['conflicts']:
+        print(f"Warning: Hotkey '{key}' is assigned to more than one item")
+    return changes
+
+
+def get_hotkey_conflicts() -> dict:
+    """Get trigger keys that are assigned to more than one item"""
+    return {
+        key: [action._asdict() for action in actions]
+        for key, actions in hotkey_dispatch.conflicts().items()
+    }
+
+
+# Sends type into the active window, scheduled sends run one at a time
+send_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def fire_scheduled_job(job: dict):
+    """Queue the send of a due scheduled job"""
+    if job['item_type'] == 'combination':
+        send_executor.submit(send_combination_action, job['item_id'])
+    else:
+        send_executor.submit(send_message_action, job['item_id'])
+
+
+# Delayed and repeating sends, persisted in the scheduled_jobs table
+job_scheduler = scheduler.Scheduler(fire_scheduled_job, database.update_scheduled_job_run)
+
+
+def start_scheduler():
+    """Load pending jobs from the database and start running them"""
+    job_scheduler.load(database.get_scheduled_jobs())
+    job_scheduler.start()
+
+
 def start_listener():
     """Start the keyboard listener for trigger keys"""
-    global listener_active, registered_hotkeys
+    global listener_active
     
     if listener_active:
         return
     
     listener_active = True
+    refresh_hotkeys()
     
-    # Clear any existing hotkeys
-    for hotkey in registered_hotkeys:
-        try:
-            keyboard.remove_hotkey(hotkey)
-        except:
-            pass
-    registered_hotkeys = []
-    
-    # Get all messages with trigger keys
-    messages = database.get_all_messages()
-    
-    for msg in messages:
-        trigger_key = msg.get('trigger_key')
-        if trigger_key:
-            try:
-                # Create a closure to capture message_id
-                def create_handler(mid):
-                    def handler():
-                        if listener_active:
-                            send_message_action(mid)
-                    return handler
-                
-                hotkey = keyboard.add_hotkey(trigger_key, create_handler(msg['id']), suppress=False)
-                registered_hotkeys.append(hotkey)
-                print(f"Registered hotkey '{trigger_key}' for message '{msg['name']}'")
-            except Exception as e:
-                print(f"Error registering hotkey '{trigger_key}': {e}")
-    
-    # Get all combinations with trigger keys
-    combinations = database.get_all_combinations()
-    
-    for combo in combinations:
-        trigger_key = combo.get('trigger_key')
-        if trigger_key:
-            try:
-                # Create a closure to capture combination_id
-                def create_combo_handler(cid):
-                    def handler():
-                        if listener_active:
-                            send_combination_action(cid)
-                    return handler
-                
-                hotkey = keyboard.add_hotkey(trigger_key, create_combo_handler(combo['id']), suppress=False)
-                registered_hotkeys.append(hotkey)
-                print(f"Registered hotkey '{trigger_key}' for combination '{combo['name']}'")
-            except Exception as e:
-                print(f"Error registering hotkey '{trigger_key}': {e}")
-    
-    print(f"Listener started with {len(registered_hotkeys)} hotkeys")
+    print(f"Listener started with {len(hotkey_registry)} hotkeys")
 
 
 def stop_listener():
     """Stop the keyboard listener"""
-    global listener_active, registered_hotkeys
+    global listener_active
     
     listener_active = False
     
     # Remove all registered hotkeys
-    for hotkey in registered_hotkeys:
-        try:
-            keyboard.remove_hotkey(hotkey)
-        except:
-            pass
-    registered_hotkeys = []
+    hotkey_registry.clear()
     
     print("Listener stopped")
 
 
+def load_patterns() -> list:
+    """Load (id, name, values) of every pattern from the database"""
+    return database.get_packed_patterns()
+
+
+def load_pattern(pattern_id: int):
+    """Load (name, values) of one pattern, None if it was deleted"""
+    patterns = database.get_packed_patterns(pattern_id)
+    return patterns[0][1:] if patterns else None
+
+
+def load_message_templates(message_id: int) -> list:
+    """Load the template contents of a message from the database"""
+    message = database.get_message_by_id(message_id)
+    if not message:
+        return []
+    return [t['content'] for t in message['templates']]
+
+
+# Templates and patterns kept in memory for rendering, a pattern change
+# only drops the messages that use it
+render_cache = rendering.RenderCache(load_patterns, load_message_templates, load_pattern)
+database.add_change_listener(render_cache.invalidate)
+
+
+def get_pattern_dict() -> dict:
+    """Get pattern values keyed by pattern name"""
+    return render_cache.pattern_dict()
+
+
 def process_template(template: str) -> str:
     """
     Process a template and replace pattern placeholders with random values
     Example: "Hello {greeting}! {emoji}" -> "Hello Hi! 😀"
     """
-    patterns = database.get_all_patterns()
-    pattern_dict = {p['name']: [item['value'] for item in p['items']] for p in patterns}
-    
-    def replace_pattern(match):
-        pattern_name = match.group(1)
-        if pattern_name in pattern_dict and pattern_dict[pattern_name]:
-            return random.choice(pattern_dict[pattern_name])
-        return match.group(0)  # Return original if pattern not found
-    
-    # Find all {pattern_name} and replace with random value from pattern
-    result = re.sub(r'\{(\w+)\}', replace_pattern, template)
-    return result
+    return rendering.render_template(template, get_pattern_dict())
 
 
-def get_random_template(message_id: int) -> str:
-    """Get a random template from a message and process it"""
-    message = database.get_message_by_id(message_id)
-    if not message or not message['templates']:
+def get_random_template(message_id: int, target_window: str = None) -> str:
+    """
+    Get a random template from a message and process it
+    When target_window is given, texts recently sent to that window are
+    resampled so the same output is not repeated
+    """
+    entry = render_cache.message(message_id)
+    if not entry:
         return ""
     
-    template = random.choice(message['templates'])
-    return process_template(template['content'])
+    compiled = entry[1]
+    pattern_dict = get_pattern_dict()
+    
+    def render():
+        return rendering.render_compiled(random.choice(compiled), pattern_dict)
+    
+    if target_window is None:
+        return render()
+    return recent_outputs.pick(target_window, render)
+
+
+# ==================== RESPONSE PAYLOADS ====================
+
+# Serialized list responses, rebuilt only after their data changes
+payload_cache = payloads.PayloadCache()
+
+
+def drop_payloads(kind: str, item_id=None):
+    """Free all cached bodies when the whole database changes (e.g. another workspace)"""
+    if kind == 'database':
+        payload_cache.clear()
+
+
+database.add_change_listener(drop_payloads)
+
+# Cached lists: name -> (data kinds the list depends on, loader)
+CACHED_LISTS = {
+    'messages': (('message', 'message_usage'), database.get_all_messages),
+    'patterns': (('pattern',), database.get_all_patterns),
+    'combinations': (('combination', 'combination_usage', 'message'), database.get_all_combinations),
+}
+
+
+def cached_list_body(key: str, fmt: str = 'json', encoding: str = None) -> tuple:
+    """Get (body, applied_encoding, version) of a cached list"""
+    kinds, build = CACHED_LISTS[key]
+    version = database.get_change_version(*kinds)
+    body, encoding = payload_cache.get(key, version, fmt, encoding, build)
+    return body, encoding, version
+
+
+def response_format() -> str:
+    """
+    Get the requested body format: ?format=json|columns|msgpack, or
+    msgpack when the client accepts it and msgpack is installed
+    """
+    fmt = request.args.get('format')
+    if fmt:
+        if fmt not in payloads.FORMATS or (fmt == 'msgpack' and not payloads.MSGPACK_SUPPORT):
+            raise ValueError(f"Unsupported format: {fmt}")
+        return fmt
+    if payloads.MSGPACK_SUPPORT and request.accept_mimetypes.quality('application/x-msgpack') > 0 \
+            and request.accept_mimetypes.best_match(['application/json', 'application/x-msgpack']) == 'application/x-msgpack':
+        return 'msgpack'
+    return 'json'
+
+
+def cached_payload(key: str):
+    """
+    Response for one of CACHED_LISTS
+    The body is serialized and compressed once per data version; clients
+    sending the ETag back get 304 Not Modified
+    """
+    try:
+        fmt = response_format()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    version = database.get_change_version(*CACHED_LISTS[key][0])
+    etag = f"{payloads.BOOT_ID}-{key}-{fmt}-{'.'.join(map(str, version))}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        encoding = payloads.choose_encoding(request.headers.get('Accept-Encoding'))
+        body, encoding, version = cached_list_body(key, fmt, encoding)
+        etag = f"{payloads.BOOT_ID}-{key}-{fmt}-{'.'.join(map(str, version))}"
+        response = Response(body, mimetype=payloads.MIMETYPES[fmt])
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    # Let the browser cache keep the body but revalidate it on every request
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    response.vary.add('Accept')
+    return response
+
+
+def payload_response(data):
+    """Response for uncached data in the requested format"""
+    try:
+        fmt = response_format()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if fmt == 'json':
+        return jsonify(data)
+    response = Response(payloads.serialize(data, fmt), mimetype=payloads.MIMETYPES[fmt])
+    response.vary.add('Accept')
+    return response
+
+
+# Endpoints whose bodies are assembled per request from cached bodies;
+# compressing them again on every request costs far more than the local
+# transfer saves
+UNCOMPRESSED_ENDPOINTS = {'get_bootstrap'}
+
+
+@app.after_request
+def compress_response(response):
+    """Compress large JSON responses the client accepts compressed"""
+    if (response.direct_passthrough or response.is_streamed
+            or request.endpoint in UNCOMPRESSED_ENDPOINTS
+            or 'Content-Encoding' in response.headers
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or response.mimetype not in ('application/json', 'application/x-msgpack')):
+        return response
+    encoding = payloads.choose_encoding(request.headers.get('Accept-Encoding'))
+    response.vary.add('Accept-Encoding')
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < payloads.COMPRESSION_MIN_BYTES:
+        return response
+    response.set_data(payloads.compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
 
 
 # ==================== MESSAGE ROUTES ====================
@@ -303,10 +574,8 @@ def get_messages():
     """Get all messages or search"""
     query = request.args.get('search', '')
     if query:
-        messages = database.search_messages(query)
-    else:
-        messages = database.get_all_messages()
-    return jsonify(messages)
+        return payload_response(database.search_messages(query))
+    return cached_payload('messages')
 
 
 @app.route('/api/messages', methods=['POST'])
@@ -367,18 +636,124 @@ def copy_message(message_id):
     """Copy a random processed template to clipboard"""
     processed_text = get_random_template(message_id)
     if processed_text:
-        pyperclip.copy(processed_text)
+        input_backend.copy(processed_text)
         return jsonify({'success': True, 'text': processed_text})
     return jsonify({'success': False, 'error': 'No templates found'})
 
 
+@app.route('/api/messages/<int:message_id>/variants', methods=['GET'])
+def get_message_variants(message_id):
+    """
+    Get the number of distinct texts a message can produce and a page of them
+    Choices that join into the same string (e.g. "a" + "bc" and "ab" + "c")
+    are counted separately, only then count is an upper bound
+    """
+    space = render_cache.variant_space(message_id)
+    if space is None:
+        if not database.get_message_by_id(message_id):
+            return jsonify({'error': 'Message not found'}), 404
+        space = rendering.VariantSpace([], {})
+    
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 20, type=int), 0), 500)
+    
+    total = space.count()
+    variants = list(itertools.islice(space.iter_variants(offset), limit))
+    next_offset = offset + len(variants)
+    
+    return jsonify({
+        # Counts can exceed the safe integer range of JavaScript
+        'count': str(total),
+        'offset': offset,
+        'limit': limit,
+        'variants': variants,
+        'next_offset': next_offset if next_offset < total else None
+    })
+
+
+@app.route('/api/render', methods=['POST'])
+def render_messages():
+    """
+    Render many texts at once without touching the clipboard
+    Body: {"items": [{"message_id": 1, "count": 100}], "parallel": null}
+    Streams one JSON object per line (NDJSON)
+    """
+    data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'Invalid render request: body must be an object'}), 400
+    jobs = []
+    missing = []
+    total = 0
+    try:
+        for item in data.get('items', []):
+            message_id = int(item['message_id'])
+            count = int(item.get('count', 1))
+            if count < 0:
+                raise ValueError('count must not be negative')
+            entry = render_cache.message(message_id)
+            if not entry:
+                missing.append(message_id)
+                continue
+            jobs.append((message_id, entry[0], count))
+            total += count
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': f'Invalid render request: {e}'}), 400
+    
+    if total > MAX_BATCH_RENDERS:
+        return jsonify({'success': False, 'error': f'At most {MAX_BATCH_RENDERS} texts per request'}), 400
+    
+    # Large requests are fanned out to worker processes unless disabled
+    parallel = data.get('parallel')
+    processes = 0
+    if parallel or (parallel is None and total >= PROCESS_POOL_THRESHOLD):
+        processes = os.cpu_count() or 1
+    pattern_dict = get_pattern_dict()
+    
+    def generate():
+        for message_id in missing:
+            yield json.dumps({'message_id': message_id, 'error': 'No templates found'}) + '\n'
+        # Closing the response (client gone) closes the batch, which stops queuing chunks
+        with closing(rendering.render_batch(jobs, pattern_dict, processes, encode=True)) as batch:
+            for _, lines in batch:
+                yield lines
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
+@app.route('/api/render/metrics', methods=['GET'])
+def get_render_metrics():
+    """Get duplicate avoidance metrics for rendered texts"""
+    return jsonify({'recent_outputs': recent_outputs.metrics()})
+
+
 # ==================== PATTERN ROUTES ====================
 
+# Pattern files must be text files inside the data directory (workspaces included)
+PATTERN_FILE_EXTENSIONS = ('.txt', '.csv')
+
+
+def pattern_source_path(data: dict) -> Optional[str]:
+    """
+    Get the text file a pattern reads its values from, None for stored items
+    Relative paths are resolved against the data directory
+    """
+    source_path = (data.get('source_path') or '').strip()
+    if not source_path:
+        return None
+    data_dir = os.path.realpath(database.APP_DATA_PATH)
+    source_path = os.path.realpath(os.path.join(data_dir, os.path.expanduser(source_path)))
+    if (os.path.commonpath([data_dir, source_path]) != data_dir
+            or not source_path.lower().endswith(PATTERN_FILE_EXTENSIONS)):
+        raise ValueError(f'Pattern files must be .txt or .csv files in {data_dir}')
+    if not os.path.isfile(source_path):
+        raise ValueError(f'File not found: {source_path}')
+    return source_path
+
+
 @app.route('/api/patterns', methods=['GET'])
 def get_patterns():
     """Get all patterns"""
-    patterns = database.get_all_patterns()
-    return jsonify(patterns)
+    return cached_payload('patterns')
 
 
 @app.route('/api/patterns', methods=['POST'])
@@ -388,7 +763,8 @@ def create_pattern():
     try:
         pattern_id = database.create_pattern(
             name=data['name'],
-            items=data.get('items', [])
+            items=data.get('items', []),
+            source_path=pattern_source_path(data)
         )
         # Log activity
         database.log_activity('created', 'pattern', pattern_id, data['name'])
@@ -401,11 +777,23 @@ def create_pattern():
 def update_pattern(pattern_id):
     """Update a pattern"""
     data = request.json
-    success = database.update_pattern(
-        pattern_id=pattern_id,
-        name=data['name'],
-        items=data.get('items', [])
-    )
+    try:
+        if 'source_path' in data:
+            # An empty or null value unbinds the file
+            source_path = pattern_source_path(data)
+        else:
+            # Keep the stored file when the client does not send one
+            existing = database.get_pattern_by_name_or_id(pattern_id)
+            source_path = existing.get('source_path') if existing else None
+        success = database.update_pattern(
+            pattern_id=pattern_id,
+            name=data['name'],
+            items=data.get('items', []),
+            source_path=source_path
+        )
+    except (ValueError, sqlite3.IntegrityError) as e:
+        # Missing source file or a name another pattern already has
+        return jsonify({'success': False, 'error': str(e)}), 400
     # Log activity
     database.log_activity('edited', 'pattern', pattern_id, data['name'])
     return jsonify({'success': success})
@@ -424,6 +812,15 @@ def delete_pattern(pattern_id):
     return jsonify({'success': success})
 
 
+@app.route('/api/patterns/<int:pattern_id>/messages', methods=['GET'])
+def get_pattern_messages(pattern_id):
+    """Get the messages whose templates use a pattern"""
+    pattern = database.get_pattern_by_name_or_id(pattern_id)
+    if not pattern:
+        return jsonify({'success': False, 'error': 'Pattern not found'}), 404
+    return jsonify(database.get_pattern_dependents(pattern['name']))
+
+
 # ==================== SETTINGS ROUTES ====================
 
 @app.route('/api/settings', methods=['GET'])
@@ -466,14 +863,19 @@ def send_message(message_id):
 
 # ==================== LISTENER ROUTES ====================
 
+def get_listener_state() -> dict:
+    """Current listener status (shared by the HTTP route and RPC)"""
+    return {
+        'active': listener_active,
+        'hotkey_count': len(hotkey_registry),
+        'conflicts': get_hotkey_conflicts()
+    }
+
+
 @app.route('/api/listener/status', methods=['GET'])
 def get_listener_status():
     """Get the current listener status"""
-    global listener_active, registered_hotkeys
-    return jsonify({
-        'active': listener_active,
-        'hotkey_count': len(registered_hotkeys)
-    })
+    return jsonify(get_listener_state())
 
 
 @app.route('/api/listener/start', methods=['POST'])
@@ -498,39 +900,159 @@ def stop_listener_route():
 
 @app.route('/api/listener/refresh', methods=['POST'])
 def refresh_listener_route():
-    """Refresh the keyboard listener (reload hotkeys)"""
-    global listener_active
+    """Refresh the keyboard listener (apply hotkey changes)"""
     try:
-        if listener_active:
-            stop_listener()
-            start_listener()
-        return jsonify({'success': True, 'active': listener_active})
+        changes = refresh_hotkeys() if listener_active else {}
+        return jsonify({'success': True, 'active': listener_active, **changes})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 
+# ==================== SCHEDULE ROUTES ====================
+
+def parse_run_at(data: dict) -> float:
+    """Get the run time of a schedule request in epoch seconds"""
+    if data.get('delay_ms') is not None:
+        return time.time() + max(int(data['delay_ms']), 0) / 1000.0
+    run_at = data.get('run_at')
+    if isinstance(run_at, (int, float)):
+        return float(run_at)
+    if isinstance(run_at, str) and run_at:
+        # ISO format, naive times are local time
+        return datetime.fromisoformat(run_at).timestamp()
+    raise ValueError('run_at or delay_ms is required')
+
+
+@app.route('/api/schedules', methods=['GET'])
+def get_schedules():
+    """Get scheduled sends (?all=1 includes finished ones)"""
+    active_only = request.args.get('all', '0') not in ('1', 'true')
+    return jsonify(database.get_scheduled_jobs(active_only))
+
+
+@app.route('/api/schedules', methods=['POST'])
+def create_schedule():
+    """Schedule a message or combination for later, optionally repeating"""
+    data = request.json or {}
+    try:
+        if data.get('item_type') not in ('message', 'combination'):
+            raise ValueError("item_type must be 'message' or 'combination'")
+        item_id = int(data['item_id'])
+        run_at = parse_run_at(data)
+        interval_ms = int(data['interval_ms']) if data.get('interval_ms') else None
+        if interval_ms is not None and interval_ms < scheduler.MIN_INTERVAL_MS:
+            raise ValueError(f'interval_ms must be at least {scheduler.MIN_INTERVAL_MS}')
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    job_id = database.create_scheduled_job(data['item_type'], item_id, run_at, interval_ms)
+    job_scheduler.add(database.get_scheduled_job(job_id))
+    return jsonify({'id': job_id, 'run_at': run_at, 'success': True})
+
+
+@app.route('/api/schedules/<int:job_id>', methods=['DELETE'])
+def delete_schedule(job_id):
+    """Cancel a scheduled send"""
+    job_scheduler.remove(job_id)
+    success = database.delete_scheduled_job(job_id)
+    return jsonify({'success': success})
+
+
+# ==================== WINDOW RULE ROUTES ====================
+
+def parse_window_rule(data: dict) -> dict:
+    """Validate a window rule request body"""
+    if not data or not str(data.get('window_pattern', '')).strip():
+        raise ValueError('window_pattern is required')
+    if data.get('item_type') not in ('message', 'combination'):
+        raise ValueError("item_type must be 'message' or 'combination'")
+    return {
+        'window_pattern': str(data['window_pattern']).strip(),
+        'item_type': data['item_type'],
+        'item_id': int(data['item_id']),
+        'trigger_key': data.get('trigger_key') or None,
+        'priority': int(data.get('priority', 0))
+    }
+
+
+@app.route('/api/window-rules', methods=['GET'])
+def get_window_rules():
+    """Get all window rules"""
+    return jsonify(database.get_all_window_rules())
+
+
+@app.route('/api/window-rules', methods=['POST'])
+def create_window_rule():
+    """Create a new window rule"""
+    try:
+        rule = parse_window_rule(request.json)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    rule_id = database.create_window_rule(**rule)
+    if listener_active:
+        refresh_hotkeys()
+    return jsonify({'id': rule_id, 'success': True})
+
+
+@app.route('/api/window-rules/<int:rule_id>', methods=['PUT'])
+def update_window_rule(rule_id):
+    """Update a window rule"""
+    try:
+        rule = parse_window_rule(request.json)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    success = database.update_window_rule(rule_id, **rule)
+    if listener_active:
+        refresh_hotkeys()
+    return jsonify({'success': success})
+
+
+@app.route('/api/window-rules/<int:rule_id>', methods=['DELETE'])
+def delete_window_rule(rule_id):
+    """Delete a window rule"""
+    success = database.delete_window_rule(rule_id)
+    if listener_active:
+        refresh_hotkeys()
+    return jsonify({'success': success})
+
+
+@app.route('/api/window-rules/resolve', methods=['GET'])
+def resolve_window_rule():
+    """Show which actions a key would trigger in a window (defaults to the active one)"""
+    trigger_key = hotkeys.normalize_key(request.args.get('key', ''))
+    title = request.args.get('title')
+    if title is None:
+        title = get_active_window_title()
+    
+    dispatch = hotkey_dispatch if listener_active else build_dispatch_map()
+    resolved = dispatch.resolve(trigger_key, title)
+    actions, matched_rule = resolved if resolved else ((), False)
+    return jsonify({
+        'key': trigger_key,
+        'title': title,
+        'matched_rule': matched_rule,
+        'actions': [action._asdict() for action in actions]
+    })
+
+
 # ==================== WINDOW ROUTES ====================
 
 @app.route('/api/windows', methods=['GET'])
 def get_windows():
-    """Get list of all open windows"""
-    if not WINDOW_SUPPORT:
+    """
+    Get list of all open windows
+    With ?since=<version> only titles added or removed since then are returned
+    """
+    if not window_provider.available:
         return jsonify({'windows': [], 'error': 'Window support not available'})
     
     try:
-        all_windows = gw.getAllWindows()
-        # Filter out empty titles and system windows
-        windows = []
-        seen_titles = set()
-        for w in all_windows:
-            title = w.title.strip()
-            if title and title not in seen_titles and len(title) > 2:
-                # Skip some common system windows
-                if title not in ['Program Manager', 'Windows Input Experience']:
-                    windows.append(title)
-                    seen_titles.add(title)
+        since = request.args.get('since', type=int)
+        if since is not None:
+            return jsonify(window_watcher.diff_since(since))
         
-        return jsonify({'windows': sorted(windows)})
+        version, titles = window_watcher.snapshot()
+        return jsonify({'windows': titles, 'version': version})
     except Exception as e:
         return jsonify({'windows': [], 'error': str(e)})
 
@@ -566,6 +1088,66 @@ def get_period_stats():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/dashboard/windows', methods=['GET'])
+def get_window_stats():
+    """Get sends per target application (?group=app) or window title (?group=title)"""
+    days = request.args.get('days', 7, type=int)
+    group = request.args.get('group', 'app')
+    if group not in ('app', 'title'):
+        return jsonify({'success': False, 'error': "group must be 'app' or 'title'"}), 400
+    try:
+        windows_stats = database.get_window_stats(days, group)
+        return jsonify({'windows': windows_stats, 'total': sum(w['count'] for w in windows_stats)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def heatmap_range(args) -> tuple:
+    """
+    Get the (start, end) epoch times of a heatmap request
+    ?start=YYYY-MM-DD&end=YYYY-MM-DD (local dates, end included) or ?days=
+    """
+    # Empty values (e.g. ?start=&end=2024-06-30) count as missing
+    if args.get('start') or args.get('end'):
+        start = datetime.strptime(args.get('start') or '1970-01-02', '%Y-%m-%d').timestamp()
+        end = datetime.strptime(args['end'], '%Y-%m-%d').timestamp() + 86400 if args.get('end') else time.time()
+        if end <= start:
+            raise ValueError('end must not be before start')
+        return start, end
+    days = args.get('days', 30, type=int)
+    if days < 1:
+        raise ValueError('days must be at least 1')
+    end = time.time()
+    return end - days * 86400, end
+
+
+@app.route('/api/dashboard/heatmap', methods=['GET'])
+def get_usage_heatmap():
+    """
+    Get sends per day of week (rows, Monday first) and hour of day (columns)
+    ?type=message|combination&id= limits it to one item
+    """
+    item_type = request.args.get('type')
+    item_id = request.args.get('id', type=int)
+    if item_type is not None and item_type not in database.FRECENCY_TABLES:
+        return jsonify({'success': False, 'error': "type must be 'message' or 'combination'"}), 400
+    if (item_type is None) != (item_id is None):
+        return jsonify({'success': False, 'error': 'type and id must be given together'}), 400
+    try:
+        start, end = heatmap_range(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    try:
+        matrix = database.get_usage_heatmap(start, end, item_type, item_id)
+        return jsonify({
+            'matrix': matrix,
+            'total': sum(map(sum, matrix)),
+            'max': max(map(max, matrix))
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/dashboard/logs', methods=['GET'])
 def get_recent_logs():
     """Get recent message logs"""
@@ -588,6 +1170,19 @@ def get_recent_messages():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/dashboard/top', methods=['GET'])
+def get_top_items():
+    """Get the most frequently and recently used messages and combinations"""
+    limit = request.args.get('limit', 10, type=int)
+    item_type = request.args.get('type')
+    if item_type and item_type not in database.FRECENCY_TABLES:
+        return jsonify({'success': False, 'error': "type must be 'message' or 'combination'"}), 400
+    try:
+        return jsonify(database.get_top_items(limit, item_type))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/dashboard/favorites', methods=['GET'])
 def get_favorite_messages():
     """Get favorite messages"""
@@ -631,23 +1226,36 @@ def get_most_used_patterns():
 
 # ==================== COMBINATION ROUTES ====================
 
+def parse_timing(data: dict):
+    """Validate the optional timing config of a combination, stored as JSON text"""
+    timing = data.get('timing')
+    if not timing:
+        return None
+    model = automation.TimingModel.from_config(timing, data.get('delay_ms', 500))
+    return json.dumps(model.to_config())
+
+
 @app.route('/api/combinations', methods=['GET'])
 def get_combinations():
     """Get all combinations"""
-    combinations = database.get_all_combinations()
-    return jsonify(combinations)
+    return cached_payload('combinations')
 
 
 @app.route('/api/combinations', methods=['POST'])
 def create_combination():
     """Create a new combination"""
     data = request.json
+    try:
+        timing = parse_timing(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': f'Invalid timing: {e}'}), 400
     combination_id = database.create_combination(
         name=data['name'],
         message_ids=data.get('message_ids', []),
         trigger_key=data.get('trigger_key'),
         delay_ms=data.get('delay_ms', 500),
-        icon=data.get('icon')
+        icon=data.get('icon'),
+        timing=timing
     )
     # Log activity
     database.log_activity('created', 'combination', combination_id, data['name'])
@@ -667,13 +1275,22 @@ def get_combination(combination_id):
 def update_combination(combination_id):
     """Update a combination"""
     data = request.json
+    try:
+        timing = parse_timing(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': f'Invalid timing: {e}'}), 400
+    if 'timing' not in data:
+        # Keep the stored timing when the client does not send one
+        existing = database.get_combination_by_id(combination_id)
+        timing = existing.get('timing') if existing else None
     success = database.update_combination(
         combination_id=combination_id,
         name=data['name'],
         message_ids=data.get('message_ids', []),
         trigger_key=data.get('trigger_key'),
         delay_ms=data.get('delay_ms', 500),
-        icon=data.get('icon')
+        icon=data.get('icon'),
+        timing=timing
     )
     # Log activity
     database.log_activity('edited', 'combination', combination_id, data['name'])
@@ -716,9 +1333,175 @@ def send_combination(combination_id):
         return jsonify({'success': False, 'error': str(e)})
 
 
+# ==================== WORKSPACE ROUTES ====================
+
+def switch_workspace(workspace_id: str) -> dict:
+    """Activate a workspace and reload what was loaded from the previous one"""
+    workspace = workspaces.activate_workspace(workspace_id)
+    job_scheduler.clear()
+    job_scheduler.load(database.get_scheduled_jobs())
+    if listener_active:
+        refresh_hotkeys()
+    return workspace
+
+
+@app.route('/api/workspaces', methods=['GET'])
+def get_workspaces():
+    """Get all workspaces"""
+    return jsonify(workspaces.list_workspaces())
+
+
+@app.route('/api/workspaces', methods=['POST'])
+def create_workspace():
+    """Create a new workspace"""
+    data = request.json or {}
+    try:
+        workspace = workspaces.create_workspace(data.get('name', ''))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'workspace': workspace})
+
+
+@app.route('/api/workspaces/<workspace_id>/activate', methods=['POST'])
+def activate_workspace(workspace_id):
+    """Switch to a workspace, windows should reload their data afterwards"""
+    try:
+        workspace = switch_workspace(workspace_id)
+    except KeyError:
+        return jsonify({'success': False, 'error': 'Workspace not found'}), 404
+    return jsonify({'success': True, 'workspace': workspace})
+
+
+@app.route('/api/workspaces/<workspace_id>', methods=['DELETE'])
+def delete_workspace(workspace_id):
+    """Delete an inactive workspace and its database"""
+    try:
+        deleted = workspaces.delete_workspace(workspace_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if not deleted:
+        return jsonify({'success': False, 'error': 'Workspace not found'}), 404
+    return jsonify({'success': True})
+
+
+# ==================== BOOTSTRAP ROUTES ====================
+
+# Sections of /api/bootstrap other than CACHED_LISTS, called with request.args
+BOOTSTRAP_SECTIONS = {
+    'settings': lambda args: database.get_settings(),
+    'listener': lambda args: get_listener_state(),
+    'stats': lambda args: database.get_dashboard_stats(),
+    'period': lambda args: {
+        'stats': database.get_period_stats(args.get('days', 7, type=int)),
+        'total': database.get_period_total(args.get('days', 7, type=int))
+    },
+    'logs': lambda args: database.get_recent_logs(args.get('logs_limit', 10, type=int)),
+    'recent': lambda args: database.get_recent_messages(args.get('recent_limit', 5, type=int)),
+    'top': lambda args: database.get_top_items(args.get('top_limit', 10, type=int)),
+    'windows': lambda args: database.get_window_stats(args.get('days', 7, type=int)),
+    'favorites': lambda args: database.get_favorite_messages(),
+    'tip': lambda args: {'tip': database.get_random_tip()},
+    'workspace': lambda args: workspaces.get_active_workspace(),
+}
+
+
+@app.route('/api/bootstrap', methods=['GET'])
+def get_bootstrap():
+    """
+    Get everything a window needs at startup in one response
+    ?sections=messages,combinations,settings,... selects the sections
+    (messages, patterns, combinations, settings, listener, stats, period,
+    logs, recent, top, windows, favorites, tip, workspace); period and
+    windows take ?days=, logs ?logs_limit=, recent ?recent_limit= and
+    top ?top_limit=. All sections are read in one transaction;
+    the lists come from the same cache as their own routes. A section
+    that fails holds {"error": ...} instead of failing the response.
+    """
+    sections = [s.strip() for s in request.args.get('sections', '').split(',') if s.strip()]
+    available = list(CACHED_LISTS) + list(BOOTSTRAP_SECTIONS)
+    unknown = [s for s in sections if s not in available]
+    if not sections or unknown:
+        error = f"Unknown sections: {', '.join(unknown)}" if unknown else 'sections is required'
+        return jsonify({'success': False, 'error': error, 'sections': available}), 400
+
+    parts = []
+    with database.read_snapshot():
+        for name in dict.fromkeys(sections):
+            try:
+                if name in CACHED_LISTS:
+                    body = cached_list_body(name)[0]
+                else:
+                    body = payloads.serialize(BOOTSTRAP_SECTIONS[name](request.args))
+            except Exception as e:
+                body = payloads.serialize({'error': str(e)})
+            parts.append(payloads.serialize(name) + b':' + body)
+    return Response(b'{' + b','.join(parts) + b'}', mimetype='application/json')
+
+
+# ==================== RPC METHODS ====================
+
+def rpc_overlay_status() -> dict:
+    """Everything the overlay polls for, in one call"""
+    settings = database.get_settings()
+    return {
+        'listener': get_listener_state(),
+        'enter_enabled': settings.get('enter_enabled', 'true'),
+        'target_windows': settings.get('target_windows', '[]')
+    }
+
+
+def rpc_update_settings(**values) -> dict:
+    for key, value in values.items():
+        database.update_setting(key, str(value))
+    return {'success': True}
+
+
+def rpc_start_listener() -> dict:
+    start_listener()
+    return {'success': True, 'active': True}
+
+
+def rpc_stop_listener() -> dict:
+    stop_listener()
+    return {'success': True, 'active': False}
+
+
+def rpc_send(item_type: str, item_id: int) -> dict:
+    """Queue a send and return at once, like the overlay's fire-and-forget HTTP call"""
+    action = send_combination_action if item_type == 'combination' else send_message_action
+    send_executor.submit(action, int(item_id))
+    return {'success': True}
+
+
+# Hot overlay calls served over the local JSON-RPC socket (ipc.RpcServer)
+rpc_methods = {
+    'overlay.status': rpc_overlay_status,
+    'listener.status': get_listener_state,
+    'listener.start': rpc_start_listener,
+    'listener.stop': rpc_stop_listener,
+    'settings.get': database.get_settings,
+    'settings.update': rpc_update_settings,
+    'send': rpc_send,
+}
+
+
 if __name__ == '__main__':
-    import sys
-    import os
+    import argparse
+    import multiprocessing
+    import server
+    
+    # Needed by the /api/render process pool in the packaged executable
+    multiprocessing.freeze_support()
+    
+    parser = argparse.ArgumentParser(description='KenFlow backend')
+    parser.add_argument('--server', choices=server.SERVER_MODES,
+                        default=os.environ.get('KENFLOW_SERVER', 'dev'),
+                        help='dev: Werkzeug development server, production: pooled WSGI server')
+    parser.add_argument('--threads', type=int, default=server.DEFAULT_THREADS,
+                        help='worker threads of the production server')
+    parser.add_argument('--unix-socket', help='serve HTTP on this Unix domain socket instead of port 5000')
+    parser.add_argument('--rpc-socket', help='also serve the JSON-RPC overlay channel on this Unix domain socket')
+    args = parser.parse_args()
     
     # Check if running as packaged exe (no console)
     is_packaged = getattr(sys, 'frozen', False)
@@ -738,18 +1521,31 @@ if __name__ == '__main__':
         print("="*50)
         print("KenFlow - Smart Message Automation")
         print("="*50)
-        print(f"Database: {database.DATABASE_PATH}")
+        print(f"Database: {workspaces.get_active_workspace()['path']}")
     
-    database.init_database()
+    workspaces.open_active_workspace()
+    start_scheduler()
     
-    if not is_packaged:
+    if args.rpc_socket:
+        import ipc
+        if ipc.RPC_SUPPORT:
+            ipc.RpcServer(args.rpc_socket, rpc_methods).start()
+            print(f"RPC channel at {args.rpc_socket}")
+        else:
+            print("Warning: Unix domain sockets not supported. RPC channel disabled.")
+    
+    if not is_packaged and not args.unix_socket:
         print("Starting KenFlow Backend Server...")
         print("Server running at http://localhost:5000")
     
-    # Run Flask with Werkzeug banner disabled when packaged
-    import logging
-    if is_packaged:
-        log = logging.getLogger('werkzeug')
-        log.setLevel(logging.ERROR)
-    
-    app.run(host='127.0.0.1', port=5000, debug=False, threaded=True)
+    if args.server == 'production' or args.unix_socket:
+        server.serve(app, host='127.0.0.1', port=5000, mode=args.server, threads=args.threads,
+                     unix_socket=args.unix_socket)
+    else:
+        # Run Flask with Werkzeug banner disabled when packaged
+        import logging
+        if is_packaged:
+            log = logging.getLogger('werkzeug')
+            log.setLevel(logging.ERROR)
+        
+        app.run(host='127.0.0.1', port=5000, debug=False, threaded=True)
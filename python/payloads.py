@@ -0,0 +1,197 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Payload module for KenFlow application
+Compression and compact encodings for API responses
+
+Büyük yanıtlar için:
+- İstemcinin desteklediği sıkıştırmayı (brotli, gzip) seçer
+- Listeleri sütun tabanlı JSON veya msgpack olarak kodlar
+- Serileştirilmiş gövdeleri veri değişene kadar önbellekte tutar
+"""
+
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+    BROTLI_SUPPORT = True
+except ImportError:
+    BROTLI_SUPPORT = False
+
+try:
+    import msgpack
+    MSGPACK_SUPPORT = True
+except ImportError:
+    MSGPACK_SUPPORT = False
+
+# Smaller bodies are sent as they are, compressing them costs more than it saves
+COMPRESSION_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+FORMATS = ('json', 'columns', 'msgpack')
+MIMETYPES = {
+    'json': 'application/json',
+    'columns': 'application/json',
+    'msgpack': 'application/x-msgpack',
+}
+
+# Changes every start, so ETags of a previous run never match
+BOOT_ID = os.urandom(4).hex()
+
+
+# ==================== COMPRESSION ====================
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Get {coding: q} from an Accept-Encoding header"""
+    codings = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[coding.strip().lower()] = q
+    return codings
+
+
+def choose_encoding(header: Optional[str]) -> Optional[str]:
+    """Pick 'br' or 'gzip' from an Accept-Encoding header, None for identity"""
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get('*', 0.0)
+    candidates = (['br'] if BROTLI_SUPPORT else []) + ['gzip']
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = codings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress body with 'br' or 'gzip'"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f'Unsupported encoding: {encoding}')
+
+
+# ==================== ENCODINGS ====================
+
+def to_columns(records: List[Dict]) -> Dict:
+    """
+    Column-oriented form of a list of dicts: {"columns": [...], "rows": [[...]]}
+    Nested lists of dicts (e.g. message templates) are converted as well
+    """
+    columns = []
+    seen = set()
+    for record in records:
+        for key in record:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+    rows = []
+    for record in records:
+        row = []
+        for key in columns:
+            value = record.get(key)
+            if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+                value = to_columns(value)
+            row.append(value)
+        rows.append(row)
+    return {'columns': columns, 'rows': rows}
+
+
+def from_columns(table: Dict) -> List[Dict]:
+    """Inverse of to_columns()"""
+    columns = table['columns']
+    records = []
+    for row in table['rows']:
+        record = {}
+        for key, value in zip(columns, row):
+            if isinstance(value, dict) and set(value) == {'columns', 'rows'}:
+                value = from_columns(value)
+            record[key] = value
+        records.append(record)
+    return records
+
+
+def serialize(data: Any, fmt: str = 'json') -> bytes:
+    """Encode data in one of FORMATS"""
+    if fmt == 'columns' and isinstance(data, list):
+        data = to_columns(data)
+    elif fmt == 'msgpack':
+        if not MSGPACK_SUPPORT:
+            raise ValueError('msgpack is not installed')
+        return msgpack.packb(data, use_bin_type=True)
+    elif fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# ==================== CACHE ====================
+
+class PayloadCache:
+    """
+    Serialized response bodies per key and format.
+
+    An entry is kept until the data version it was built for changes;
+    compressed variants are made on first request and kept with it, so
+    an unchanged list costs neither a query nor a json.dumps nor a
+    compression. The least recently used entries are dropped past
+    max_entries.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, version: Tuple, fmt: str, encoding: Optional[str],
+            build: Callable[[], Any]) -> Tuple[bytes, Optional[str]]:
+        """
+        Get the body of key for a data version, building it on a miss
+        Returns (body, applied_encoding); small bodies are not compressed
+        """
+        with self._lock:
+            entry = self._entries.get((key, fmt))
+            if entry is not None and entry['version'] == version:
+                self._entries.move_to_end((key, fmt))
+                self.hits += 1
+            else:
+                entry = None
+                self.misses += 1
+
+        if entry is None:
+            # Build outside the lock; the version was read before the data,
+            # so a change during the build only causes one more rebuild
+            entry = {'version': version, 'bodies': {None: serialize(build(), fmt)}}
+            with self._lock:
+                self._entries[(key, fmt)] = entry
+                self._entries.move_to_end((key, fmt))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        bodies = entry['bodies']
+        if encoding is None or len(bodies[None]) < COMPRESSION_MIN_BYTES:
+            return bodies[None], None
+        body = bodies.get(encoding)
+        if body is None:
+            body = bodies[encoding] = compress(bodies[None], encoding)
+        return body, encoding
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
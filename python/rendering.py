@@ -0,0 +1,925 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Rendering module for KenFlow application
+Turns message templates into texts using pattern lists
+
+Her gönderimde farklı bir metin üretmek için:
+- Şablonlardaki {kalip} yer tutucularını rastgele değerlerle doldurur
+- Aynı pencereye yakın zamanda gönderilen metinleri hatırlar
+"""
+
+import io
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import accumulate, chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# {pattern_name} placeholders used inside templates
+PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+
+# Defaults for the recent output memory
+DEFAULT_HISTORY_SIZE = 50
+DEFAULT_MAX_WINDOWS = 32
+DEFAULT_RETRY_BUDGET = 10
+
+# Patterns may reference other patterns up to this depth
+MAX_NESTING_DEPTH = 8
+
+
+class PatternValues(Sequence):
+    """
+    Read-only list of pattern values packed into one UTF-8 buffer
+    Value i is buffer[offsets[i]:offsets[i + 1]], so a pattern costs about
+    one byte per character plus 4 bytes per value instead of a str object
+    and a list slot per value. Indexing (and so random.choice) stays O(1).
+    """
+
+    __slots__ = ('_buffer', '_offsets', '_count', 'has_placeholders', '_distinct')
+
+    def __init__(self, values: Iterable[str] = ()):
+        buffer = io.BytesIO()
+        offsets = array('I', [0])
+        end = 0
+        for value in values:
+            end += buffer.write(value.encode('utf-8'))
+            offsets.append(end)
+        self._buffer = buffer.getvalue()
+        self._offsets = offsets
+        self._count = len(offsets) - 1
+        # Without any '{' no value needs expanding, so none has to be read
+        self.has_placeholders = b'{' in self._buffer
+        self._distinct = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if 0 <= index < self._count:
+            offsets = self._offsets
+            return self._buffer[offsets[index]:offsets[index + 1]].decode('utf-8')
+        if -self._count <= index < 0:
+            return self[index + self._count]
+        raise IndexError('pattern value index out of range')
+
+    def __iter__(self) -> Iterator[str]:
+        buffer = self._buffer
+        offsets = self._offsets
+        for index in range(self._count):
+            yield buffer[offsets[index]:offsets[index + 1]].decode('utf-8')
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PatternValues):
+            return self._buffer == other._buffer and self._offsets == other._offsets
+        return list(self) == other
+
+    def __repr__(self) -> str:
+        return f'PatternValues({self._count} values)'
+
+    def distinct(self) -> Sequence:
+        """Values without duplicates, indexed in place; found once and kept"""
+        if self._distinct is None:
+            buffer = self._buffer
+            offsets = self._offsets
+            self._distinct = _first_occurrences(
+                buffer[offsets[index]:offsets[index + 1]] for index in range(self._count)
+            )
+        return DistinctValues(self, self._distinct)
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the packed values"""
+        return sys.getsizeof(self._buffer) + self._offsets.itemsize * len(self._offsets)
+
+
+class DistinctValues(Sequence):
+    """View of the values at the given indexes, e.g. the first occurrence of each value"""
+
+    __slots__ = ('_values', '_indexes')
+
+    def __init__(self, values: Sequence, indexes: array):
+        self._values = values
+        self._indexes = indexes
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._values[i] for i in self._indexes[index]]
+        return self._values[self._indexes[index]]
+
+
+def _first_occurrences(values: Iterable[bytes]) -> array:
+    """Indexes of the first occurrence of every distinct value"""
+    seen = set()
+    indexes = array('I')
+    for index, value in enumerate(values):
+        if value not in seen:
+            seen.add(value)
+            indexes.append(index)
+    return indexes
+
+
+# File-backed patterns check their file for changes at most this often
+FILE_CHECK_INTERVAL = 1.0
+
+
+class FileLines(Sequence):
+    """
+    Lines of one version of a pattern file: an open handle and the start
+    offsets of its non-empty lines. Never changes, so a render that took
+    it sees the same lines from len() to the draw. Each value is read
+    from the handle when drawn; the file may be rewritten before the next
+    re-index, a line that is no longer there reads as an empty value.
+    """
+
+    __slots__ = ('_file', '_lock', '_starts', 'has_placeholders', '_distinct')
+
+    def __init__(self, file=None, starts: array = None, has_placeholders: bool = False):
+        self._file = file
+        self._lock = threading.Lock()
+        self._starts = starts if starts is not None else array('Q')
+        self.has_placeholders = has_placeholders
+        self._distinct = None
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _line(self, start: int) -> str:
+        with self._lock:
+            self._file.seek(start)
+            line = self._file.readline()
+        return line.decode('utf-8', 'replace').rstrip('\r\n')
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._line(start) for start in self._starts[index]]
+        return self._line(self._starts[index])
+
+    def __iter__(self) -> Iterator[str]:
+        for start in self._starts:
+            yield self._line(start)
+
+    def distinct(self) -> Sequence:
+        """Lines without duplicates, indexed in place; found once and kept"""
+        if self._distinct is None:
+            with self._lock:
+                self._file.seek(0)
+                # One sequential pass, the non-empty lines in file order match the starts
+                lines = (line.rstrip(b'\r\n') for line in self._file if line.strip())
+                if self._starts and self._starts[0] == 3:
+                    lines = chain([next(lines)[3:]], lines)
+                self._distinct = _first_occurrences(islice(lines, len(self._starts)))
+        return DistinctValues(self, self._distinct)
+
+    def nbytes(self) -> int:
+        return self._starts.itemsize * len(self._starts)
+
+
+class FilePatternValues(Sequence):
+    """
+    Pattern values read from a text file, one value per non-empty line
+    The file is indexed once into an array of line start offsets and
+    kept open, so a random draw reads only its own line. The file is
+    re-indexed when its size or modification time changes, renders take
+    one snapshot() so a re-index in between cannot shift the lines under
+    them. A missing or empty file has no values.
+    """
+
+    __slots__ = ('path', '_lock', '_state', '_stamp', '_checked_at', '_closed')
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # Swapped as a whole on re-index
+        self._state = FileLines()
+        self._stamp = None
+        self._checked_at = None
+        self._closed = False
+        self._refresh()
+
+    def __reduce__(self):
+        # Batch render workers index the file themselves
+        return (FilePatternValues, (self.path,))
+
+    def _refresh(self):
+        """Re-index the file if it changed, checked at most every FILE_CHECK_INTERVAL"""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < FILE_CHECK_INTERVAL:
+            return
+        with self._lock:
+            if self._closed or (self._checked_at is not None and now - self._checked_at < FILE_CHECK_INTERVAL):
+                return
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+                stamp = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                stamp = None
+            if stamp == self._stamp:
+                return
+            self._stamp = stamp
+            # The old handle is closed once no render in progress uses it
+            self._state = self._index() if stamp and stamp[0] else FileLines()
+
+    def _index(self) -> FileLines:
+        # Not memory-mapped: reading a mapping past the end of a file that
+        # was truncated meanwhile kills the process (SIGBUS)
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return FileLines()
+        try:
+            # 4 bytes per line unless the file is larger than 4 GB
+            starts = array('I' if os.fstat(f.fileno()).st_size < 2 ** 32 else 'Q')
+            position = 0
+            for line in f:
+                if line.strip():
+                    starts.append(position)
+                position += len(line)
+            f.seek(0)
+            if starts and starts[0] == 0 and f.read(3) == b'\xef\xbb\xbf':
+                starts[0] = 3
+            # Searching in large blocks is much faster than per line
+            f.seek(0)
+            has_placeholders = any(b'{' in block for block in iter(lambda: f.read(1 << 20), b''))
+        except (OSError, ValueError):
+            f.close()
+            return FileLines()
+        return FileLines(f, starts, has_placeholders)
+
+    def snapshot(self) -> FileLines:
+        """Get the current lines of the file"""
+        self._refresh()
+        return self._state
+
+    def close(self):
+        """Stop following the file, it has no values from now on"""
+        with self._lock:
+            self._closed = True
+            self._stamp = None
+            self._state = FileLines()
+
+    def __len__(self) -> int:
+        return len(self.snapshot())
+
+    def __getitem__(self, index):
+        return self._state[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._state)
+
+    def nbytes(self) -> int:
+        """Memory used by the line index, values are read from the file when drawn"""
+        return self._state.nbytes()
+
+    def __repr__(self) -> str:
+        return f'FilePatternValues({self.path!r}, {len(self._state)} values)'
+
+
+# One index and handle per file, shared by every load of the pattern
+_file_patterns = {}
+_file_patterns_lock = threading.Lock()
+
+
+def file_pattern(path: str) -> FilePatternValues:
+    """Get the shared FilePatternValues of a file"""
+    path = os.path.abspath(path)
+    with _file_patterns_lock:
+        values = _file_patterns.get(path)
+        if values is None:
+            values = _file_patterns[path] = FilePatternValues(path)
+    return values
+
+
+def release_file_patterns(keep: Iterable[str] = ()):
+    """Close and forget the shared file patterns whose path is not in keep"""
+    keep = set(keep)
+    with _file_patterns_lock:
+        released = [values for path, values in _file_patterns.items() if path not in keep]
+        for values in released:
+            del _file_patterns[values.path]
+    for values in released:
+        values.close()
+
+
+def current_values(values):
+    """Values of a pattern to use for one render, file-backed ones can change between calls"""
+    if values.__class__ is FilePatternValues:
+        return values.snapshot()
+    return values
+
+
+def render_template(template: str, pattern_dict: Dict[str, List[str]], rng=random, _stack: Tuple[str, ...] = ()) -> str:
+    """
+    Replace pattern placeholders with random values from pattern_dict
+    Values may contain placeholders themselves, they are expanded too.
+    Unknown, empty or self-referencing patterns are left untouched
+    """
+    def replace_pattern(match):
+        name = match.group(1)
+        values = current_values(pattern_dict.get(name))
+        if not values or name in _stack or len(_stack) >= MAX_NESTING_DEPTH:
+            return match.group(0)  # Return original if pattern not found
+        value = rng.choice(values)
+        if '{' in value:
+            value = render_template(value, pattern_dict, rng, _stack + (name,))
+        return value
+
+    return PLACEHOLDER_RE.sub(replace_pattern, template)
+
+
+def compile_template(template: str, pattern_dict: Dict[str, List[str]]) -> Tuple:
+    """
+    Pre-resolve a template for repeated rendering
+    Literal text stays a string, known placeholders become (name, values)
+    """
+    compiled = []
+    for index, part in enumerate(parse_template(template)):
+        if index % 2 == 0:
+            if part:
+                compiled.append(part)
+        elif pattern_dict.get(part):
+            compiled.append((part, pattern_dict[part]))
+        else:
+            compiled.append('{' + part + '}')
+    return tuple(compiled)
+
+
+def render_compiled(compiled: Tuple, pattern_dict: Dict[str, List[str]], rng=random) -> str:
+    """Render a template prepared by compile_template()"""
+    choice = rng.choice
+    result = []
+    for piece in compiled:
+        if piece.__class__ is str:
+            result.append(piece)
+            continue
+        name, values = piece
+        if values.__class__ is FilePatternValues:
+            # The file may have been emptied since the template was compiled
+            values = values.snapshot()
+            if not values:
+                result.append('{' + name + '}')
+                continue
+        value = choice(values)
+        if '{' in value:
+            value = render_template(value, pattern_dict, rng, (name,))
+        result.append(value)
+    return ''.join(result)
+
+
+@lru_cache(maxsize=4096)
+def parse_template(template: str) -> Tuple[str, ...]:
+    """
+    Split a template into literal text and placeholder names
+    Even indexes are literals, odd indexes are pattern names
+    """
+    return tuple(PLACEHOLDER_RE.split(template))
+
+
+def template_pattern_names(template: str) -> List[str]:
+    """Names of the patterns a template references, each once"""
+    return list(dict.fromkeys(PLACEHOLDER_RE.findall(template)))
+
+
+class VariantSpace:
+    """
+    All distinct texts a set of templates can produce.
+
+    Counting works on pattern cardinalities instead of enumerating:
+    a template yields the product of its placeholder counts and a pattern
+    yields the sum of its (nested) value counts. Every variant has an
+    index in [0, count()) and variant_at() decodes it directly, so any
+    page of variants can be produced without building the earlier ones.
+
+    Identical templates and pattern values are counted once. Different
+    choices that happen to join into the same string (e.g. "a" + "bc"
+    and "ab" + "c") are still counted separately, only then count() is
+    more than the number of distinct texts.
+    """
+
+    def __init__(self, templates: List[str], pattern_dict: Dict[str, List[str]]):
+        self.pattern_dict = pattern_dict
+        self._templates = list(dict.fromkeys(templates))
+        self._patterns = {}
+        self._template_counts = [self._text_count(t, ()) for t in self._templates]
+        self._template_offsets = list(accumulate(self._template_counts))
+
+    def _pattern(self, name: str, stack: Tuple[str, ...]):
+        """Get distinct values and cumulative counts of a pattern, None if literal"""
+        key = (name, stack)
+        entry = self._patterns.get(key)
+        if entry is not None:
+            return entry
+        values = current_values(self.pattern_dict.get(name))
+        if not values or name in stack or len(stack) >= MAX_NESTING_DEPTH:
+            return None
+
+        inner = stack + (name,)
+        if not getattr(values, 'has_placeholders', True):
+            # Packed and file-backed values are deduplicated in place instead
+            # of copied; every distinct value counts once, value i is variant i
+            distinct = values.distinct()
+            entry = (distinct, range(1, len(distinct) + 1), inner)
+        else:
+            distinct = list(dict.fromkeys(values))
+            counts = [self._text_count(v, inner) if '{' in v else 1 for v in distinct]
+            entry = (distinct, list(accumulate(counts)), inner)
+        self._patterns[key] = entry
+        return entry
+
+    def _text_count(self, text: str, stack: Tuple[str, ...]) -> int:
+        parts = parse_template(text)
+        total = 1
+        for name in parts[1::2]:
+            entry = self._pattern(name, stack)
+            if entry is not None:
+                total *= entry[1][-1]
+        return total
+
+    def _text_at(self, text: str, stack: Tuple[str, ...], index: int) -> str:
+        parts = parse_template(text)
+        chosen = []
+        # Last placeholder is the least significant digit
+        for name in reversed(parts[1::2]):
+            entry = self._pattern(name, stack)
+            if entry is None:
+                chosen.append('{' + name + '}')
+                continue
+            index, digit = divmod(index, entry[1][-1])
+            chosen.append(self._pattern_at(entry, digit))
+        chosen.reverse()
+
+        result = [parts[0]]
+        for value, literal in zip(chosen, parts[2::2]):
+            result.append(value)
+            result.append(literal)
+        return ''.join(result)
+
+    def _pattern_at(self, entry, index: int) -> str:
+        distinct, offsets, inner = entry
+        position = bisect_right(offsets, index)
+        value = distinct[position]
+        if '{' not in value:
+            return value
+        start = offsets[position - 1] if position else 0
+        return self._text_at(value, inner, index - start)
+
+    def count(self) -> int:
+        """Get the number of distinct variants"""
+        return self._template_offsets[-1] if self._template_offsets else 0
+
+    def variant_at(self, index: int) -> str:
+        """Get the variant with the given index"""
+        if index < 0 or index >= self.count():
+            raise IndexError('variant index out of range')
+        position = bisect_right(self._template_offsets, index)
+        start = self._template_offsets[position - 1] if position else 0
+        return self._text_at(self._templates[position], (), index - start)
+
+    def iter_variants(self, offset: int = 0) -> Iterator[str]:
+        """Lazily yield variants starting from offset"""
+        index = max(offset, 0)
+        total = self.count()
+        while index < total:
+            yield self.variant_at(index)
+            index += 1
+
+
+def referenced_patterns(texts: Iterable[str], pattern_dict: Dict[str, List[str]]) -> set:
+    """Names of the patterns texts use, directly or through the values of other patterns"""
+    names = set()
+    pending = [name for text in texts for name in parse_template(text)[1::2]]
+    while pending:
+        name = pending.pop()
+        if name in names:
+            continue
+        names.add(name)
+        values = current_values(pattern_dict.get(name))
+        if not values or not getattr(values, 'has_placeholders', True):
+            continue
+        for value in values:
+            if '{' in value:
+                pending.extend(parse_template(value)[1::2])
+    return names
+
+
+class RenderCache:
+    """
+    In-memory copy of pattern values, compiled message templates and
+    variant spaces.
+
+    Values are loaded on first use through the given loader functions and
+    kept until invalidate() is called after a data change. Each cached
+    message is registered under the pattern names it uses, so a change
+    to one pattern reloads only that pattern (through load_pattern) and
+    drops only the messages and variant spaces that depend on it.
+    """
+
+    def __init__(self, load_patterns: Callable[[], List[Tuple[int, str, List[str]]]],
+                 load_templates: Callable[[int], Optional[List[str]]],
+                 load_pattern: Callable[[int], Optional[Tuple[str, List[str]]]] = None):
+        """
+        load_patterns() -> [(pattern_id, name, values)]
+        load_templates(message_id) -> template contents
+        load_pattern(pattern_id) -> (name, values), None once deleted;
+        without it every pattern change reloads everything
+        """
+        self._load_patterns = load_patterns
+        self._load_templates = load_templates
+        self._load_pattern = load_pattern
+        self._lock = threading.Lock()
+        self._pattern_dict = None
+        self._pattern_names = {}
+        self._messages = {}
+        self._variants = {}
+        # Pattern name -> ids of cached messages / variant spaces using it
+        self._message_deps = {}
+        self._variant_deps = {}
+        # Bumped on every invalidation so loads racing with a write are not stored
+        self._generation = 0
+        self.full_reloads = 0
+        self.partial_reloads = 0
+
+    def pattern_dict(self) -> Dict[str, List[str]]:
+        """Get pattern values keyed by pattern name"""
+        pattern_dict = self._pattern_dict
+        if pattern_dict is None:
+            generation = self._generation
+            patterns = self._load_patterns()
+            pattern_dict = {name: values for _, name, values in patterns}
+            with self._lock:
+                if generation == self._generation:
+                    self._pattern_dict = pattern_dict
+                    self._pattern_names = {pattern_id: name for pattern_id, name, _ in patterns}
+        return pattern_dict
+
+    def message(self, message_id: int) -> Optional[Tuple[List[str], List[Tuple]]]:
+        """Get (templates, compiled templates) of a message, None if it has none"""
+        entry = self._messages.get(message_id)
+        if entry is None:
+            generation = self._generation
+            templates = self._load_templates(message_id)
+            if not templates:
+                return None
+            pattern_dict = self.pattern_dict()
+            entry = (templates, [compile_template(t, pattern_dict) for t in templates])
+            # Compiled templates hold the values of the patterns they name
+            # directly; nested placeholders are resolved when rendering
+            names = {name for t in templates for name in parse_template(t)[1::2]}
+            with self._lock:
+                if generation == self._generation:
+                    self._messages[message_id] = entry
+                    for name in names:
+                        self._message_deps.setdefault(name, set()).add(message_id)
+        return entry
+
+    def variant_space(self, message_id: int) -> Optional[VariantSpace]:
+        """Get the VariantSpace of a message, None if it has no templates"""
+        space = self._variants.get(message_id)
+        if space is None:
+            generation = self._generation
+            entry = self.message(message_id)
+            if entry is None:
+                return None
+            pattern_dict = self.pattern_dict()
+            space = VariantSpace(entry[0], pattern_dict)
+            # Counts depend on nested patterns as well
+            names = referenced_patterns(entry[0], pattern_dict)
+            with self._lock:
+                if generation == self._generation:
+                    self._variants[message_id] = space
+                    for name in names:
+                        self._variant_deps.setdefault(name, set()).add(message_id)
+        return space
+
+    def invalidate(self, kind: str = None, item_id=None):
+        """Drop cached data affected by a change (database change listener)"""
+        if kind not in (None, 'database', 'message', 'pattern'):
+            return
+        if kind == 'message':
+            with self._lock:
+                self._generation += 1
+                self._messages.pop(item_id, None)
+                self._variants.pop(item_id, None)
+        elif kind == 'pattern' and item_id is not None and self._load_pattern is not None:
+            self._reload_pattern(item_id)
+        else:
+            self._clear()
+
+    def _clear(self):
+        with self._lock:
+            self._generation += 1
+            self.full_reloads += 1
+            self._pattern_dict = None
+            self._pattern_names = {}
+            self._messages = {}
+            self._variants = {}
+            self._message_deps = {}
+            self._variant_deps = {}
+        # Loaded again from the new data, stale file handles must not stay open
+        release_file_patterns()
+
+    def _reload_pattern(self, pattern_id: int):
+        """Reload one pattern and drop only what depends on its old or new name"""
+        with self._lock:
+            self._generation += 1
+            if self._pattern_dict is None:
+                return
+            generation = self._generation
+        loaded = self._load_pattern(pattern_id)
+
+        with self._lock:
+            if generation != self._generation or self._pattern_dict is None:
+                # Another change raced with this one
+                racing = True
+            else:
+                racing = False
+                # Copy on write, renders in progress keep the dict they hold
+                pattern_dict = dict(self._pattern_dict)
+                names = set()
+                old_name = self._pattern_names.pop(pattern_id, None)
+                if old_name is not None:
+                    old_values = pattern_dict.pop(old_name, None)
+                    names.add(old_name)
+                if loaded is not None:
+                    name, values = loaded
+                    pattern_dict[name] = values
+                    self._pattern_names[pattern_id] = name
+                    names.add(name)
+                self._generation += 1
+                self._pattern_dict = pattern_dict
+                for name in names:
+                    for message_id in self._message_deps.pop(name, ()):
+                        self._messages.pop(message_id, None)
+                    for message_id in self._variant_deps.pop(name, ()):
+                        self._variants.pop(message_id, None)
+                self.partial_reloads += 1
+        if racing:
+            self._clear()
+        elif old_name is not None and isinstance(old_values, FilePatternValues):
+            # Close the old file unless another pattern reads it too
+            release_file_patterns(values.path for values in pattern_dict.values()
+                                  if isinstance(values, FilePatternValues))
+
+    def metrics(self) -> Dict:
+        """Cache sizes and reload counters"""
+        return {
+            'patterns': len(self._pattern_dict or ()),
+            'messages': len(self._messages),
+            'variant_spaces': len(self._variants),
+            'full_reloads': self.full_reloads,
+            'partial_reloads': self.partial_reloads
+        }
+
+
+# ==================== BATCH RENDERING ====================
+
+# Renders per unit of work when fanning out to worker processes
+BATCH_CHUNK_SIZE = 20000
+
+# Pattern values of the current worker process
+_worker_patterns = None
+
+
+def _init_worker(pattern_dict: Dict[str, List[str]]):
+    global _worker_patterns
+    _worker_patterns = pattern_dict
+
+
+class _WorkerPool:
+    """Worker processes started with one pattern_dict, shared by render_batch() calls"""
+
+    def __init__(self, pattern_dict: Dict[str, List[str]], processes: int):
+        self.pattern_dict = pattern_dict
+        self.processes = processes
+        self.executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                            initargs=(pattern_dict,))
+        self.users = 0
+        self.retired = False
+
+
+# Pool of the latest pattern_dict, created by the first parallel render
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _retire_pool(pool: _WorkerPool):
+    """Shut a pool down once its last render_batch() call is done (holding _pool_lock)"""
+    pool.retired = True
+    if not pool.users:
+        pool.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _acquire_pool(pattern_dict: Dict[str, List[str]], processes: int) -> _WorkerPool:
+    """
+    Get the shared pool for pattern_dict, starting a new one when the
+    patterns (a new dict from RenderCache) or the process count changed
+    """
+    global _pool
+    with _pool_lock:
+        pool = _pool
+        if pool is None or pool.pattern_dict is not pattern_dict or pool.processes != processes:
+            if pool is not None:
+                _retire_pool(pool)
+            pool = _pool = _WorkerPool(pattern_dict, processes)
+        pool.users += 1
+        return pool
+
+
+def _release_pool(pool: _WorkerPool, broken: bool = False):
+    global _pool
+    with _pool_lock:
+        pool.users -= 1
+        if broken and _pool is pool:
+            _pool = None
+            pool.retired = True
+        if pool.retired and not pool.users:
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    """Stop the worker processes of parallel rendering"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _retire_pool(_pool)
+            _pool = None
+
+
+def _render_chunk(message_id: int, templates: List[str], count: int, seed: int, encode: bool):
+    """Render count texts inside a worker process"""
+    rng = random.Random(seed)
+    compiled = [compile_template(t, _worker_patterns) for t in templates]
+    texts = render_many(compiled, _worker_patterns, count, rng)
+    return encode_ndjson(message_id, texts) if encode else texts
+
+
+def encode_ndjson(message_id: int, texts: List[str]) -> str:
+    """Encode rendered texts as NDJSON lines of {"message_id", "text"}"""
+    prefix = '{"message_id": %d, "text": ' % message_id
+    dumps = json.dumps
+    return ''.join([prefix + dumps(text, ensure_ascii=False) + '}\n' for text in texts])
+
+
+def render_many(compiled: List[Tuple], pattern_dict: Dict[str, List[str]], count: int, rng=random) -> List[str]:
+    """Render count texts from randomly chosen compiled templates"""
+    choice = rng.choice
+    return [render_compiled(choice(compiled), pattern_dict, rng) for _ in range(count)]
+
+
+def render_batch(jobs: List[Tuple[int, List[str], int]], pattern_dict: Dict[str, List[str]],
+                 processes: int = 0, encode: bool = False) -> Iterator[Tuple[int, Any]]:
+    """
+    Render many texts for (message_id, templates, count) jobs.
+    Yields (message_id, texts) chunks in job order so callers can stream
+    them; with encode=True texts come as an NDJSON string instead.
+    With processes > 1 chunks are rendered (and encoded) by a process
+    pool that is kept for later calls with the same pattern_dict; every
+    chunk gets its own seed so workers do not repeat each other.
+    """
+    chunks = []
+    for message_id, templates, count in jobs:
+        while count > 0:
+            size = min(count, BATCH_CHUNK_SIZE)
+            chunks.append((message_id, templates, size))
+            count -= size
+
+    if processes <= 1:
+        compiled_by_templates = {}
+        for message_id, templates, size in chunks:
+            key = id(templates)
+            if key not in compiled_by_templates:
+                compiled_by_templates[key] = [compile_template(t, pattern_dict) for t in templates]
+            texts = render_many(compiled_by_templates[key], pattern_dict, size)
+            yield message_id, encode_ndjson(message_id, texts) if encode else texts
+        return
+
+    # Only a few chunks are queued ahead of the consumer, so a closed
+    # stream (client gone) stops rendering instead of finishing the batch
+    pool = _acquire_pool(pattern_dict, processes)
+    remaining = iter(chunks)
+    pending = deque()
+    broken = False
+
+    def submit(limit: int):
+        for message_id, templates, size in islice(remaining, limit):
+            future = pool.executor.submit(_render_chunk, message_id, templates, size,
+                                          random.getrandbits(64), encode)
+            pending.append((message_id, future))
+
+    try:
+        submit(processes * 2)
+        while pending:
+            message_id, future = pending.popleft()
+            result = future.result()
+            submit(1)
+            yield message_id, result
+    except BrokenProcessPool:
+        broken = True
+        raise
+    finally:
+        for _, future in pending:
+            future.cancel()
+        _release_pool(pool, broken)
+
+
+class RecentOutputs:
+    """
+    Bounded memory of texts recently sent to each target window.
+
+    Every window keeps an insertion ordered hash set of text hashes that
+    acts as a ring: once it holds history_size entries the oldest one is
+    dropped. Only max_windows windows are tracked, least recently used
+    windows are forgotten first, so memory stays capped.
+    """
+
+    def __init__(self, history_size: int = DEFAULT_HISTORY_SIZE, max_windows: int = DEFAULT_MAX_WINDOWS):
+        self.history_size = history_size
+        self.max_windows = max_windows
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'lookups': 0, 'hits': 0, 'resamples': 0, 'exhausted': 0}
+
+    @staticmethod
+    def _window_key(window: str) -> str:
+        return (window or '').strip().lower()
+
+    def seen(self, window: str, text: str) -> bool:
+        """Check if text was recently sent to window"""
+        with self._lock:
+            self._stats['lookups'] += 1
+            history = self._windows.get(self._window_key(window))
+            if history is not None and hash(text) in history:
+                self._stats['hits'] += 1
+                return True
+            return False
+
+    def remember(self, window: str, text: str):
+        """Record text as sent to window"""
+        key = self._window_key(window)
+        digest = hash(text)
+        with self._lock:
+            history = self._windows.get(key)
+            if history is None:
+                history = OrderedDict()
+                self._windows[key] = history
+                while len(self._windows) > self.max_windows:
+                    self._windows.popitem(last=False)
+            else:
+                self._windows.move_to_end(key)
+
+            history.pop(digest, None)
+            history[digest] = None
+            while len(history) > self.history_size:
+                history.popitem(last=False)
+
+    def pick(self, window: str, render: Callable[[], str], budget: int = DEFAULT_RETRY_BUDGET) -> str:
+        """
+        Render a text that was not recently sent to window.
+        render() is called again for duplicates, at most budget extra times;
+        if every attempt is a duplicate the last one is used anyway.
+        """
+        text = render()
+        attempts = 0
+        while self.seen(window, text):
+            if attempts >= budget:
+                with self._lock:
+                    self._stats['exhausted'] += 1
+                break
+            attempts += 1
+            with self._lock:
+                self._stats['resamples'] += 1
+            text = render()
+
+        self.remember(window, text)
+        return text
+
+    def clear(self):
+        """Forget all remembered texts"""
+        with self._lock:
+            self._windows.clear()
+
+    def metrics(self) -> Dict:
+        """Get hit rates and memory usage"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['tracked_windows'] = len(self._windows)
+            stats['stored_entries'] = sum(len(h) for h in self._windows.values())
+        stats['history_size'] = self.history_size
+        stats['max_windows'] = self.max_windows
+        stats['hit_rate'] = stats['hits'] / stats['lookups'] if stats['lookups'] else 0.0
+        return stats
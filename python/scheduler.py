@@ -0,0 +1,177 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Scheduler module for KenFlow application
+Runs delayed and repeating sends at their due time
+
+Zamanlanmış gönderimler için:
+- Bekleyen işleri zamanına göre sıralı bir yığında tutar
+- Boştayken bir sonraki işe kadar uyur, işlemci harcamaz
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+# One-shot jobs overdue by more than this (e.g. while KenFlow was closed) are dropped
+MISSED_GRACE_SECONDS = 300
+
+# Shortest allowed repeat interval
+MIN_INTERVAL_MS = 1000
+
+
+def next_run_time(job: Dict, now: float) -> Optional[float]:
+    """
+    Get the next run time of a job that just became due
+    Repeating jobs skip runs that were missed, one-shot jobs return None
+    """
+    interval_ms = job.get('interval_ms')
+    if not interval_ms:
+        return None
+    interval = interval_ms / 1000.0
+    missed = max(int((now - job['run_at']) // interval), 0)
+    return job['run_at'] + (missed + 1) * interval
+
+
+class Scheduler:
+    """
+    Heap based scheduler for pending jobs.
+
+    Jobs are dicts with id, run_at (epoch seconds) and optional
+    interval_ms. A single thread sleeps on a condition until the earliest
+    job is due, so idle cost does not grow with the number of jobs and
+    adding or removing a job is O(log n). Removed or rescheduled jobs
+    leave stale heap entries behind that are skipped when popped.
+
+    fire(job) performs the job; reschedule(job_id, next_run_at, ran_at)
+    persists the outcome, next_run_at is None when the job is finished.
+    """
+
+    def __init__(self, fire: Callable[[Dict], None],
+                 reschedule: Callable[[int, Optional[float], Optional[float]], None],
+                 clock: Callable[[], float] = time.time):
+        self._fire = fire
+        self._reschedule = reschedule
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._heap = []
+        self._jobs = {}
+        self._sequence = itertools.count()
+        self._thread = None
+        self._running = False
+        self._current = None
+        self._cancelled = False
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def load(self, jobs: Iterable[Dict]):
+        """Add persisted jobs, dropping one-shot jobs missed for too long"""
+        now = self._clock()
+        for job in jobs:
+            if job['run_at'] < now - MISSED_GRACE_SECONDS:
+                next_run_at = next_run_time(job, now)
+                self._reschedule(job['id'], next_run_at, None)
+                if next_run_at is None:
+                    continue
+                job = dict(job, run_at=next_run_at)
+            self.add(job)
+
+    def add(self, job: Dict):
+        """Add or replace a job"""
+        with self._condition:
+            self._jobs[job['id']] = job
+            heapq.heappush(self._heap, (job['run_at'], next(self._sequence), job['id']))
+            self._compact()
+            # Wake the thread in case this job is due before the current earliest one
+            self._condition.notify()
+
+    def remove(self, job_id: int):
+        """Cancel a job"""
+        with self._condition:
+            self._jobs.pop(job_id, None)
+            if job_id == self._current:
+                # Running right now, do not schedule its next run
+                self._cancelled = True
+            self._compact()
+
+    def clear(self):
+        """Cancel all jobs, e.g. before loading the jobs of another database"""
+        with self._condition:
+            self._jobs = {}
+            self._heap = []
+            if self._current is not None:
+                self._cancelled = True
+
+    def _compact(self):
+        """Rebuild the heap once stale entries dominate it"""
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._jobs):
+            self._heap = [
+                entry for entry in self._heap
+                if entry[2] in self._jobs and self._jobs[entry[2]]['run_at'] == entry[0]
+            ]
+            heapq.heapify(self._heap)
+
+    def _pop_due(self) -> Optional[Dict]:
+        """Wait for the next due job, None when stopped"""
+        with self._condition:
+            while self._running:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                run_at, _, job_id = self._heap[0]
+                job = self._jobs.get(job_id)
+                if job is None or job['run_at'] != run_at:
+                    heapq.heappop(self._heap)
+                    continue
+                delay = run_at - self._clock()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+                del self._jobs[job_id]
+                self._current = job_id
+                self._cancelled = False
+                return job
+        return None
+
+    def _run(self):
+        while True:
+            job = self._pop_due()
+            if job is None:
+                return
+            ran_at = self._clock()
+            try:
+                self._fire(job)
+            except Exception as e:
+                print(f"Error running scheduled job {job['id']}: {e}")
+
+            with self._condition:
+                cancelled = self._cancelled
+                self._current = None
+            if cancelled:
+                continue
+
+            next_run_at = next_run_time(job, self._clock())
+            try:
+                self._reschedule(job['id'], next_run_at, ran_at)
+            except Exception as e:
+                print(f"Error saving scheduled job {job['id']}: {e}")
+            if next_run_at is not None:
+                self.add(dict(job, run_at=next_run_at))
+
+    def start(self):
+        """Start the scheduler thread"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread, pending jobs stay loaded"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
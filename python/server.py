@@ -0,0 +1,174 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Server module for KenFlow application
+Serves the Flask app with the development or a production WSGI server
+
+Sunucu seçimi için:
+- production: waitress varsa onu, yoksa sınırlı iş parçacığı havuzlu bir sunucu kullanır
+- dev: Flask/Werkzeug geliştirme sunucusu (istek başına bir iş parçacığı)
+"""
+
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler, make_server
+
+try:
+    import waitress
+    WAITRESS_SUPPORT = True
+except ImportError:
+    WAITRESS_SUPPORT = False
+
+SERVER_MODES = ('dev', 'production')
+
+# Production defaults: worker threads, queued connections and the number
+# of seconds a connection may stay silent (idle keep-alive or slow client).
+# Electron polls every 0.5-2s from a few windows, so a handful of workers
+# covers the app.
+DEFAULT_THREADS = 8
+DEFAULT_BACKLOG = 64
+DEFAULT_CHANNEL_TIMEOUT = 30
+# Largest accepted request body (render requests and message bulk edits)
+MAX_REQUEST_BODY_SIZE = 16 * 1024 * 1024
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """
+    HTTP/1.1 handler (chunked streaming) without per-request access logging
+    Werkzeug still closes the connection after every response
+    """
+
+    protocol_version = 'HTTP/1.1'
+    timeout = DEFAULT_CHANNEL_TIMEOUT
+
+    def log_request(self, code='-', size='-'):
+        pass
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    Werkzeug server that hands connections to a fixed pool of threads.
+
+    Fallback when waitress is not installed. At most threads requests are
+    served at once; when all workers are busy the accept loop waits, so
+    further clients queue in the listen backlog instead of spawning a
+    thread each. There is no keep-alive (Werkzeug closes every
+    connection), waitress provides that.
+    """
+
+    multithread = True
+
+    def __init__(self, host: str, port: int, app, threads: int = DEFAULT_THREADS,
+                 backlog: int = DEFAULT_BACKLOG, handler=QuietRequestHandler):
+        self.request_queue_size = backlog
+        super().__init__(host, port, app, handler)
+        self._slots = threading.BoundedSemaphore(threads)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='kenflow-http')
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._process, request, client_address)
+        except RuntimeError:
+            # Pool already shut down
+            self._slots.release()
+            self.shutdown_request(request)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False)
+
+
+class WaitressServer:
+    """Adapter giving a waitress server the serve_forever/shutdown interface"""
+
+    def __init__(self, app, host: str, port: int, threads: int = DEFAULT_THREADS,
+                 backlog: int = DEFAULT_BACKLOG, channel_timeout: int = DEFAULT_CHANNEL_TIMEOUT,
+                 unix_socket: str = None):
+        if unix_socket:
+            listen = {'unix_socket': unix_socket, 'unix_socket_perms': '600'}
+        else:
+            listen = {'host': host, 'port': port}
+        self._server = waitress.create_server(
+            app, threads=threads, backlog=backlog,
+            connection_limit=threads * 8, channel_timeout=channel_timeout,
+            max_request_body_size=MAX_REQUEST_BODY_SIZE, ident='KenFlow', **listen
+        )
+        self.server_port = self._server.effective_port
+        self._stopping = threading.Event()
+        self._stopped = threading.Event()
+
+    def serve_forever(self):
+        try:
+            self._server.run()
+        except OSError:
+            # close() from shutdown() can take a socket away from the poll in progress
+            if not self._stopping.is_set():
+                raise
+        finally:
+            self._stopped.set()
+
+    def shutdown(self, timeout: float = DEFAULT_CHANNEL_TIMEOUT):
+        """
+        Stop accepting connections, serve_forever() returns once the open
+        ones are closed by their clients; waits at most timeout seconds
+        """
+        self._stopping.set()
+        self._server.close()
+        self._stopped.wait(timeout)
+
+
+def create_server(app, host: str = '127.0.0.1', port: int = 5000, mode: str = 'production',
+                  threads: int = DEFAULT_THREADS, backlog: int = DEFAULT_BACKLOG, unix_socket: str = None):
+    """
+    Create a server for app without starting it
+    With unix_socket the app is served on that Unix domain socket instead of host:port
+    Returns (server, name); server has serve_forever(), shutdown() and server_port
+    """
+    if mode not in SERVER_MODES:
+        raise ValueError(f"server mode must be one of {', '.join(SERVER_MODES)}")
+    if unix_socket:
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError('Unix domain sockets are not supported on this platform')
+        # Only the current user may connect
+        old_umask = os.umask(0o177)
+        try:
+            return _create_server(app, host, port, mode, threads, backlog, unix_socket)
+        finally:
+            os.umask(old_umask)
+    return _create_server(app, host, port, mode, threads, backlog, unix_socket)
+
+
+def _create_server(app, host, port, mode, threads, backlog, unix_socket):
+    if mode == 'dev':
+        if unix_socket:
+            host, port = f'unix://{unix_socket}', 0
+        return make_server(host, port, app, threaded=True), 'werkzeug-dev'
+    if WAITRESS_SUPPORT:
+        return WaitressServer(app, host, port, threads, backlog, unix_socket=unix_socket), 'waitress'
+    if unix_socket:
+        host, port = f'unix://{unix_socket}', 0
+    return PooledWSGIServer(host, port, app, threads, backlog), 'pooled'
+
+
+def serve(app, host: str = '127.0.0.1', port: int = 5000, mode: str = 'production',
+          threads: int = DEFAULT_THREADS, unix_socket: str = None):
+    """Serve app until interrupted"""
+    server, name = create_server(app, host, port, mode, threads, unix_socket=unix_socket)
+    address = f'unix:{unix_socket}' if unix_socket else f'http://{host}:{server.server_port}'
+    print(f"Serving with {name} at {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
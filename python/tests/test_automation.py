@@ -0,0 +1,131 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Tests for combination timing
+
+Sends combinations through main.send_combination_action with a
+RecordingInputBackend and checks the recorded input order and delays.
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the tests away from the user's real database
+TEMP_DIR = tempfile.mkdtemp(prefix='kenflow-test-')
+os.environ['KENFLOW_DATA_DIR'] = TEMP_DIR
+
+import automation
+import database
+import main
+
+database.DATABASE_PATH = os.path.join(TEMP_DIR, 'kenflow.db')
+
+TEXTS = ['Merhaba', 'Siparişiniz hazır', 'İyi günler']
+
+
+@pytest.fixture
+def backend():
+    database.init_database()
+    database.update_setting('delivery_mode', 'paste')
+    database.update_setting('click_delay', '150')
+    recording = automation.RecordingInputBackend()
+    main.set_input_backend(recording)
+    yield recording
+    main.set_input_backend(automation.PyAutoGuiBackend())
+
+
+def send(texts, timing=None, delay_ms=500):
+    message_ids = [database.create_message(f'Mesaj {i}', [text]) for i, text in enumerate(texts)]
+    combination_id = database.create_combination('Test', message_ids, delay_ms=delay_ms,
+                                                 timing=json.dumps(timing) if timing else None)
+    main.send_combination_action(combination_id, check_target=False)
+
+
+def pastes(events):
+    """[(text, time of the paste, time of Enter)] per message"""
+    result = []
+    clipboard = None
+    for clock, event, argument in events:
+        if event == 'copy':
+            clipboard = argument
+        elif event == 'hotkey' and argument == 'ctrl+v':
+            result.append([clipboard, clock, None])
+        elif event == 'press' and argument == 'enter':
+            result[-1][2] = clock
+    return [tuple(paste) for paste in result]
+
+
+def test_fixed_timing_order_and_delays(backend):
+    send(TEXTS)
+
+    sent = pastes(backend.events)
+    assert [text for text, _, _ in sent] == TEXTS
+    # Only the first message waits the start delay, then click delay and gap exactly
+    times = [clock for _, pasted, entered in sent for clock in (pasted, entered)]
+    assert times == pytest.approx([0.3, 0.45, 0.95, 1.1, 1.6, 1.75])
+    assert backend.clock == pytest.approx(1.75)
+
+
+def test_jittered_timing_stays_in_bounds(backend):
+    random.seed(7)
+    send(TEXTS, timing={'distribution': 'uniform', 'jitter': 0.5, 'start_delay_ms': 200})
+
+    sent = pastes(backend.events)
+    assert [text for text, _, _ in sent] == TEXTS
+    assert sent[0][1] == pytest.approx(0.2)
+    gaps = []
+    for index, (_, pasted, entered) in enumerate(sent):
+        assert 0.075 - 1e-9 <= entered - pasted <= 0.225 + 1e-9
+        if index:
+            gaps.append(pasted - sent[index - 1][2])
+    assert all(0.25 - 1e-9 <= gap <= 0.75 + 1e-9 for gap in gaps)
+    assert len(set(round(gap, 6) for gap in gaps)) > 1
+
+
+def test_jittered_plan_is_reproducible():
+    model = automation.TimingModel(500, 150, distribution='lognormal', jitter=0.3)
+    first = model.plan(TEXTS, random.Random(1))
+    assert first == model.plan(TEXTS, random.Random(1))
+    assert first[0].before == pytest.approx(0.3)
+    assert all(step.before == 0 for step in first[1:])
+    assert first[-1].after == 0
+
+
+class FailingEnterBackend(automation.RecordingInputBackend):
+    """Loses focus right after the paste, so pressing Enter fails"""
+
+    def press(self, key: str):
+        raise OSError('window closed')
+
+
+@pytest.mark.parametrize('send_one', [
+    lambda: main.send_message_action(database.create_message('Tek', ['Merhaba']), check_target=False),
+    lambda: send(TEXTS),
+])
+def test_clipboard_restored_when_enter_fails(backend, send_one):
+    failing = FailingEnterBackend()
+    failing.clipboard = 'kullanıcının panosu'
+    main.set_input_backend(failing)
+
+    send_one()
+
+    assert failing.clipboard == 'kullanıcının panosu'
+    assert [argument for _, event, argument in failing.events if event == 'hotkey'].count('ctrl+v') >= 1
+
+
+def test_paste_restores_clipboard_when_paste_fails():
+    class FailingPasteBackend(automation.RecordingInputBackend):
+        def hotkey(self, *keys: str):
+            raise OSError('no window')
+
+    failing = FailingPasteBackend()
+    failing.clipboard = 'eski'
+    with pytest.raises(OSError):
+        automation.paste_text(failing, 'yeni')
+    assert failing.clipboard == 'eski'
@@ -0,0 +1,69 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Tests for the usage heatmap
+
+Sends are binned into local hours, also in time zones with a half-hour
+offset from UTC.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the tests away from the user's real database
+os.environ.setdefault('KENFLOW_DATA_DIR', tempfile.mkdtemp(prefix='kenflow-test-'))
+
+import database
+import main
+
+# Monday 2024-06-03 11:15 in India (UTC+5:30) is 05:45 UTC
+SENT_AT = 1717393500
+SENT_AT_UTC = '2024-06-03 05:45:00'
+
+
+@pytest.fixture
+def kolkata(tmp_path, monkeypatch):
+    if not hasattr(time, 'tzset'):
+        pytest.skip('time zones can only be switched on POSIX')
+    monkeypatch.setenv('TZ', 'Asia/Kolkata')
+    time.tzset()
+    database.use_database(str(tmp_path / 'kenflow.db'))
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_send_binned_in_local_hour(kolkata, monkeypatch):
+    message_id = database.create_message('Selam', ['Merhaba'])
+    monkeypatch.setattr(database.time, 'time', lambda: SENT_AT)
+    database.log_activity('sent', 'message', message_id, 'Selam', 'WhatsApp')
+
+    for item in ((None, None), ('message', message_id)):
+        matrix = database.get_usage_heatmap(SENT_AT - 3600, SENT_AT + 60, *item)
+        assert matrix[0][11] == 1
+        assert sum(map(sum, matrix)) == 1
+
+
+def test_rebuilt_rollups_use_local_hours(kolkata):
+    with database.get_connection() as conn:
+        conn.execute("INSERT INTO activity_logs (activity_type, item_type, item_id, item_name, created_at) "
+                     "VALUES ('sent', 'message', 1, 'Selam', ?)", (SENT_AT_UTC,))
+        conn.commit()
+    database.rebuild_hourly_stats()
+
+    matrix = database.get_usage_heatmap(SENT_AT, SENT_AT + 1)
+    assert matrix[0][11] == 1
+    # The range starts in the next local hour (12:00 IST is 06:30 UTC)
+    assert sum(map(sum, database.get_usage_heatmap(SENT_AT + 45 * 60, SENT_AT + 7200))) == 0
+
+
+@pytest.mark.parametrize('query', ['days=0', 'days=-3'])
+def test_heatmap_rejects_days_below_one(query):
+    response = main.app.test_client().get(f'/api/dashboard/heatmap?{query}')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
@@ -0,0 +1,155 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Tests for hotkey dispatch
+
+Resolves trigger keys against window titles from a FakeWindowProvider,
+and presses keys through a SyntheticKeyboard after window rule changes.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the tests away from the user's real database
+os.environ.setdefault('KENFLOW_DATA_DIR', tempfile.mkdtemp(prefix='kenflow-test-'))
+
+import database
+import hotkeys
+import main
+import windows
+from hotkeys import Action, DispatchMap
+
+
+def binding(item_id, trigger_key, item_type='message'):
+    return {'item_type': item_type, 'item_id': item_id, 'trigger_key': trigger_key}
+
+
+def rule(rule_id, pattern, item_id, trigger_key=None, priority=0, item_type='message'):
+    return {'id': rule_id, 'window_pattern': pattern, 'item_type': item_type, 'item_id': item_id,
+            'trigger_key': trigger_key, 'priority': priority}
+
+
+def resolve(dispatch, provider, key):
+    """Actions of a key in the provider's active window"""
+    window = provider.get_active_window()
+    resolved = dispatch.resolve(key, window.title if window else '')
+    return resolved[0] if resolved else None
+
+
+# ==================== DISPATCH MAP ====================
+
+def test_same_key_resolves_per_active_window():
+    provider = windows.FakeWindowProvider(['WhatsApp - Ali', 'Gmail - Gelen Kutusu', 'Notepad'])
+    dispatch = DispatchMap(
+        [binding(1, 'F1')],
+        [rule(1, 'whatsapp', 2, 'f1'), rule(2, 'Gmail', 3, 'f1', item_type='combination')]
+    )
+
+    provider.set_active('WhatsApp - Ali')
+    assert resolve(dispatch, provider, 'f1') == (Action('message', 2),)
+    provider.set_active('Gmail - Gelen Kutusu')
+    assert resolve(dispatch, provider, 'f1') == (Action('combination', 3),)
+    provider.set_active('Notepad')
+    assert resolve(dispatch, provider, 'f1') == (Action('message', 1),)
+    assert dispatch.resolve('f1', 'Notepad') == ((Action('message', 1),), False)
+    assert dispatch.resolve('f1', 'WhatsApp - Ali') == ((Action('message', 2),), True)
+
+
+def test_rule_priority_then_longest_pattern_then_oldest():
+    dispatch = DispatchMap([], [
+        rule(1, 'WhatsApp', 1, 'f2'),
+        rule(2, 'WhatsApp - Ali', 2, 'f2'),
+        rule(3, 'Ayşe', 3, 'f2', priority=5),
+        rule(4, 'Veli', 4, 'f2'),
+        rule(5, 'Veli', 5, 'f2'),
+    ])
+
+    # Higher priority wins over a longer pattern
+    assert dispatch.resolve('f2', 'WhatsApp - Ayşe')[0] == (Action('message', 3),)
+    # Same priority: the longest pattern, then the oldest rule
+    assert dispatch.resolve('f2', 'WhatsApp - Ali')[0] == (Action('message', 2),)
+    assert dispatch.resolve('f2', 'WhatsApp - Can')[0] == (Action('message', 1),)
+    assert dispatch.resolve('f2', 'Sohbet: Veli')[0] == (Action('message', 4),)
+    # No rule matches and nothing is bound globally
+    assert dispatch.resolve('f2', 'Notepad') is None
+
+
+def test_fallback_to_global_bindings():
+    dispatch = DispatchMap(
+        [binding(1, 'Ctrl + 1'), binding(2, 'ctrl+2'), binding(3, 'ctrl+2', 'combination')],
+        [rule(1, 'WhatsApp', 9, 'ctrl+1')]
+    )
+
+    assert dispatch.keys() == ['ctrl+1', 'ctrl+2']
+    assert dispatch.resolve('ctrl+1', 'Notepad') == ((Action('message', 1),), False)
+    assert dispatch.resolve('ctrl+2', 'WhatsApp') == ((Action('message', 2), Action('combination', 3)), False)
+    assert dispatch.conflicts() == {'ctrl+2': (Action('message', 2), Action('combination', 3))}
+    assert dispatch.resolve('ctrl+3', 'WhatsApp') is None
+
+
+def test_rule_on_own_key_restricts_item_to_its_windows():
+    dispatch = DispatchMap([binding(1, 'f3'), binding(2, 'f4')], [rule(1, 'WhatsApp', 1)])
+
+    assert dispatch.resolve('f3', 'WhatsApp Web') == ((Action('message', 1),), True)
+    assert dispatch.resolve('f3', 'Notepad') is None
+    assert dispatch.resolve('f4', 'Notepad') == ((Action('message', 2),), False)
+
+
+# ==================== RULE CHANGES ====================
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    database.use_database(str(tmp_path / 'kenflow.db'))
+    provider = windows.FakeWindowProvider(['WhatsApp - Ali', 'Notepad'], active='Notepad')
+    keyboard = hotkeys.SyntheticKeyboard()
+    sent = []
+    monkeypatch.setattr(main, 'send_message_action', lambda item_id, check_target=True: sent.append(
+        ('message', item_id, check_target)))
+    monkeypatch.setattr(main, 'send_combination_action', lambda item_id, check_target=True: sent.append(
+        ('combination', item_id, check_target)))
+    main.set_window_provider(provider)
+    main.set_keyboard_backend(keyboard)
+    monkeypatch.setattr(main, 'listener_active', True)
+    main.refresh_hotkeys()
+    yield main.app.test_client(), provider, keyboard, sent
+    main.listener_active = False
+    main.set_keyboard_backend(main.keyboard)
+    main.set_window_provider(windows.WindowProvider())
+
+
+def test_rules_recompiled_after_crud(app):
+    client, provider, keyboard, sent = app
+    greeting = database.create_message('Selam', ['Merhaba'], trigger_key='f5')
+    reply = database.create_message('Cevap', ['Teşekkürler'])
+    main.refresh_hotkeys()
+
+    provider.set_active('WhatsApp - Ali')
+    assert keyboard.press('f5')
+    assert sent.pop() == ('message', greeting, True)
+
+    response = client.post('/api/window-rules', json={
+        'window_pattern': 'WhatsApp', 'item_type': 'message', 'item_id': reply, 'trigger_key': 'f5'})
+    rule_id = response.get_json()['id']
+    assert keyboard.press('f5')
+    assert sent.pop() == ('message', reply, False)
+
+    client.put(f'/api/window-rules/{rule_id}', json={
+        'window_pattern': 'Telegram', 'item_type': 'message', 'item_id': reply, 'trigger_key': 'f5'})
+    assert keyboard.press('f5')
+    assert sent.pop() == ('message', greeting, True)
+
+    # A new key only used by a rule gets registered
+    client.put(f'/api/window-rules/{rule_id}', json={
+        'window_pattern': 'WhatsApp', 'item_type': 'message', 'item_id': reply, 'trigger_key': 'f6'})
+    assert keyboard.keys() == ['f5', 'f6']
+    assert keyboard.press('f6')
+    assert sent.pop() == ('message', reply, False)
+
+    client.delete(f'/api/window-rules/{rule_id}')
+    assert keyboard.keys() == ['f5']
+    assert not keyboard.press('f6')
+    assert sent == []
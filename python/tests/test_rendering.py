@@ -0,0 +1,85 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Tests for batch rendering
+
+Checks the shared worker pool of render_batch() and the /api/render
+request validation.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the tests away from the user's real database
+os.environ.setdefault('KENFLOW_DATA_DIR', tempfile.mkdtemp(prefix='kenflow-test-'))
+
+import main
+import rendering
+
+TEMPLATES = ['{greeting} {name}', '{name}, {greeting}']
+
+
+def patterns():
+    return {'greeting': ['Merhaba', 'Selam'], 'name': ['Ali', 'Ayşe']}
+
+
+@pytest.fixture
+def pool():
+    yield
+    rendering.shutdown_pool()
+
+
+def render(pattern_dict, count=10, processes=2):
+    return [text for _, texts in rendering.render_batch([(1, TEMPLATES, count)], pattern_dict, processes)
+            for text in texts]
+
+
+# ==================== WORKER POOL ====================
+
+def test_pool_reused_until_patterns_change(pool):
+    pattern_dict = patterns()
+    texts = render(pattern_dict)
+    assert len(texts) == 10
+    assert set(texts) <= {f'{g} {n}' for g in ('Merhaba', 'Selam') for n in ('Ali', 'Ayşe')} | \
+        {f'{n}, {g}' for g in ('Merhaba', 'Selam') for n in ('Ali', 'Ayşe')}
+    first = rendering._pool
+    render(pattern_dict)
+    assert rendering._pool is first
+
+    render(patterns())
+    assert rendering._pool is not first
+    assert first.retired
+    with pytest.raises(RuntimeError):
+        first.executor.submit(len, '')
+
+
+def test_closed_stream_stops_submitting(pool, monkeypatch):
+    monkeypatch.setattr(rendering, 'BATCH_CHUNK_SIZE', 1)
+    pattern_dict = patterns()
+    shared = rendering._acquire_pool(pattern_dict, 2)
+    rendering._release_pool(shared)
+    submitted = []
+    submit = shared.executor.submit
+    monkeypatch.setattr(shared.executor, 'submit', lambda *args: submitted.append(args) or submit(*args))
+
+    batch = rendering.render_batch([(1, TEMPLATES, 1000)], pattern_dict, 2)
+    next(batch)
+    batch.close()
+
+    assert len(submitted) == 5
+    assert shared.users == 0 and not shared.retired
+    # The pool still serves later requests
+    assert len(render(pattern_dict)) == 10
+
+
+# ==================== RENDER ROUTE ====================
+
+@pytest.mark.parametrize('body', [[1], 'text', 5])
+def test_render_rejects_non_object_body(body):
+    response = main.app.test_client().post('/api/render', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
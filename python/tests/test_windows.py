@@ -0,0 +1,207 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Tests for window targeting
+
+Runs the title matcher, the target window decision and the window list
+watcher against a FakeWindowProvider, no desktop session needed.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import windows
+
+
+class Clock:
+    """Replaces time.monotonic in the windows module"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(windows.time, 'monotonic', fake)
+    return fake
+
+
+class Targets:
+    """target_windows setting that counts how often it is loaded"""
+
+    def __init__(self, targets):
+        self.targets = targets
+        self.loads = 0
+
+    def __call__(self):
+        self.loads += 1
+        return self.targets
+
+
+# ==================== TITLE MATCHER ====================
+
+def test_matcher_finds_keywords_among_many():
+    keywords = [f'Müşteri {i:04d}' for i in range(2000)] + ['WhatsApp', 'Telegram']
+    matcher = windows.TitleMatcher((k, k) for k in keywords)
+
+    assert matcher.size == len(keywords)
+    assert list(matcher.iter_matches('Sohbet: Müşteri 1234 - WhatsApp')) == ['Müşteri 1234', 'WhatsApp']
+    assert matcher.matches('Telegram Desktop')
+    assert not matcher.matches('Müşteri 99999 yok')  # only the 4-digit keywords exist
+    assert matcher.matches('Müşteri 0099')
+    assert not matcher.matches('Notepad')
+
+
+def test_matcher_overlapping_keywords():
+    matcher = windows.TitleMatcher((k, k) for k in ['he', 'she', 'his', 'hers'])
+    assert sorted(matcher.iter_matches('ushers')) == ['he', 'hers', 'she']
+
+
+def test_matcher_ignores_case():
+    matcher = windows.TitleMatcher([('WhatsApp', 1), ('gmail', 2)])
+    assert list(matcher.iter_matches('WHATSAPP - Sohbet')) == [1]
+    assert list(matcher.iter_matches('Gelen Kutusu - GMail')) == [2]
+
+
+def test_empty_keyword_matches_every_title():
+    matcher = windows.TitleMatcher([('', 'all')])
+    assert list(matcher.iter_matches('Anything')) == ['all']
+
+
+# ==================== TARGET WINDOWS ====================
+
+def test_targeting_allows_only_target_windows(clock):
+    provider = windows.FakeWindowProvider(['WhatsApp - Müşteri', 'Notepad'], active='WhatsApp - Müşteri')
+    targeting = windows.WindowTargeting(provider, Targets(['whatsapp', 'Telegram']))
+
+    assert targeting.is_target_active()
+    assert targeting.active_title() == 'WhatsApp - Müşteri'
+    provider.set_active('Notepad')
+    assert not targeting.is_target_active()
+
+
+def test_targeting_without_targets_allows_every_window(clock):
+    provider = windows.FakeWindowProvider(['Notepad'], active='Notepad')
+    targeting = windows.WindowTargeting(provider, Targets([]))
+    assert targeting.is_target_active()
+
+    provider.remove_window('Notepad')
+    assert targeting.active_title() == ''
+    assert targeting.is_target_active()
+
+
+def test_matcher_rebuilt_only_when_target_windows_changes(clock):
+    provider = windows.FakeWindowProvider(['Telegram'], active='Telegram')
+    targets = Targets(['WhatsApp'])
+    targeting = windows.WindowTargeting(provider, targets)
+
+    assert not targeting.is_target_active()
+    clock.now += 10
+    assert not targeting.is_target_active()
+    assert targets.loads == 1
+
+    # Other changes keep the compiled matcher and the cached decisions
+    targets.targets = ['Telegram']
+    targeting.invalidate('setting', 'click_delay')
+    targeting.invalidate('message', 1)
+    assert not targeting.is_target_active()
+    assert targets.loads == 1
+
+    targeting.invalidate('setting', 'target_windows')
+    assert targeting.is_target_active()
+    assert targets.loads == 2
+
+    targets.targets = []
+    targeting.invalidate('database')
+    provider.set_active('Notepad')
+    assert targeting.is_target_active()
+    assert targets.loads == 3
+
+
+def test_decision_cached_per_window_handle_until_ttl(clock):
+    provider = windows.FakeWindowProvider(['WhatsApp - Ali', 'Notepad'], active='WhatsApp - Ali')
+    targeting = windows.WindowTargeting(provider, Targets(['WhatsApp']), ttl=0.5)
+    assert targeting.is_target_active()
+    chat = provider.get_active_window()
+
+    # Same handle within the TTL: the cached title and decision are used
+    chat.title = 'Notepad - Ali'
+    clock.now += 0.4
+    assert targeting.active_title() == 'WhatsApp - Ali'
+    assert targeting.is_target_active()
+
+    # Another handle is looked up on its own
+    provider.set_active('Notepad')
+    assert targeting.active_title() == 'Notepad'
+    assert not targeting.is_target_active()
+
+    # Once the TTL expired the first window's title is read again
+    provider.set_active('Notepad - Ali')
+    assert provider.get_active_window() is chat
+    clock.now += 0.2
+    assert targeting.active_title() == 'Notepad - Ali'
+    assert not targeting.is_target_active()
+
+
+# ==================== WINDOW LIST ====================
+
+@pytest.fixture
+def watcher(clock):
+    provider = windows.FakeWindowProvider(['WhatsApp', 'Notepad'])
+    # The background thread never wakes up during a test, refresh() is called by hand
+    window_watcher = windows.WindowListWatcher(provider, interval=3600, history=2)
+    yield provider, window_watcher
+    window_watcher.stop()
+
+
+def test_snapshot_version_bumps_only_on_changes(watcher):
+    provider, window_watcher = watcher
+    assert window_watcher.snapshot() == (1, ['Notepad', 'WhatsApp'])
+
+    assert not window_watcher.refresh()
+    provider.set_windows(['Notepad', 'WhatsApp', 'WhatsApp', ' ', 'ab'])
+    assert not window_watcher.refresh()
+    assert window_watcher.snapshot()[0] == 1
+
+    provider.add_window('Telegram')
+    assert window_watcher.refresh()
+    assert window_watcher.snapshot() == (2, ['Notepad', 'Telegram', 'WhatsApp'])
+
+
+def test_diff_since_version(watcher):
+    provider, window_watcher = watcher
+    version, _ = window_watcher.snapshot()
+    assert window_watcher.diff_since(version) == {'version': 1, 'added': [], 'removed': []}
+
+    provider.add_window('Telegram')
+    window_watcher.refresh()
+    assert window_watcher.diff_since(1) == {'version': 2, 'added': ['Telegram'], 'removed': []}
+
+    # Changes since an older version are merged, a window that came and went cancels out
+    provider.remove_window('WhatsApp')
+    provider.remove_window('Telegram')
+    window_watcher.refresh()
+    assert window_watcher.diff_since(2) == {'version': 3, 'added': [], 'removed': ['Telegram', 'WhatsApp']}
+    assert window_watcher.diff_since(1) == {'version': 3, 'added': [], 'removed': ['WhatsApp']}
+
+
+def test_diff_since_unknown_or_old_version_resyncs(watcher):
+    provider, window_watcher = watcher
+    window_watcher.snapshot()
+    for title in ['Telegram', 'Gmail', 'Slack']:
+        provider.add_window(title)
+        window_watcher.refresh()
+
+    full = {'version': 4, 'full': True, 'windows': ['Gmail', 'Notepad', 'Slack', 'Telegram', 'WhatsApp']}
+    # Only the last two changes are kept
+    assert window_watcher.diff_since(2) == {'version': 4, 'added': ['Gmail', 'Slack'], 'removed': []}
+    assert window_watcher.diff_since(1) == full
+    assert window_watcher.diff_since(0) == full
+    assert window_watcher.diff_since(99) == full
@@ -0,0 +1,403 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Window module for KenFlow application
+Handles active window detection and target window matching
+
+Pencere hedefleme için:
+- Aktif pencereyi bir pencere sağlayıcısı üzerinden okur
+- Hedef pencere listesini tek bir eşleştiricide derler
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import pygetwindow as gw
+    WINDOW_SUPPORT = True
+except (ImportError, NotImplementedError):
+    # pygetwindow raises NotImplementedError on unsupported platforms (Linux)
+    WINDOW_SUPPORT = False
+    print("Warning: pygetwindow not installed. Window targeting disabled.")
+
+# Windows that are never offered as targets
+SYSTEM_WINDOW_TITLES = {'Program Manager', 'Windows Input Experience'}
+
+# Separators between the document and the application in window titles
+APP_SEPARATOR_RE = re.compile(r'\s+[-–—|]\s+')
+
+
+# ==================== WINDOW PROVIDERS ====================
+
+class FakeWindow:
+    """A window known to FakeWindowProvider"""
+    __slots__ = ('handle', 'title')
+
+    def __init__(self, handle: Any, title: str):
+        self.handle = handle
+        self.title = title
+
+
+class WindowProvider:
+    """Reads windows through pygetwindow"""
+
+    available = WINDOW_SUPPORT
+
+    def get_active_window(self):
+        """Get the active window object or None"""
+        if not WINDOW_SUPPORT:
+            return None
+        return gw.getActiveWindow()
+
+    def get_handle(self, window) -> Any:
+        """Get a stable identifier of a window object"""
+        return getattr(window, '_hWnd', None)
+
+    def get_all_titles(self) -> List[str]:
+        """Get the titles of all open windows"""
+        if not WINDOW_SUPPORT:
+            return []
+        return [w.title for w in gw.getAllWindows()]
+
+
+class FakeWindowProvider:
+    """
+    In-memory window provider for tests and benchmarks
+    Works without a desktop session
+    """
+
+    available = True
+
+    def __init__(self, titles: Iterable[str] = (), active: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._windows = []
+        self._active = None
+        self.set_windows(titles)
+        if active is not None:
+            self.set_active(active)
+
+    def set_windows(self, titles: Iterable[str]):
+        """Replace all open windows"""
+        with self._lock:
+            self._windows = [FakeWindow(index + 1, title) for index, title in enumerate(titles)]
+
+    def add_window(self, title: str) -> FakeWindow:
+        """Open a new window"""
+        with self._lock:
+            window = FakeWindow(max((w.handle for w in self._windows), default=0) + 1, title)
+            self._windows.append(window)
+            return window
+
+    def remove_window(self, title: str):
+        """Close windows with the given title"""
+        with self._lock:
+            self._windows = [w for w in self._windows if w.title != title]
+            if self._active is not None and self._active.title == title:
+                self._active = None
+
+    def set_active(self, title: str):
+        """Focus the window with the given title, opening it if needed"""
+        with self._lock:
+            window = next((w for w in self._windows if w.title == title), None)
+        if window is None:
+            window = self.add_window(title)
+        self._active = window
+
+    def get_active_window(self):
+        return self._active
+
+    def get_handle(self, window) -> Any:
+        return window.handle
+
+    def get_all_titles(self) -> List[str]:
+        with self._lock:
+            return [w.title for w in self._windows]
+
+
+def filter_window_titles(titles: Iterable[str]) -> List[str]:
+    """Strip titles and drop empty, very short, duplicate and system windows"""
+    result = set()
+    for title in titles:
+        title = (title or '').strip()
+        if len(title) > 2 and title not in SYSTEM_WINDOW_TITLES:
+            result.add(title)
+    return sorted(result)
+
+
+def app_name(title: str) -> str:
+    """
+    Get the application of a window title
+    Titles end with the application ("Gelen Kutusu - Outlook"), titles
+    without a separator are the application itself
+    """
+    parts = [part for part in APP_SEPARATOR_RE.split(title.strip()) if part]
+    return parts[-1] if parts else title.strip()
+
+
+class WindowListWatcher:
+    """
+    Background snapshot of open window titles.
+
+    A daemon thread re-reads the window list every interval seconds and
+    bumps version whenever titles were added or removed, keeping the last
+    changes so clients can ask for a diff since the version they already
+    have. The thread stops after idle_timeout seconds without readers and
+    is restarted by the next read.
+    """
+
+    def __init__(self, provider, interval: float = 1.0, idle_timeout: float = 60.0, history: int = 256):
+        self.provider = provider
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._titles = []
+        self._title_set = frozenset()
+        self._version = 0
+        self._refreshed_at = None
+        self._changes = deque(maxlen=history)
+        self._last_read = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def refresh(self) -> bool:
+        """Read the window list now, True if it changed"""
+        titles = filter_window_titles(self.provider.get_all_titles())
+        title_set = frozenset(titles)
+        with self._lock:
+            self._refreshed_at = time.monotonic()
+            if title_set == self._title_set and self._version:
+                return False
+            added = sorted(title_set - self._title_set)
+            removed = sorted(self._title_set - title_set)
+            self._version += 1
+            self._titles = titles
+            self._title_set = title_set
+            self._changes.append((self._version, added, removed))
+            return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if time.monotonic() - self._last_read > self.idle_timeout:
+                break
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error reading window list: {e}")
+        with self._lock:
+            if self._thread is threading.current_thread():
+                self._thread = None
+
+    def _ensure_fresh(self):
+        """Mark a read and make sure the snapshot is being kept current"""
+        self._last_read = time.monotonic()
+        refreshed_at = self._refreshed_at
+        if refreshed_at is None or self._last_read - refreshed_at > self.interval * 2:
+            self.refresh()
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+
+    def snapshot(self) -> Tuple[int, List[str]]:
+        """Get (version, sorted titles)"""
+        self._ensure_fresh()
+        with self._lock:
+            return self._version, list(self._titles)
+
+    def diff_since(self, version: int) -> Dict:
+        """
+        Get titles added and removed since version
+        Falls back to the full list when version is unknown or too old
+        """
+        self._ensure_fresh()
+        with self._lock:
+            current = self._version
+            if version == current:
+                return {'version': current, 'added': [], 'removed': []}
+            oldest = self._changes[0][0] if self._changes else current + 1
+            if version > current or version < oldest - 1:
+                return {'version': current, 'full': True, 'windows': list(self._titles)}
+
+            added, removed = set(), set()
+            for change_version, change_added, change_removed in self._changes:
+                if change_version <= version:
+                    continue
+                for title in change_added:
+                    if title in removed:
+                        removed.discard(title)
+                    else:
+                        added.add(title)
+                for title in change_removed:
+                    if title in added:
+                        added.discard(title)
+                    else:
+                        removed.add(title)
+        return {'version': current, 'added': sorted(added), 'removed': sorted(removed)}
+
+
+# ==================== TITLE MATCHING ====================
+
+class TitleMatcher:
+    """
+    Aho-Corasick automaton over lowercased keywords.
+
+    Finding which keywords occur in a title takes time proportional to the
+    title length, no matter how many keywords were added. Every keyword
+    carries a value that is reported when it matches.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, Any]] = ()):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._always = []
+        self.size = 0
+        for keyword, value in keywords:
+            self._add(keyword.lower(), value)
+        self._build()
+
+    def _add(self, keyword: str, value: Any):
+        if not keyword:
+            # An empty keyword is contained in every title
+            self._always.append(value)
+            self.size += 1
+            return
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(value)
+        self.size += 1
+
+    def _build(self):
+        """Compute failure links breadth first"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail_state = self._goto[fallback].get(char, 0)
+                if fail_state == next_state:
+                    fail_state = 0
+                self._fail[next_state] = fail_state
+                self._output[next_state] = self._output[next_state] + self._output[fail_state]
+
+    def iter_matches(self, title: str):
+        """Yield the values of keywords found in title"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        yield from self._always
+        state = 0
+        for char in title.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if state:
+                yield from output[state]
+
+    def matches(self, title: str) -> bool:
+        """Check if any keyword occurs in title"""
+        for _ in self.iter_matches(title):
+            return True
+        return False
+
+
+# ==================== TARGET WINDOWS ====================
+
+class WindowTargeting:
+    """
+    Decides whether hotkeys may fire in the active window.
+
+    The target list is compiled into a TitleMatcher only when it changes.
+    The active window title and the decision are cached per window handle
+    for ttl seconds, so repeated triggers in the same window skip both the
+    title lookup and the matching.
+    """
+
+    def __init__(self, provider, load_targets: Callable[[], Optional[List[str]]], ttl: float = 0.5):
+        self.provider = provider
+        self.ttl = ttl
+        self._load_targets = load_targets
+        self._lock = threading.Lock()
+        self._matcher = None
+        self._loaded = False
+        self._version = 0
+        self._cache = {}
+
+    def invalidate(self, kind: str = None, key: Any = None):
+        """Rebuild the matcher after target_windows changes (database change listener)"""
+        if kind != 'database' and (kind not in (None, 'setting') or key not in (None, 'target_windows')):
+            return
+        with self._lock:
+            self._loaded = False
+            self._version += 1
+            self._cache = {}
+
+    def _get_matcher(self) -> Optional[TitleMatcher]:
+        if not self._loaded:
+            version = self._version
+            targets = self._load_targets()
+            matcher = TitleMatcher((t, t) for t in targets) if targets else None
+            with self._lock:
+                if version == self._version:
+                    self._matcher = matcher
+                    self._loaded = True
+            return matcher
+        return self._matcher
+
+    def _lookup(self) -> Tuple[str, bool]:
+        """Get the active window title and decision, using the handle cache"""
+        try:
+            window = self.provider.get_active_window()
+        except Exception:
+            window = None
+        if window is None:
+            return "", self._get_matcher() is None
+
+        handle = self.provider.get_handle(window)
+        now = time.monotonic()
+        if handle is not None:
+            cached = self._cache.get(handle)
+            if cached is not None and cached[0] > now:
+                return cached[1], cached[2]
+
+        version = self._version
+        try:
+            title = window.title or ""
+        except Exception:
+            title = ""
+        matcher = self._get_matcher()
+        allowed = matcher is None or matcher.matches(title)
+
+        if handle is not None:
+            with self._lock:
+                if version == self._version:
+                    if len(self._cache) > 256:
+                        self._cache = {}
+                    self._cache[handle] = (now + self.ttl, title, allowed)
+        return title, allowed
+
+    def active_title(self) -> str:
+        """Get the title of the active window"""
+        return self._lookup()[0]
+
+    def is_target_active(self) -> bool:
+        """Check if the active window is one of the targets (all windows if none set)"""
+        return self._lookup()[1]
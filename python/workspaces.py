@@ -0,0 +1,149 @@
+"""
+KenFlow - Akıllı Mesaj Otomasyonu
+Workspace module for KenFlow application
+Separate databases (e.g. one per brand) and switching between them
+
+Çalışma alanları:
+- Her çalışma alanı kendi veritabanı dosyasını kullanır
+- Backend yeniden başlatılmadan çalışma alanları arasında geçiş yapılır
+- Sadece aktif çalışma alanı açık bağlantı ve önbellek tutar
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+import database
+
+# Registry of workspaces and the active one
+REGISTRY_PATH = os.path.join(database.APP_DATA_PATH, 'workspaces.json')
+# Database files of all workspaces but the default one
+WORKSPACES_DIR = os.path.join(database.APP_DATA_PATH, 'workspaces')
+
+# Uses the database file of installs without workspaces
+DEFAULT_WORKSPACE = 'default'
+DEFAULT_NAME = 'Varsayılan'
+
+_lock = threading.RLock()
+
+
+def workspace_path(workspace_id: str) -> str:
+    """Get the database file of a workspace"""
+    if workspace_id == DEFAULT_WORKSPACE:
+        return os.path.join(database.APP_DATA_PATH, 'kenflow.db')
+    return os.path.join(WORKSPACES_DIR, f'{workspace_id}.db')
+
+
+def _load() -> Dict:
+    try:
+        with open(REGISTRY_PATH, encoding='utf-8') as f:
+            registry = json.load(f)
+    except (OSError, ValueError):
+        registry = {}
+    registry.setdefault('active', DEFAULT_WORKSPACE)
+    registry.setdefault('workspaces', [])
+    if not any(w['id'] == DEFAULT_WORKSPACE for w in registry['workspaces']):
+        registry['workspaces'].insert(0, {'id': DEFAULT_WORKSPACE, 'name': DEFAULT_NAME})
+    return registry
+
+
+def _save(registry: Dict):
+    # Written next to the registry and renamed, a crash never leaves half a file
+    temp_path = REGISTRY_PATH + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, REGISTRY_PATH)
+
+
+def _find(registry: Dict, workspace_id: str) -> Optional[Dict]:
+    return next((w for w in registry['workspaces'] if w['id'] == workspace_id), None)
+
+
+def _describe(workspace: Dict, active: str) -> Dict:
+    return {**workspace, 'path': workspace_path(workspace['id']), 'is_active': workspace['id'] == active}
+
+
+def _slug(name: str) -> str:
+    """Make a file name safe id from a workspace name"""
+    slug = name.lower().translate(str.maketrans('çğıöşü', 'cgiosu'))
+    return re.sub(r'[^a-z0-9]+', '-', slug).strip('-') or 'workspace'
+
+
+def list_workspaces() -> List[Dict]:
+    """Get all workspaces, the active one has is_active set"""
+    with _lock:
+        registry = _load()
+    return [_describe(w, registry['active']) for w in registry['workspaces']]
+
+
+def get_active_workspace() -> Dict:
+    """Get the active workspace"""
+    with _lock:
+        registry = _load()
+    workspace = _find(registry, registry['active']) or _find(registry, DEFAULT_WORKSPACE)
+    return _describe(workspace, workspace['id'])
+
+
+def create_workspace(name: str) -> Dict:
+    """Add a workspace, its database is created when it is first activated"""
+    name = (name or '').strip()
+    if not name:
+        raise ValueError('Workspace name is required')
+    with _lock:
+        registry = _load()
+        base = _slug(name)
+        workspace_id = base
+        suffix = 2
+        while _find(registry, workspace_id):
+            workspace_id = f'{base}-{suffix}'
+            suffix += 1
+        workspace = {'id': workspace_id, 'name': name}
+        registry['workspaces'].append(workspace)
+        _save(registry)
+    return _describe(workspace, registry['active'])
+
+
+def delete_workspace(workspace_id: str) -> bool:
+    """Remove a workspace and its database file, not allowed for the default or active one"""
+    with _lock:
+        registry = _load()
+        workspace = _find(registry, workspace_id)
+        if not workspace:
+            return False
+        if workspace_id == DEFAULT_WORKSPACE:
+            raise ValueError('The default workspace cannot be deleted')
+        if workspace_id == registry['active']:
+            raise ValueError('The active workspace cannot be deleted')
+        registry['workspaces'].remove(workspace)
+        _save(registry)
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            path = workspace_path(workspace_id) + suffix
+            if os.path.exists(path):
+                os.remove(path)
+    return True
+
+
+def activate_workspace(workspace_id: str) -> Dict:
+    """
+    Switch the backend to a workspace's database
+    Connections of the previous workspace are closed and the caches built
+    from it are dropped (the 'database' change)
+    """
+    with _lock:
+        registry = _load()
+        workspace = _find(registry, workspace_id)
+        if not workspace:
+            raise KeyError(workspace_id)
+        os.makedirs(WORKSPACES_DIR, exist_ok=True)
+        database.use_database(workspace_path(workspace_id))
+        if registry['active'] != workspace_id:
+            registry['active'] = workspace_id
+            _save(registry)
+    return _describe(workspace, workspace_id)
+
+
+def open_active_workspace() -> Dict:
+    """Open the workspace that was active when the backend last ran"""
+    return activate_workspace(get_active_workspace()['id'])